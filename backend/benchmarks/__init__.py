@@ -0,0 +1,8 @@
+"""
+Нагрузочные сценарии и бенчмарки API товаров.
+
+Запускаются отдельно от приложения, например: python -m benchmarks.reserve_load --help
+
+Регрессии производительности: каталог заливается benchmarks.seed, прогон
+benchmarks.load пишет базовую линию (--output) и сравнивает с ней (--check).
+"""
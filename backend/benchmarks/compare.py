@@ -0,0 +1,69 @@
+"""
+Сравнение прогона benchmarks.load с базовой линией.
+
+    python -m benchmarks.compare bench-baseline.json bench.json --tolerance 0.15
+
+Регрессия — если у сценария RPS упал, p95/p99 выросли больше чем на
+--tolerance (доля) или появились ошибки, которых не было. Сценарии, которых
+нет в одном из файлов, пропускаются. Код выхода 1 при регрессиях.
+"""
+
+import argparse
+import json
+import sys
+
+# Метрика -> больше значит лучше.
+_METRICS = {"rps": True, "p95_ms": False, "p99_ms": False}
+
+
+def compare(baseline: dict, current: dict, tolerance: float) -> list[str]:
+    """
+    Описания регрессий текущего прогона относительно базовой линии.
+    """
+    regressions = []
+    for name, base in baseline["scenarios"].items():
+        now = current["scenarios"].get(name)
+        if now is None:
+            continue
+        for metric, higher_is_better in _METRICS.items():
+            old, new = base.get(metric), now.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(f"{name}: {metric} {old} -> {new} ({change:+.1%})")
+        if now.get("errors", 0) > base.get("errors", 0) and now.get("errors", 0) > 0:
+            regressions.append(f"{name}: ошибок {base.get('errors', 0)} -> {now['errors']}")
+    return regressions
+
+
+def print_report(regressions: list[str], tolerance: float) -> None:
+    if not regressions:
+        print(f"Регрессий нет (допуск {tolerance:.0%})")
+        return
+    print(f"Регрессии сверх допуска {tolerance:.0%}:")
+    for line in regressions:
+        print(f"  {line}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+    if baseline["meta"].get("driver") != current["meta"].get("driver"):
+        print("Внимание: прогоны сделаны разными драйверами", file=sys.stderr)
+
+    regressions = compare(baseline, current, args.tolerance)
+    print_report(regressions, args.tolerance)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
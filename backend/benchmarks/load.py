@@ -0,0 +1,335 @@
+"""
+Нагрузочный прогон публичных и админских ручек товаров с базовой линией.
+
+    python -m benchmarks.load --driver asgi --duration 10 --output bench.json
+    python -m benchmarks.load --driver http --base-url http://localhost:8000 \\
+        --concurrency 64 --processes 4 --check bench.json --tolerance 0.15
+
+Драйвер asgi гоняет приложение в этом же процессе через httpx.ASGITransport
+(без сети и uvicorn — удобно сравнивать изменения кода), http — настоящий
+сервер по нескольким соединениям, при --processes в нескольких процессах.
+Каталог заливается заранее: python -m benchmarks.seed.
+
+Каждый сценарий крутится --duration секунд после --warmup с --concurrency
+параллельными клиентами (закрытый цикл: следующий запрос после ответа).
+Запросы выбираются детерминированно по --seed из товаров, категорий и слов,
+найденных через API. Итог — p50/p95/p99, RPS и ошибки по сценариям; --output
+пишет их в JSON, --check сравнивает с базовой линией (см. benchmarks.compare)
+и завершается с кодом 1 при регрессии. Сценарии с записью — только с --writes.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    sys.exit("Для нагрузочных сценариев нужен httpx: poetry install --with bench")
+
+from benchmarks.compare import compare, print_report
+
+PUBLIC = "/api/products"
+ADMIN = "/api/admin/products"
+
+
+@dataclass
+class Catalog:
+    """
+    Что есть в каталоге: из этого собираются запросы сценариев.
+    """
+
+    product_ids: list[int]
+    category_ids: list[int]
+    tag_ids: list[int]
+    words: list[str]
+
+
+Request = tuple[str, str, dict | None]
+
+
+def _public_list(rng: random.Random, catalog: Catalog) -> Request:
+    return "GET", f"{PUBLIC}/?limit=20&offset={rng.randrange(0, 200, 20)}", None
+
+
+def _public_filtered(rng: random.Random, catalog: Catalog) -> Request:
+    sort = rng.choice(("priceAsc", "priceDesc", "discountDesc", "newest"))
+    category_id = rng.choice(catalog.category_ids)
+    return "GET", f"{PUBLIC}/?limit=20&cursor=&sort={sort}&categoryId={category_id}&inStock=true", None
+
+
+def _public_tags(rng: random.Random, catalog: Catalog) -> Request:
+    tags = "&".join(f"tagIds={t}" for t in rng.sample(catalog.tag_ids, k=min(2, len(catalog.tag_ids))))
+    return "GET", f"{PUBLIC}/?limit=20&cursor=&{tags}", None
+
+
+def _public_get(rng: random.Random, catalog: Catalog) -> Request:
+    return "GET", f"{PUBLIC}/{rng.choice(catalog.product_ids)}", None
+
+
+def _public_search(rng: random.Random, catalog: Catalog) -> Request:
+    return "GET", f"{PUBLIC}/search?q={rng.choice(catalog.words)}", None
+
+
+def _public_suggest(rng: random.Random, catalog: Catalog) -> Request:
+    return "GET", f"{PUBLIC}/suggest?prefix={rng.choice(catalog.words)[:3]}", None
+
+
+def _public_facets(rng: random.Random, catalog: Catalog) -> Request:
+    return "GET", f"{PUBLIC}/facets?categoryId={rng.choice(catalog.category_ids)}", None
+
+
+def _admin_list(rng: random.Random, catalog: Catalog) -> Request:
+    return "GET", f"{ADMIN}/?limit=50&offset={rng.randrange(0, 500, 50)}", None
+
+
+def _admin_get(rng: random.Random, catalog: Catalog) -> Request:
+    return "GET", f"{ADMIN}/{rng.choice(catalog.product_ids)}", None
+
+
+def _admin_update_stock(rng: random.Random, catalog: Catalog) -> Request:
+    return "PATCH", f"{ADMIN}/{rng.choice(catalog.product_ids)}", {"stock": rng.randint(1, 50)}
+
+
+# Имя -> (пишет ли в БД, генератор запроса).
+SCENARIOS: dict[str, tuple[bool, Callable[[random.Random, Catalog], Request]]] = {
+    "public_list": (False, _public_list),
+    "public_filtered": (False, _public_filtered),
+    "public_tags": (False, _public_tags),
+    "public_get": (False, _public_get),
+    "public_search": (False, _public_search),
+    "public_suggest": (False, _public_suggest),
+    "public_facets": (False, _public_facets),
+    "admin_list": (False, _admin_list),
+    "admin_get": (False, _admin_get),
+    "admin_update_stock": (True, _admin_update_stock),
+}
+
+
+@dataclass
+class Sample:
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    elapsed: float = 0.0
+
+
+async def discover(client: httpx.AsyncClient, limit: int = 1000) -> Catalog:
+    """
+    Товары, категории, теги и слова для запросов — через API, чтобы одинаково
+    работать и в процессе, и против удалённого сервера.
+    """
+    product_ids: set[int] = set()
+    words: set[str] = set()
+    for sort in ("newest", "priceAsc", "priceDesc", "createdAtAsc", "discountDesc"):
+        response = await client.get(f"{PUBLIC}/", params={"limit": 200, "sort": sort})
+        response.raise_for_status()
+        for item in response.json():
+            product_ids.add(item["id"])
+            words.update(w.lower() for w in item["name"].split() if len(w) > 3 and w.isalpha())
+
+    response = await client.get(f"{ADMIN}/categories")
+    response.raise_for_status()
+    categories = response.json()
+    if not product_ids or not categories:
+        sys.exit("Каталог пуст: сначала python -m benchmarks.seed")
+
+    return Catalog(
+        product_ids=sorted(product_ids)[:limit],
+        category_ids=[c["id"] for c in categories],
+        tag_ids=[t["id"] for c in categories for t in c["tags"]] or [0],
+        words=sorted(words) or ["товар"],
+    )
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    scenario: str,
+    catalog: Catalog,
+    concurrency: int,
+    duration: float,
+    warmup: float,
+    seed: str,
+) -> Sample:
+    """
+    Закрытый цикл: `concurrency` клиентов шлют запросы сценария друг за другом.
+    """
+    _, make = SCENARIOS[scenario]
+    sample = Sample()
+    measure_from = time.perf_counter() + warmup
+    stop_at = measure_from + duration
+
+    async def worker(index: int) -> None:
+        rng = random.Random(f"{seed}-{scenario}-{index}")
+        while True:
+            method, url, body = make(rng, catalog)
+            started = time.perf_counter()
+            if started >= stop_at:
+                return
+            try:
+                response = await client.request(method, url, json=body)
+                failed = response.status_code >= 500 or response.status_code == 429
+            except httpx.HTTPError:
+                failed = True
+            finished = time.perf_counter()
+            if started >= measure_from:
+                sample.latencies.append(finished - started)
+                sample.errors += failed
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    sample.elapsed = duration
+    return sample
+
+
+def summarize(sample: Sample) -> dict:
+    latencies = sorted(sample.latencies)
+    if len(latencies) < 2:
+        return {"requests": len(latencies), "errors": sample.errors, "rps": 0.0}
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "requests": len(latencies),
+        "errors": sample.errors,
+        "rps": round(len(latencies) / sample.elapsed, 1),
+        "p50_ms": round(quantiles[49] * 1000, 2),
+        "p95_ms": round(quantiles[94] * 1000, 2),
+        "p99_ms": round(quantiles[98] * 1000, 2),
+    }
+
+
+def _http_client(base_url: str, connections: int) -> httpx.AsyncClient:
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    return httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30)
+
+
+def _http_process(base_url: str, scenario: str, catalog: Catalog, concurrency: int,
+                  duration: float, warmup: float, seed: str) -> Sample:
+    async def run() -> Sample:
+        async with _http_client(base_url, concurrency) as client:
+            return await drive(client, scenario, catalog, concurrency, duration, warmup, seed)
+
+    return asyncio.run(run())
+
+
+async def run_http(args, scenarios: list[str]) -> tuple[Catalog, dict[str, Sample]]:
+    async with _http_client(args.base_url, args.concurrency) as client:
+        catalog = await discover(client)
+        if args.processes <= 1:
+            return catalog, {
+                name: await drive(client, name, catalog, args.concurrency, args.duration, args.warmup, args.seed)
+                for name in scenarios
+            }
+
+    per_process = max(args.concurrency // args.processes, 1)
+    loop = asyncio.get_running_loop()
+    samples: dict[str, Sample] = {}
+    with ProcessPoolExecutor(args.processes) as pool:
+        for name in scenarios:
+            parts = await asyncio.gather(*(
+                loop.run_in_executor(
+                    pool, _http_process, args.base_url, name, catalog, per_process,
+                    args.duration, args.warmup, f"{args.seed}-{p}",
+                )
+                for p in range(args.processes)
+            ))
+            samples[name] = Sample(
+                latencies=[lat for part in parts for lat in part.latencies],
+                errors=sum(part.errors for part in parts),
+                elapsed=args.duration,
+            )
+    return catalog, samples
+
+
+async def run_asgi(args, scenarios: list[str]) -> tuple[Catalog, dict[str, Sample]]:
+    from src.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=30) as client:
+            catalog = await discover(client)
+            return catalog, {
+                name: await drive(client, name, catalog, args.concurrency, args.duration, args.warmup, args.seed)
+                for name in scenarios
+            }
+
+
+def _git_revision() -> str | None:
+    try:
+        revision = subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL,
+        )
+        return revision.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--driver", choices=["asgi", "http"], default="asgi")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--scenarios", default="", help="через запятую; по умолчанию все читающие")
+    parser.add_argument("--writes", action="store_true", help="добавить сценарии с записью")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--processes", type=int, default=1, help="процессов генератора для --driver http")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--seed", default="42")
+    parser.add_argument("--output", help="записать результаты в JSON")
+    parser.add_argument("--check", help="сравнить с базовой линией из JSON")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="допустимое ухудшение, доля")
+    args = parser.parse_args()
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()] or [
+        name for name, (writes, _) in SCENARIOS.items() if args.writes or not writes
+    ]
+    unknown = set(scenarios) - SCENARIOS.keys()
+    if unknown:
+        parser.error(f"неизвестные сценарии: {', '.join(sorted(unknown))}")
+
+    runner = run_asgi if args.driver == "asgi" else run_http
+    catalog, samples = asyncio.run(runner(args, scenarios))
+
+    result = {
+        "meta": {
+            "driver": args.driver,
+            "concurrency": args.concurrency,
+            "processes": args.processes if args.driver == "http" else 1,
+            "duration": args.duration,
+            "seed": args.seed,
+            "sampled_products": len(catalog.product_ids),
+            "git": _git_revision(),
+            "python": platform.python_version(),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+        "scenarios": {name: summarize(sample) for name, sample in samples.items()},
+    }
+
+    print(f"{'сценарий':20} {'запросов':>9} {'ошибок':>7} {'rps':>9} {'p50 мс':>8} {'p95 мс':>8} {'p99 мс':>8}")
+    for name, r in result["scenarios"].items():
+        print(
+            f"{name:20} {r['requests']:9} {r['errors']:7} {r['rps']:9.1f} "
+            f"{r.get('p50_ms', 0):8.2f} {r.get('p95_ms', 0):8.2f} {r.get('p99_ms', 0):8.2f}"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+    if args.check:
+        with open(args.check, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, result, args.tolerance)
+        print_report(regressions, args.tolerance)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
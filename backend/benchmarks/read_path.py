@@ -0,0 +1,102 @@
+"""
+Сравнение путей чтения публичного каталога: ORM + ProductOut, ProductReader
+со сборкой карточек одним запросом и ProductReader с готовыми карточками (product_cards).
+
+    python -m benchmarks.read_path --limit 200 --iterations 50
+
+Работает напрямую с БД из настроек приложения (DATABASE_URL), без HTTP и кэша;
+product_cards должна быть заполнена (python -m src.apps.products.cards backfill).
+Для каждого пути печатает процессорное и полное время на запрос и пик выделенной
+памяти (tracemalloc), а также проверяет, что все пути отдают одинаковые байты.
+"""
+
+import argparse
+import asyncio
+import gc
+import statistics
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+
+from pydantic import TypeAdapter
+
+from src.core.db import async_session_maker
+from src.apps.products.cards import cards_json
+from src.apps.products.reader import ProductReader
+from src.apps.products.schemas import ProductFilter, ProductOut
+from src.apps.products.service import ProductService
+
+_product_list = TypeAdapter(list[ProductOut])
+
+
+async def orm_page(limit: int, filters: ProductFilter) -> bytes:
+    async with async_session_maker() as session:
+        items = await ProductService(session).list_public(limit=limit, filters=filters)
+        return _product_list.dump_json(_product_list.validate_python(items), by_alias=True)
+
+
+async def lean_page(limit: int, filters: ProductFilter) -> bytes:
+    async with async_session_maker() as session:
+        return cards_json(await ProductReader(session).list_public(limit=limit, filters=filters))
+
+
+async def cards_page(limit: int, filters: ProductFilter) -> bytes:
+    async with async_session_maker() as session:
+        reader = ProductReader(session, use_cards=True)
+        return cards_json(await reader.list_public(limit=limit, filters=filters))
+
+
+async def measure(
+    read: Callable[[int, ProductFilter], Awaitable[bytes]],
+    limit: int,
+    filters: ProductFilter,
+    iterations: int,
+) -> dict:
+    await read(limit, filters)  # прогрев: соединения пула, кэш скомпилированных запросов
+
+    cpu, wall = [], []
+    for _ in range(iterations):
+        gc.collect()
+        started_cpu, started_wall = time.process_time(), time.perf_counter()
+        await read(limit, filters)
+        cpu.append(time.process_time() - started_cpu)
+        wall.append(time.perf_counter() - started_wall)
+
+    tracemalloc.start()
+    await read(limit, filters)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "cpu_ms": statistics.median(cpu) * 1000,
+        "wall_ms": statistics.median(wall) * 1000,
+        "peak_kib": peak / 1024,
+    }
+
+
+async def run(limit: int, iterations: int) -> bool:
+    filters = ProductFilter()
+    paths = {"orm": orm_page, "lean": lean_page, "cards": cards_page}
+    bodies = {name: await read(limit, filters) for name, read in paths.items()}
+    same = len(set(bodies.values())) == 1
+
+    results = {name: await measure(read, limit, filters, iterations) for name, read in paths.items()}
+    print(f"Страница из {limit} товаров, {iterations} повторов, медианы:")
+    for name, r in results.items():
+        print(f"  {name:5} cpu {r['cpu_ms']:8.2f} мс   wall {r['wall_ms']:8.2f} мс   пик памяти {r['peak_kib']:9.1f} КиБ")
+    for name in ("lean", "cards"):
+        print(f"  ускорение {name} по CPU: x{results['orm']['cpu_ms'] / max(results[name]['cpu_ms'], 1e-9):.2f}")
+    print("Ответы совпадают" if same else "ОТВЕТЫ РАЗЛИЧАЮТСЯ")
+    return same
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+    raise SystemExit(0 if asyncio.run(run(args.limit, args.iterations)) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Нагрузочная проверка резервов: тысячи параллельных резервов одного товара
+не должны продать больше, чем лежит на складе.
+
+    python -m benchmarks.reserve_load --base-url http://localhost:8000 --stock 500 --requests 3000
+
+Создаёт товар с остатком --stock, отправляет --requests резервов по одной штуке
+(половину — пакетными запросами вместе со вторым товаром) и проверяет, что
+успешных резервов ровно столько, сколько было остатка, а остаток не ушёл в минус.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    sys.exit("Для нагрузочных сценариев нужен httpx: poetry install --with bench")
+
+
+async def _create_product(client: httpx.AsyncClient, name: str, stock: int) -> int:
+    response = await client.post("/api/admin/products/", json={"name": name, "price": "1.00", "stock": stock})
+    response.raise_for_status()
+    return response.json()["id"]
+
+
+async def _stock(client: httpx.AsyncClient, product_id: int) -> int:
+    response = await client.get(f"/api/admin/products/{product_id}")
+    response.raise_for_status()
+    return response.json()["stock"]
+
+
+async def run(base_url: str, stock: int, requests: int, connections: int) -> bool:
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        target = await _create_product(client, "reserve-load-target", stock)
+        companion = await _create_product(client, "reserve-load-companion", requests)
+
+        async def reserve(i: int) -> int:
+            if i % 2:
+                response = await client.post(f"/api/products/{target}/reserve", json={"quantity": 1})
+            else:
+                response = await client.post("/api/products/reserve", json={"items": [
+                    {"productId": companion, "quantity": 1},
+                    {"productId": target, "quantity": 1},
+                ]})
+            return response.status_code
+
+        started = time.perf_counter()
+        statuses = await asyncio.gather(*(reserve(i) for i in range(requests)))
+        elapsed = time.perf_counter() - started
+
+        succeeded = statuses.count(200)
+        rejected = statuses.count(409)
+        other = len(statuses) - succeeded - rejected
+        left = await _stock(client, target)
+        companion_left = await _stock(client, companion)
+
+    expected = min(stock, requests)
+    batched_ok = sum(1 for i, s in enumerate(statuses) if s == 200 and not i % 2)
+    print(f"requests={requests} ok={succeeded} rejected={rejected} other={other} "
+          f"elapsed={elapsed:.2f}s rps={requests / elapsed:.0f}")
+    print(f"target stock: {stock} -> {left}, companion stock: {requests} -> {companion_left}")
+
+    ok = (
+        other == 0
+        and succeeded == expected
+        and left == stock - succeeded
+        and left >= 0
+        and companion_left == requests - batched_ok
+    )
+    print("OK: перепродаж нет" if ok else "FAIL: остатки не сходятся")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--stock", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--connections", type=int, default=200)
+    args = parser.parse_args()
+    ok = asyncio.run(run(args.base_url, args.stock, args.requests, args.connections))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Синтетический каталог для бенчмарков: категории, теги, товары с изображениями.
+
+    python -m benchmarks.seed --products 100000 --reset
+
+Пишет в БД из настроек приложения (DATABASE_DIRECT_URL или DATABASE_URL) через
+COPY, поэтому и миллион товаров заливается за минуты. Данные детерминированы
+по --seed: один и тот же набор параметров даёт один и тот же каталог, и
+результаты прогонов сравнимы между собой. Существующий каталог удаляется
+только с --reset. После заливки пересобираются product_cards и выполняется ANALYZE.
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from collections.abc import Iterator
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import asyncpg
+
+from src.core.settings import Settings
+from src.apps.products import cards
+
+_CATEGORIES = (
+    "Куртки", "Футболки", "Джинсы", "Платья", "Обувь", "Рубашки", "Свитеры", "Брюки",
+    "Шорты", "Юбки", "Пальто", "Костюмы", "Аксессуары", "Сумки", "Шапки", "Шарфы",
+)
+_ADJECTIVES = (
+    "Лёгкая", "Тёплая", "Классическая", "Спортивная", "Хлопковая", "Льняная", "Шерстяная",
+    "Оверсайз", "Приталенная", "Укороченная", "Удлинённая", "Базовая", "Вельветовая", "Джинсовая",
+)
+_COLORS = (
+    "чёрная", "белая", "серая", "синяя", "красная", "зелёная", "бежевая", "коричневая",
+    "голубая", "розовая", "жёлтая", "оливковая",
+)
+_TAGS = (
+    "хит", "новинка", "распродажа", "эко", "премиум", "базовый", "лето", "зима",
+    "офис", "спорт", "унисекс", "оверсайз", "хлопок", "шерсть", "лён", "кожа",
+)
+_SIZES = ("XS", "S", "M", "L", "XL", "XXL", None)
+
+_COPY_BATCH = 10_000
+_NOW = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _dsn(settings: Settings) -> str:
+    return (settings.DATABASE_DIRECT_URL or settings.DATABASE_URL).replace("+asyncpg", "")
+
+
+def _price(rng: random.Random) -> Decimal:
+    # Логнормальное распределение: много недорогих товаров и длинный хвост дорогих.
+    return Decimal(round(min(max(rng.lognormvariate(8, 0.9), 100), 500_000), -1)).quantize(Decimal("0.01"))
+
+
+def _products(
+    rng: random.Random,
+    count: int,
+    categories: int,
+    tags_by_category: dict[int, list[tuple[int, str]]],
+) -> Iterator[tuple[tuple, list[int]]]:
+    for product_id in range(1, count + 1):
+        category_id = rng.randint(1, categories)
+        available = tags_by_category[category_id]
+        tags = rng.sample(available, k=min(rng.randint(0, 3), len(available)))
+        price = _price(rng)
+        discount = (price * Decimal(rng.choice((70, 80, 85, 90))) / 100).quantize(Decimal("0.01"))
+        created_at = _NOW - timedelta(seconds=rng.randint(0, 2 * 365 * 24 * 3600))
+        kind = _CATEGORIES[(category_id - 1) % len(_CATEGORIES)].lower()
+        name = f"{rng.choice(_ADJECTIVES)} {kind} {rng.choice(_COLORS)} {product_id}"
+        tag_names = " ".join(tag for _, tag in tags)
+        yield (
+            product_id,
+            name,
+            f"{name}. Артикул {product_id:07d}. {tag_names}".strip(),
+            price,
+            discount if rng.random() < 0.3 else None,
+            0 if rng.random() < 0.15 else rng.randint(1, 50),
+            f"https://cdn.example.com/p/{product_id}/main.jpg",
+            rng.choice(_SIZES),
+            rng.random() < 0.95,
+            category_id,
+            created_at,
+            created_at,
+            tag_names or None,
+        ), [tag_id for tag_id, _ in tags]
+
+
+async def seed(
+    dsn: str,
+    products: int,
+    categories: int,
+    tags_per_category: int,
+    images: int,
+    seed_value: int,
+    reset: bool,
+) -> None:
+    rng = random.Random(seed_value)
+    conn = await asyncpg.connect(dsn)
+    try:
+        existing = await conn.fetchval("SELECT count(*) FROM products")
+        if existing and not reset:
+            sys.exit(f"В products уже {existing} строк; запустите с --reset, чтобы заменить каталог")
+
+        started = time.perf_counter()
+        async with conn.transaction():
+            await conn.execute(
+                "TRUNCATE categories, tags, products, product_images, product_tags, product_cards, "
+                "stock_reservations RESTART IDENTITY CASCADE"
+            )
+
+            await conn.copy_records_to_table(
+                "categories", columns=("id", "name"),
+                records=[(i, f"{_CATEGORIES[(i - 1) % len(_CATEGORIES)]} {i}") for i in range(1, categories + 1)],
+            )
+            tags_by_category: dict[int, list[tuple[int, str]]] = {}
+            tag_rows = []
+            for category_id in range(1, categories + 1):
+                names = rng.sample(_TAGS, k=min(tags_per_category, len(_TAGS)))
+                for name in names:
+                    tag_rows.append((len(tag_rows) + 1, name, category_id))
+                tags_by_category[category_id] = [(row[0], row[1]) for row in tag_rows[-len(names):]]
+            await conn.copy_records_to_table("tags", columns=("id", "name", "category_id"), records=tag_rows)
+
+            product_batch, image_batch, tag_batch = [], [], []
+
+            async def flush() -> None:
+                await conn.copy_records_to_table("products", columns=(
+                    "id", "name", "description", "price", "discount_price", "stock", "main_image_url",
+                    "size", "is_active", "category_id", "created_at", "updated_at", "search_tags",
+                ), records=product_batch)
+                await conn.copy_records_to_table(
+                    "product_images", columns=("product_id", "image_url"), records=image_batch,
+                )
+                await conn.copy_records_to_table(
+                    "product_tags", columns=("product_id", "tag_id"), records=tag_batch,
+                )
+                for batch in (product_batch, image_batch, tag_batch):
+                    batch.clear()
+
+            for row, tag_ids in _products(rng, products, categories, tags_by_category):
+                product_batch.append(row)
+                image_batch.extend((row[0], f"https://cdn.example.com/p/{row[0]}/{k}.jpg") for k in range(images))
+                tag_batch.extend((row[0], tag_id) for tag_id in tag_ids)
+                if len(product_batch) >= _COPY_BATCH:
+                    await flush()
+                    print(f"\rТоваров: {row[0]}/{products}", end="", flush=True)
+            if product_batch:
+                await flush()
+            print(f"\rТоваров: {products}/{products}")
+
+            for table in ("categories", "tags", "products"):
+                await conn.execute(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT coalesce(max(id), 1) FROM {table}))"
+                )
+        print(f"Каталог залит за {time.perf_counter() - started:.1f} с")
+    finally:
+        await conn.close()
+
+    started = time.perf_counter()
+    total = await cards.backfill()
+    print(f"Карточек собрано: {total} за {time.perf_counter() - started:.1f} с")
+
+    conn = await asyncpg.connect(dsn)
+    try:
+        await conn.execute("ANALYZE")
+    finally:
+        await conn.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--categories", type=int, default=16)
+    parser.add_argument("--tags-per-category", type=int, default=8)
+    parser.add_argument("--images", type=int, default=3, help="изображений на товар")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="удалить существующий каталог")
+    args = parser.parse_args()
+    asyncio.run(seed(
+        _dsn(Settings()), args.products, args.categories, args.tags_per_category,
+        args.images, args.seed, args.reset,
+    ))
+
+
+if __name__ == "__main__":
+    main()
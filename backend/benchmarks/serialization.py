@@ -0,0 +1,98 @@
+"""
+Микробенчмарк сериализации страниц товаров: прежний путь FastAPI против core.responses.
+
+    python -m benchmarks.serialization --iterations 2000
+
+Прежний путь: ProductOut.model_validate в ручке, повторная валидация по response_model,
+jsonable_encoder и json.dumps в JSONResponse. Новый: одна валидация и dump_json
+pydantic-core. Данные — объекты с атрибутами, как ORM-модели; БД не нужна.
+Печатает p50/p99 времени на страницу для 20 и 200 товаров.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from src.core.responses import dump_json
+from src.apps.products.schemas import ProductOut
+
+_field = create_model_field(name="Response", type_=list[ProductOut], mode="serialization")
+
+
+def make_products(count: int) -> list[SimpleNamespace]:
+    now = datetime.now(timezone.utc)
+    tags = [SimpleNamespace(id=i, name=f"тег {i}", category_id=1) for i in range(1, 6)]
+    category = SimpleNamespace(id=1, name="Одежда", tags=tags)
+    return [
+        SimpleNamespace(
+            id=i,
+            name=f"Товар {i}",
+            description="Описание товара " * 8,
+            size="M",
+            price=Decimal("1999.90") + i,
+            discount_price=Decimal("1499.00") if i % 3 else None,
+            main_image_url=f"https://cdn.example.com/{i}.jpg",
+            is_active=True,
+            stock=i % 17,
+            category=category,
+            images=[SimpleNamespace(id=i * 10 + k, image_url=f"https://cdn.example.com/{i}-{k}.jpg") for k in range(3)],
+            tags=tags[: i % 5],
+            created_at=now - timedelta(days=i),
+            updated_at=now,
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+async def fastapi_path(items: list) -> bytes:
+    content = [ProductOut.model_validate(p, from_attributes=True) for p in items]
+    encoded = await serialize_response(field=_field, response_content=content)
+    return JSONResponse(encoded).body
+
+
+async def fast_path(items: list) -> bytes:
+    return dump_json(list[ProductOut], items)
+
+
+def _percentile(samples: list[float], q: int) -> float:
+    return statistics.quantiles(samples, n=100)[q - 1]
+
+
+async def measure(serialize, items: list, iterations: int) -> tuple[float, float]:
+    for _ in range(20):
+        await serialize(items)
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await serialize(items)
+        samples.append((time.perf_counter() - started) * 1000)
+    return _percentile(samples, 50), _percentile(samples, 99)
+
+
+async def run(iterations: int) -> None:
+    for size in (20, 200):
+        items = make_products(size)
+        old = await measure(fastapi_path, items, iterations)
+        new = await measure(fast_path, items, iterations)
+        print(f"Страница из {size} товаров:")
+        print(f"  fastapi  p50 {old[0]:7.3f} мс   p99 {old[1]:7.3f} мс")
+        print(f"  dump     p50 {new[0]:7.3f} мс   p99 {new[1]:7.3f} мс   (x{old[0] / new[0]:.1f} по p50)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(run(args.iterations))
+
+
+if __name__ == "__main__":
+    main()
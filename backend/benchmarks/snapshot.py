@@ -0,0 +1,191 @@
+"""
+Снимок каталога в памяти против чтения из БД: память на товар и задержка запросов.
+
+    python -m benchmarks.snapshot --requests 2000 --output snapshot.json
+
+Каталог заливается заранее: python -m benchmarks.seed. Снимок загружается
+так же, как при старте приложения, объём меряется tracemalloc (удержанная
+после загрузки память) и оценкой самого снимка. Затем одни и те же запросы
+(страница по offset, фильтры с курсором, теги, карточка, пакет карточек)
+выполняются по очереди через ProductReader с product_cards и через снимок;
+ответы сравниваются побайтно. Кэш ответов не участвует ни в одном из путей.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from decimal import Decimal
+
+from sqlalchemy import select, true
+
+from src.core.db import async_session_maker, engine
+from src.apps.products import models, schemas
+from src.apps.products.reader import ProductReader
+from src.apps.products.snapshot import CatalogSnapshot, catalog_snapshot
+
+Query = Callable[[ProductReader | CatalogSnapshot], Awaitable[list[bytes]]]
+
+
+def _list(rng: random.Random, ids: list[int], categories: list[int], tags: list[int]) -> Query:
+    offset = rng.randrange(0, 200, 20)
+
+    async def run(reader):
+        return [c.json for c in await reader.list_public(limit=20, offset=offset)]
+    return run
+
+
+def _filtered(rng: random.Random, ids: list[int], categories: list[int], tags: list[int]) -> Query:
+    filters = schemas.ProductFilter(
+        category_id=rng.choice(categories),
+        in_stock=True,
+        min_price=rng.choice((None, Decimal(1000))),
+        sort=rng.choice(list(schemas.ProductSort)),
+    )
+
+    async def run(reader):
+        cards, cursor = await reader.list_public_page(limit=20, cursor="", filters=filters)
+        return [c.json for c in cards] + [str(cursor).encode()]
+    return run
+
+
+def _tags(rng: random.Random, ids: list[int], categories: list[int], tags: list[int]) -> Query:
+    filters = schemas.ProductFilter(
+        tag_ids=rng.sample(tags, k=min(2, len(tags))),
+        tag_mode=rng.choice(("any", "all")),
+        sort=schemas.ProductSort.price_asc,
+    )
+
+    async def run(reader):
+        cards, cursor = await reader.list_public_page(limit=20, cursor="", filters=filters)
+        return [c.json for c in cards] + [str(cursor).encode()]
+    return run
+
+
+def _get(rng: random.Random, ids: list[int], categories: list[int], tags: list[int]) -> Query:
+    product_id = rng.choice(ids)
+
+    async def run(reader):
+        return [(await reader.get_public(product_id)).json]
+    return run
+
+
+def _batch(rng: random.Random, ids: list[int], categories: list[int], tags: list[int]) -> Query:
+    wanted = rng.sample(ids, k=min(50, len(ids)))
+
+    async def run(reader):
+        cards, missing = await reader.get_many_public(wanted)
+        return [c.json for c in cards] + [str(missing).encode()]
+    return run
+
+
+SCENARIOS = {
+    "list": _list,
+    "filtered": _filtered,
+    "tags": _tags,
+    "get": _get,
+    "batch": _batch,
+}
+
+
+def _summary(latencies: list[float]) -> dict:
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "p50_ms": round(quantiles[49] * 1000, 3),
+        "p95_ms": round(quantiles[94] * 1000, 3),
+        "p99_ms": round(quantiles[98] * 1000, 3),
+    }
+
+
+async def measure_memory(snapshot: CatalogSnapshot) -> dict:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    await snapshot.reload()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    products = len(snapshot.data)
+    return {
+        "products": products,
+        "load_seconds": round(snapshot.load_seconds, 2),
+        "retained_bytes": retained - before,
+        "peak_bytes": peak - before,
+        "estimated_bytes": snapshot.nbytes,
+        "bytes_per_product": round((retained - before) / max(products, 1)),
+    }
+
+
+async def run(requests: int, seed: str) -> dict:
+    snapshot = catalog_snapshot
+    memory = await measure_memory(snapshot)
+
+    async with async_session_maker() as session:
+        ids = list(await session.scalars(
+            select(models.Product.id).where(models.Product.is_active.is_(true())).limit(5000)
+        ))
+        categories = list(await session.scalars(select(models.Category.id)))
+        tags = list(await session.scalars(select(models.Tag.id)))
+        if not ids or not categories:
+            raise SystemExit("Каталог пуст: сначала python -m benchmarks.seed")
+
+        sql_reader = ProductReader(session, use_cards=True)
+        results = {}
+        for name, make in SCENARIOS.items():
+            rng = random.Random(f"{seed}-{name}")
+            queries = [make(rng, ids, categories, tags or [0]) for _ in range(requests)]
+            timings: dict[str, list[float]] = {"sql": [], "memory": []}
+            mismatches = 0
+            for query in queries:
+                started = time.perf_counter()
+                expected = await query(sql_reader)
+                timings["sql"].append(time.perf_counter() - started)
+                started = time.perf_counter()
+                actual = await query(snapshot)
+                timings["memory"].append(time.perf_counter() - started)
+                mismatches += expected != actual
+            sql, memory_path = _summary(timings["sql"]), _summary(timings["memory"])
+            results[name] = {
+                "sql": sql,
+                "memory": memory_path,
+                "speedup_p50": round(sql["p50_ms"] / max(memory_path["p50_ms"], 1e-6), 1),
+                "mismatches": mismatches,
+            }
+    await engine.dispose()
+    return {"memory": memory, "scenarios": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500, help="запросов на сценарий")
+    parser.add_argument("--seed", default="42")
+    parser.add_argument("--output", help="записать результаты в JSON")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.requests, args.seed))
+
+    memory = result["memory"]
+    print(
+        f"Снимок: {memory['products']} товаров за {memory['load_seconds']} с, "
+        f"{memory['retained_bytes'] / 2**20:.1f} МиБ ({memory['bytes_per_product']} байт на товар), "
+        f"пик загрузки {memory['peak_bytes'] / 2**20:.1f} МиБ"
+    )
+    print(f"{'сценарий':10} {'sql p50':>9} {'sql p99':>9} {'mem p50':>9} {'mem p99':>9} {'ускорение':>10} {'расхождений':>12}")
+    for name, r in result["scenarios"].items():
+        print(
+            f"{name:10} {r['sql']['p50_ms']:9.3f} {r['sql']['p99_ms']:9.3f} "
+            f"{r['memory']['p50_ms']:9.3f} {r['memory']['p99_ms']:9.3f} "
+            f"{r['speedup_p50']:9.1f}x {r['mismatches']:12}"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    if any(r["mismatches"] for r in result["scenarios"].values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""add product cards
+
+Revision ID: 0c7a5e2b9d31
+Revises: e61c0d9f2a15
+Create Date: 2026-10-18 16:00:00.000000
+
+Карточки заполняются командой `python -m src.apps.products.cards backfill`:
+JSON собирается тем же кодом, что и при записи. До заполнения публичные
+ручки собирают недостающие карточки на лету.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c7a5e2b9d31'
+down_revision: Union[str, Sequence[str], None] = 'e61c0d9f2a15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('product_cards',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('card', sa.Text(), nullable=False),
+    sa.Column('built_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('product_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('product_cards')
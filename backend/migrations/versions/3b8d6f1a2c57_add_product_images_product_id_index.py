@@ -0,0 +1,29 @@
+"""add product_images product_id index
+
+Revision ID: 3b8d6f1a2c57
+Revises: 7f3a9c2e4b18
+Create Date: 2026-10-18 21:00:00.000000
+
+Изображения товара выбираются по product_id в каждой сборке карточки и при
+загрузке снимка каталога; без индекса это полный просмотр product_images.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b8d6f1a2c57'
+down_revision: Union[str, Sequence[str], None] = '7f3a9c2e4b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_product_images_product_id', 'product_images', ['product_id', 'id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_product_images_product_id', table_name='product_images')
@@ -0,0 +1,50 @@
+"""add catalog indexes
+
+Revision ID: 5d1e8c3a9b47
+Revises: 77c2bc2b6614
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d1e8c3a9b47'
+down_revision: Union[str, Sequence[str], None] = '77c2bc2b6614'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+EFFECTIVE_PRICE = sa.text('coalesce(discount_price, price)')
+DISCOUNT_AMOUNT = sa.text('(price - coalesce(discount_price, price))')
+ACTIVE = sa.text('is_active IS true')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_products_category_id', 'products', ['category_id'])
+    op.create_index('ix_products_active_id', 'products', ['id'], postgresql_where=ACTIVE)
+    op.create_index('ix_products_active_category', 'products', ['category_id', 'id'], postgresql_where=ACTIVE)
+    op.create_index('ix_products_active_price', 'products', [EFFECTIVE_PRICE, 'id'], postgresql_where=ACTIVE)
+    op.create_index('ix_products_active_discount', 'products', [DISCOUNT_AMOUNT, 'id'], postgresql_where=ACTIVE)
+    op.create_index('ix_products_active_created_at', 'products', ['created_at', 'id'], postgresql_where=ACTIVE)
+    op.create_index(
+        'ix_products_active_in_stock', 'products', ['id'],
+        postgresql_where=sa.text('is_active IS true AND stock > 0'),
+    )
+    op.create_index('ix_product_tags_tag_id', 'product_tags', ['tag_id', 'product_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_product_tags_tag_id', table_name='product_tags')
+    op.drop_index('ix_products_active_in_stock', table_name='products')
+    op.drop_index('ix_products_active_created_at', table_name='products')
+    op.drop_index('ix_products_active_discount', table_name='products')
+    op.drop_index('ix_products_active_price', table_name='products')
+    op.drop_index('ix_products_active_category', table_name='products')
+    op.drop_index('ix_products_active_id', table_name='products')
+    op.drop_index('ix_products_category_id', table_name='products')
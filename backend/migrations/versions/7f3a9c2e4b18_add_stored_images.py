@@ -0,0 +1,46 @@
+"""add stored images and image variants
+
+Revision ID: 7f3a9c2e4b18
+Revises: 0c7a5e2b9d31
+Create Date: 2026-10-18 19:00:00.000000
+
+В карточках у изображений появляется поле variants, поэтому сохранённые
+карточки сбрасываются: до `python -m src.apps.products.cards backfill`
+публичные ручки собирают их на лету.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f3a9c2e4b18'
+down_revision: Union[str, Sequence[str], None] = '0c7a5e2b9d31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('stored_images',
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('url', sa.String(), nullable=False),
+    sa.Column('content_type', sa.String(length=50), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('width', sa.Integer(), nullable=False),
+    sa.Column('height', sa.Integer(), nullable=False),
+    sa.Column('variants', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('content_hash'),
+    sa.UniqueConstraint('url')
+    )
+    op.add_column('product_images', sa.Column('variants', sa.JSON(), server_default=sa.text("'[]'"), nullable=False))
+    op.execute('TRUNCATE product_cards')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('product_images', 'variants')
+    op.drop_table('stored_images')
+    op.execute('TRUNCATE product_cards')
@@ -0,0 +1,39 @@
+"""add product changes
+
+Revision ID: d8b2f6c4a1e3
+Revises: c4e7a1d9f352
+Create Date: 2026-10-18 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8b2f6c4a1e3'
+down_revision: Union[str, Sequence[str], None] = 'c4e7a1d9f352'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('product_changes',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('txid', sa.BigInteger(), server_default=sa.text('pg_current_xact_id()::text::bigint'), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('op', sa.String(length=16), nullable=False),
+    sa.Column('changed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_product_changes_position', 'product_changes', ['txid', 'id'])
+    op.create_index('ix_product_changes_changed_at', 'product_changes', ['changed_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_product_changes_changed_at', table_name='product_changes')
+    op.drop_index('ix_product_changes_position', table_name='product_changes')
+    op.drop_table('product_changes')
@@ -0,0 +1,60 @@
+"""add product search
+
+Revision ID: e61c0d9f2a15
+Revises: b3f42a7c1e90
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e61c0d9f2a15'
+down_revision: Union[str, Sequence[str], None] = 'b3f42a7c1e90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('russian'::regconfig, coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('russian'::regconfig, coalesce(search_tags, '')), 'B') || "
+    "setweight(to_tsvector('russian'::regconfig, coalesce(description, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.add_column('products', sa.Column('search_tags', sa.String(), nullable=True))
+    op.execute(
+        """
+        UPDATE products SET search_tags = t.names
+        FROM (
+            SELECT pt.product_id, string_agg(tags.name, ' ') AS names
+            FROM product_tags pt JOIN tags ON tags.id = pt.tag_id
+            GROUP BY pt.product_id
+        ) t
+        WHERE products.id = t.product_id
+        """
+    )
+    op.add_column(
+        'products',
+        sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR, persisted=True)),
+    )
+    op.create_index('ix_products_search_vector', 'products', ['search_vector'], postgresql_using='gin')
+    op.create_index(
+        'ix_products_name_trgm', 'products', ['name'],
+        postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_products_name_trgm', table_name='products')
+    op.drop_index('ix_products_search_vector', table_name='products')
+    op.drop_column('products', 'search_vector')
+    op.drop_column('products', 'search_tags')
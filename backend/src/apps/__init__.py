@@ -3,3 +3,4 @@
 """
 
 from src.apps.products.models import Product  # noqa: F401
+from src.core.jobs.models import Job  # noqa: F401
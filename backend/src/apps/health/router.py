@@ -1,8 +1,27 @@
 from fastapi import APIRouter
 
+from src.core.db import pool_status
+from src.apps.products.cache import product_cache
+from src.apps.products.suggest import suggest_index
+
 router = APIRouter()
 
 
 @router.get("/", summary="Healthcheck")
 async def healthcheck():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+
+@router.get("/cache", summary="Статистика кэша товаров")
+async def cache_stats():
+    return product_cache.stats()
+
+
+@router.get("/suggest", summary="Состояние индекса подсказок")
+async def suggest_stats():
+    return suggest_index.stats()
+
+
+@router.get("/pool", summary="Состояние пула соединений с БД")
+async def pool_stats():
+    return pool_status()
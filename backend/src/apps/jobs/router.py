@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.db import get_db
+from src.core.http import cache_control
+from src.core.jobs import get_job
+from src.core.responses import json_response
+from src.core.settings import Settings
+from src.apps.jobs.schemas import JobOut
+
+settings = Settings()
+
+router = APIRouter(dependencies=[Depends(cache_control(settings.ADMIN_CACHE_CONTROL))])
+
+
+@router.get("/{job_id}", response_model=JobOut)
+async def get_job_status(job_id: int, request: Request, db: AsyncSession = Depends(get_db)) -> Response:
+    """
+    Состояние фоновой задачи: статус, попытки, прогресс, результат или последняя ошибка.
+    """
+
+    job = await get_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Задача не найдена")
+    return json_response(request, JobOut, job)
@@ -0,0 +1,33 @@
+from datetime import datetime
+from typing import Any
+
+from src.core.jobs import JobStatus
+from src.apps.products.schemas import CamelModel
+
+
+class JobProgress(CamelModel):
+    """
+    DTO прогресса задачи: `total` неизвестен, пока задача его не сообщила.
+    """
+
+    done: int
+    total: int | None = None
+
+
+class JobOut(CamelModel):
+    """
+    DTO фоновой задачи.
+    """
+
+    id: int
+    kind: str
+    status: JobStatus
+    attempts: int
+    max_attempts: int
+    progress: JobProgress
+    result: dict[str, Any] | None = None
+    last_error: str | None = None
+    run_at: datetime
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
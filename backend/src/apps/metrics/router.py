@@ -0,0 +1,50 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from src.core import metrics
+from src.core.db import pool_status
+from src.apps.products.cache import product_cache
+from src.apps.products.snapshot import catalog_snapshot
+from src.apps.products.taxonomy import taxonomy_snapshot
+
+router = APIRouter()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _pool_lines():
+    pool = pool_status()
+    yield from metrics.gauge("db_pool_size", "Размер пула соединений", pool["size"])
+    yield from metrics.gauge("db_pool_checked_out", "Занятые соединения пула", pool["checked_out"])
+    yield from metrics.gauge("db_pool_overflow", "Соединения сверх размера пула", pool["overflow"])
+    yield from metrics.gauge("db_pool_timeouts", "Таймауты ожидания соединения с запуска", pool["timeouts"])
+    yield from metrics.gauge("db_pool_wait_max_seconds", "Максимальное ожидание соединения", pool["wait_max_ms"] / 1000)
+
+
+def _cache_lines():
+    stats = product_cache.stats()
+    yield from metrics.gauge("product_cache_size", "Записей в кэше товаров", stats["size"])
+    yield from metrics.gauge("product_cache_hits", "Попадания в кэш товаров с запуска", stats["hits"])
+    yield from metrics.gauge("product_cache_misses", "Промахи кэша товаров с запуска", stats["misses"])
+
+
+def _snapshot_lines():
+    stats = catalog_snapshot.stats()
+    if not stats["ready"]:
+        return
+    yield from metrics.gauge("catalog_snapshot_products", "Товаров в снимке каталога", stats["products"])
+    yield from metrics.gauge("catalog_snapshot_bytes", "Объём снимка каталога при загрузке", stats["bytes"])
+    yield from metrics.gauge(
+        "catalog_snapshot_load_seconds", "Длительность последней полной загрузки снимка", stats["load_seconds"],
+    )
+    yield from metrics.gauge("catalog_snapshot_deltas", "Применённых пачек изменений с запуска", stats["deltas"])
+
+
+def _taxonomy_lines():
+    yield from metrics.gauge("taxonomy_builds", "Сборок снимка дерева категорий с запуска", taxonomy_snapshot.builds)
+
+
+@router.get("", summary="Метрики воркера в формате Prometheus", response_class=PlainTextResponse)
+async def prometheus_metrics() -> PlainTextResponse:
+    lines = [*_pool_lines(), *_cache_lines(), *_snapshot_lines(), *_taxonomy_lines()]
+    return PlainTextResponse(metrics.render(lines), media_type=CONTENT_TYPE)
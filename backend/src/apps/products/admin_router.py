@@ -1,56 +1,212 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.core.db import get_db
+from src.core.db import get_db, get_read_db, statement_timeout
+from src.core.http import apply_cache_control, cache_control
+from src.core.jobs import enqueue
+from src.core.responses import JSONBytesResponse, json_response
+from src.core.settings import Settings
+from src.apps.jobs.schemas import JobOut
+from src.apps.products.jobs import REINDEX, enqueue_import
 from src.apps.products.schemas import (
-    CategoryIn, CategoryOut,
-    ProductIn, ProductOut, ProductUpdate,
+    BulkReport, CategoryIn, CategoryOut, ChangeWatermark, ImportReport, ProductChanges,
+    ProductBulkDeleteIn, ProductBulkUpdateIn, ProductIn, ProductOut, ProductPage, ProductUpdate, StoredImageOut,
     TagIn, TagOut,
 )
+from src.apps.products.changes import ChangeFeed
+from src.apps.products.exporter import MEDIA_TYPES, ExportFormat, export_products
+from src.apps.products.images import ImageService
+from src.apps.products.importer import ImportFormat, ProductImporter
 from src.apps.products.service import ProductService
+from src.apps.products.taxonomy import taxonomy_snapshot
 
-router = APIRouter()
+settings = Settings()
+
+router = APIRouter(dependencies=[
+    Depends(cache_control(settings.ADMIN_CACHE_CONTROL)),
+    Depends(statement_timeout(settings.ADMIN_STATEMENT_TIMEOUT_MS)),
+])
 
 
 @router.post("/", response_model=ProductOut)
-async def create_product(payload: ProductIn, db: AsyncSession = Depends(get_db)) -> ProductOut:
+async def create_product(request: Request, payload: ProductIn, db: AsyncSession = Depends(get_db)) -> Response:
     """
     Создание товара.
     """
     
     service = ProductService(db)
     product = await service.create(payload)
-    return ProductOut.model_validate(product, from_attributes=True)
+    return json_response(request, ProductOut, product)
+
+
+@router.post("/bulk", response_model=ImportReport | JobOut)
+async def import_products(
+    request: Request,
+    format: ImportFormat | None = Query(None, description="По умолчанию определяется по Content-Type"),
+    chunk_size: int = Query(1000, ge=1, le=10000, alias="chunkSize"),
+    background: bool = Query(False, description="Импорт фоновой задачей: ответ 202 с задачей"),
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """
+    Массовый импорт товаров из NDJSON или CSV в теле запроса.
+
+    Тело читается потоком и пишется пачками; в ответе — ошибки по строкам и статистика.
+    С `background=true` тело только сохраняется, а импорт выполняет обработчик
+    задач; отчёт появится в результате задачи (GET /api/admin/jobs/{id}).
+    """
+
+    fmt = format or ("csv" if "csv" in request.headers.get("content-type", "") else "ndjson")
+    if background:
+        job = await enqueue_import(db, request.stream(), fmt, chunk_size)
+        return json_response(request, JobOut, job, status_code=202)
+
+    importer = ProductImporter(db, chunk_size=chunk_size)
+    report = await importer.run(request.stream(), fmt)
+    return json_response(request, ImportReport, report)
+
+
+@router.patch("/bulk", response_model=BulkReport)
+async def bulk_update_products(
+    request: Request, payload: ProductBulkUpdateIn, db: AsyncSession = Depends(get_db)
+) -> Response:
+    """
+    Пакетное изменение цены, скидки, остатка и видимости товаров.
+
+    Все изменения применяются в одной транзакции; в ответе — исход по каждому id.
+    """
+
+    service = ProductService(db)
+    report = await service.bulk_update(payload.items)
+    return json_response(request, BulkReport, report)
+
+
+@router.delete("/bulk", response_model=BulkReport)
+async def bulk_delete_products(
+    request: Request, payload: ProductBulkDeleteIn, db: AsyncSession = Depends(get_db)
+) -> Response:
+    """
+    Пакетное удаление товаров в одной транзакции; в ответе — исход по каждому id.
+    """
+
+    service = ProductService(db)
+    report = await service.bulk_delete(payload.ids)
+    return json_response(request, BulkReport, report)
 
 
-@router.get("/", response_model=list[ProductOut])
+@router.post("/images", response_model=StoredImageOut)
+async def upload_image(
+    request: Request,
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """
+    Загрузка изображения товара в хранилище.
+
+    Сохраняет оригинал и уменьшенные копии WebP/AVIF; повторная загрузка того же
+    файла возвращает уже сохранённое. `url` из ответа передаётся в imageUrls товара.
+    """
+    # Весь multipart-запрос Starlette разберёт до ручки, поэтому заведомо большой отсекаем сразу.
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > settings.IMAGE_MAX_BYTES + 64 * 1024:
+        raise HTTPException(status_code=413, detail=f"Файл больше {settings.IMAGE_MAX_BYTES} байт")
+
+    image = await ImageService(db).upload(file)
+    return json_response(request, StoredImageOut, image)
+
+
+@router.get("/", response_model=list[ProductOut] | ProductPage)
 async def list_products(
+    request: Request,
     limit: int = Query(20, ge=1, le=200),
     offset: int = Query(0, ge=0),
-    db: AsyncSession = Depends(get_db),
-) -> list[ProductOut]:
+    cursor: str | None = Query(None, description="Курсор страницы; пустое значение — первая страница"),
+    db: AsyncSession = Depends(get_read_db),
+) -> Response:
     """
     Список товаров с постраничной выборкой.
+
+    Без `cursor` работает по limit/offset, с `cursor` — keyset-страницами с `nextCursor`.
     """
     
     service = ProductService(db)
+    if cursor is not None:
+        items, next_cursor = await service.list_page(limit=limit, cursor=cursor)
+        return json_response(request, ProductPage, {"items": items, "next_cursor": next_cursor})
+
     items = await service.list(limit=limit, offset=offset)
-    return [ProductOut.model_validate(p, from_attributes=True) for p in items]
+    return json_response(request, list[ProductOut], items)
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_catalog(
+    format: ExportFormat = Query("ndjson"),
+    chunk_size: int = Query(2000, ge=100, le=20000, alias="chunkSize"),
+) -> StreamingResponse:
+    """
+    Потоковая выгрузка всего каталога в NDJSON или CSV.
+    """
+
+    return StreamingResponse(
+        export_products(format, chunk_size=chunk_size),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="products.{format}"'},
+    )
+
+
+@router.get("/changes", response_model=ProductChanges)
+async def list_changes(
+    request: Request,
+    since: str | None = Query(None, description="Токен `next` предыдущей страницы; без него — с начала журнала"),
+    limit: int = Query(500, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """
+    Лента созданных, изменённых и удалённых товаров в порядке фиксации.
+
+    Синхронизация повторяет запрос с `since=next`, пока `hasMore`, а затем
+    периодически — получая только новые изменения. Токен старше
+    CHANGES_RETENTION_DAYS получает 410: нужна полная выгрузка.
+    """
+
+    response = JSONBytesResponse(await ChangeFeed(db).page(since, limit))
+    apply_cache_control(request, response)
+    return response
+
+
+@router.get("/changes/watermark", response_model=ChangeWatermark)
+async def changes_watermark(request: Request, db: AsyncSession = Depends(get_db)) -> Response:
+    """
+    Токен текущей головы ленты: берётся перед полной выгрузкой каталога.
+    """
+
+    return json_response(request, ChangeWatermark, {"token": await ChangeFeed(db).watermark()})
+
+
+@router.post("/reindex", response_model=JobOut, status_code=202)
+async def reindex_products(request: Request, db: AsyncSession = Depends(get_db)) -> Response:
+    """
+    Фоновый пересчёт поисковых данных и карточек всех товаров.
+    """
+
+    job = await enqueue(db, REINDEX, {})
+    return json_response(request, JobOut, job, status_code=202)
 
 
 @router.get("/categories", response_model=list[CategoryOut])
-async def list_categories(db: AsyncSession = Depends(get_db)) -> list[CategoryOut]:
+async def list_categories(request: Request) -> Response:
     """
     Получить список категорий с тегами.
+
+    Отдаётся из снимка дерева категорий; ETag — версия снимка.
     """
-    
-    service = ProductService(db)
-    items = await service.list_categories()
-    return [CategoryOut.model_validate(c, from_attributes=True) for c in items]
+
+    taxonomy = await taxonomy_snapshot.get()
+    return taxonomy.tree.to_response(request)
 
 
 @router.post("/categories", response_model=CategoryOut)
-async def create_category(payload: CategoryIn, db: AsyncSession = Depends(get_db)) -> CategoryOut:
+async def create_category(request: Request, payload: CategoryIn, db: AsyncSession = Depends(get_db)) -> Response:
     """
     Создание категории.
     """
@@ -60,11 +216,13 @@ async def create_category(payload: CategoryIn, db: AsyncSession = Depends(get_db
 
     await db.refresh(category, attribute_names=["id", "name", "tags"])
 
-    return CategoryOut.model_validate(category, from_attributes=True)
+    return json_response(request, CategoryOut, category)
 
 
 @router.patch("/categories/{category_id}", response_model=CategoryOut)
-async def update_category(category_id: int, payload: CategoryIn, db: AsyncSession = Depends(get_db)) -> CategoryOut:
+async def update_category(
+    category_id: int, request: Request, payload: CategoryIn, db: AsyncSession = Depends(get_db)
+) -> Response:
     """
     Обновление категории.
     """
@@ -74,7 +232,7 @@ async def update_category(category_id: int, payload: CategoryIn, db: AsyncSessio
 
     await db.refresh(category, attribute_names=["id", "name", "tags"])
 
-    return CategoryOut.model_validate(category, from_attributes=True)
+    return json_response(request, CategoryOut, category)
 
 
 @router.delete("/categories/{category_id}", response_model=dict)
@@ -91,29 +249,28 @@ async def delete_category(category_id: int, db: AsyncSession = Depends(get_db))
 
 
 @router.get("/categories/{category_id}/tags", response_model=list[TagOut])
-async def list_tags_by_category(category_id: int, db: AsyncSession = Depends(get_db)) -> list[TagOut]:
+async def list_tags_by_category(category_id: int, request: Request) -> Response:
     """
-    Получить список тегов по категории.
+    Получить список тегов по категории из снимка дерева категорий.
     """
 
-    service = ProductService(db)
-    items = await service.list_tags_by_category(category_id)
-    return [TagOut.model_validate(t, from_attributes=True) for t in items]
+    taxonomy = await taxonomy_snapshot.get()
+    return taxonomy.category_tags(category_id).to_response(request)
 
 
 @router.post("/tags", response_model=TagOut)
-async def create_tag(payload: TagIn, db: AsyncSession = Depends(get_db)) -> TagOut:
+async def create_tag(request: Request, payload: TagIn, db: AsyncSession = Depends(get_db)) -> Response:
     """
     Создание тега.
     """
 
     service = ProductService(db)
     tag = await service.create_tag(payload.name, payload.category_id)
-    return TagOut.model_validate(tag, from_attributes=True)
+    return json_response(request, TagOut, tag)
 
 
 @router.patch("/tags/{tag_id}", response_model=TagOut)
-async def update_tag(tag_id: int, payload: TagIn, db: AsyncSession = Depends(get_db)) -> TagOut:
+async def update_tag(tag_id: int, request: Request, payload: TagIn, db: AsyncSession = Depends(get_db)) -> Response:
     """
     Обновление тега.
     """
@@ -122,7 +279,7 @@ async def update_tag(tag_id: int, payload: TagIn, db: AsyncSession = Depends(get
     tag = await service.update_tag(tag_id, payload.name)
     if not tag:
         raise HTTPException(status_code=404, detail="Тег не найден")
-    return TagOut.model_validate(tag, from_attributes=True)
+    return json_response(request, TagOut, tag)
 
 
 @router.delete("/tags/{tag_id}", response_model=dict)
@@ -139,7 +296,7 @@ async def delete_tag(tag_id: int, db: AsyncSession = Depends(get_db)) -> dict:
 
 
 @router.get("/{product_id}", response_model=ProductOut)
-async def get_product(product_id: int, db: AsyncSession = Depends(get_db)) -> ProductOut:
+async def get_product(product_id: int, request: Request, db: AsyncSession = Depends(get_read_db)) -> Response:
     """
     Детальная информация о товаре.
     """
@@ -148,15 +305,16 @@ async def get_product(product_id: int, db: AsyncSession = Depends(get_db)) -> Pr
     product = await service.get(product_id)
     if product is None:
         raise HTTPException(status_code=404, detail="Товар не найден")
-    return ProductOut.model_validate(product, from_attributes=True)
+    return json_response(request, ProductOut, product)
 
 
 @router.patch("/{product_id}", response_model=ProductOut)
 async def update_product(
     product_id: int,
+    request: Request,
     payload: ProductUpdate,
     db: AsyncSession = Depends(get_db),
-) -> ProductOut:
+) -> Response:
     """
     Частичное обновление товара.
     """
@@ -165,7 +323,7 @@ async def update_product(
     product = await service.update(product_id, payload)
     if product is None:
         raise HTTPException(status_code=404, detail="Товар не найден")
-    return ProductOut.model_validate(product, from_attributes=True)
+    return json_response(request, ProductOut, product)
 
 
 @router.delete("/{product_id}", response_model=dict)
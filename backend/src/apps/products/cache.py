@@ -0,0 +1,69 @@
+"""
+Кэш сериализованных публичных ответов по товарам.
+
+Карточки лежат под ключом `product:<id>`, страницы списков — под `products:<параметры>`.
+Любое изменение товара сбрасывает его карточку и все списки, изменения категорий
+и тегов (их имена есть в карточках) — весь кэш. Инвалидации расходятся по всем
+воркерам через шину событий.
+"""
+
+from src.core.bus import bus
+from src.core.cache import Cache
+from src.core.settings import Settings
+
+settings = Settings()
+
+product_cache = Cache(
+    "products", bus,
+    maxsize=settings.PRODUCT_CACHE_SIZE,
+    ttl=settings.PRODUCT_CACHE_TTL,
+    settle=settings.READ_AFTER_WRITE_SECONDS if settings.replica_urls else 0.0,
+)
+
+LIST_PREFIX = "products:"
+
+# Ключ карточки в событии — до 22 байт: 300 ключей укладываются в одно сообщение шины.
+_IDS_PER_EVENT = 300
+
+# Больше стольких товаров проще сбросить весь кэш (и перечитать снимок), чем рассылать пачки.
+_MAX_INVALIDATE_IDS = 5000
+
+
+def product_key(product_id: int) -> str:
+    return f"product:{product_id}"
+
+
+def parse_product_key(key: str) -> int | None:
+    """
+    id товара из ключа карточки или None для остальных ключей.
+    """
+    prefix, _, product_id = key.partition(":")
+    return int(product_id) if prefix == "product" and product_id.isdigit() else None
+
+
+def list_key(*parts: object) -> str:
+    return LIST_PREFIX + "|".join(str(p) for p in parts)
+
+
+async def invalidate_products(*product_ids: int) -> None:
+    """
+    Сбрасывает карточки указанных товаров и все страницы списков.
+
+    Событие шины ограничено по размеру, поэтому id рассылаются пачками,
+    а слишком длинный список заменяется сбросом всего кэша.
+    """
+    if len(product_ids) > _MAX_INVALIDATE_IDS:
+        await invalidate_catalog()
+        return
+    for start in range(0, max(len(product_ids), 1), _IDS_PER_EVENT):
+        await product_cache.invalidate(
+            keys=[product_key(pid) for pid in product_ids[start:start + _IDS_PER_EVENT]],
+            prefixes=[LIST_PREFIX],
+        )
+
+
+async def invalidate_catalog() -> None:
+    """
+    Сбрасывает весь кэш товаров.
+    """
+    await product_cache.invalidate(everything=True)
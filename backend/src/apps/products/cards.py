@@ -0,0 +1,230 @@
+"""
+Материализованные карточки товаров (таблица product_cards).
+
+Карточка — готовый JSON ProductOut. ProductService и ReservationService пересобирают
+карточки затронутых товаров в той же транзакции, что и сами изменения, поэтому
+читатель никогда не видит карточку, расходящуюся с закоммиченными данными.
+
+Заполнение и проверка существующих данных:
+
+    python -m src.apps.products.cards backfill
+    python -m src.apps.products.cards check [--fix]
+"""
+
+import argparse
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from datetime import datetime
+from typing import Any, List, NamedTuple
+
+from pydantic_core import to_json
+from sqlalchemy import JSON, ColumnElement, func, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.db import async_session_maker
+from src.apps.products import models
+
+logger = logging.getLogger(__name__)
+
+# Сколько карточек пишется одним INSERT ... ON CONFLICT.
+_WRITE_BATCH = 500
+
+
+def _json_list(element: ColumnElement, order_by: ColumnElement) -> ColumnElement:
+    return func.coalesce(
+        func.json_agg(aggregate_order_by(element, order_by), type_=JSON),
+        func.json_build_array(type_=JSON),
+    )
+
+
+def _tag_json(tag: type[models.Tag]) -> ColumnElement:
+    return func.json_build_object("id", tag.id, "name", tag.name, "categoryId", tag.category_id, type_=JSON)
+
+
+def images_column() -> ColumnElement:
+    """
+    JSON-массив изображений товара в порядке карточки.
+    """
+    image = models.ProductImage
+    return (
+        select(_json_list(
+            func.json_build_object("id", image.id, "url", image.image_url, "variants", image.variants, type_=JSON),
+            image.id,
+        ))
+        .where(image.product_id == models.Product.id)
+        .scalar_subquery()
+    )
+
+
+def card_columns() -> tuple[ColumnElement, ...]:
+    """
+    Колонки карточки в порядке полей ProductOut.
+    """
+    product, tag, category = models.Product, models.Tag, models.Category
+
+    images = images_column()
+    tags = (
+        select(_json_list(_tag_json(tag), tag.id))
+        .join(models.ProductTag, models.ProductTag.tag_id == tag.id)
+        .where(models.ProductTag.product_id == product.id)
+        .scalar_subquery()
+    )
+    category_tags = (
+        select(_json_list(_tag_json(tag), tag.id))
+        .where(tag.category_id == category.id)
+        .scalar_subquery()
+    )
+    category_card = (
+        select(func.json_build_object("id", category.id, "name", category.name, "tags", category_tags, type_=JSON))
+        .where(category.id == product.category_id)
+        .scalar_subquery()
+    )
+
+    return (
+        product.id, product.name, product.description, product.size,
+        product.price, product.discount_price, product.main_image_url,
+        product.is_active, product.stock,
+        category_card.label("category"),
+        images.label("images"),
+        tags.label("tags"),
+        product.created_at, product.updated_at,
+    )
+
+
+_FIELDS = (
+    "id", "name", "description", "size", "price", "discountPrice", "mainImageUrl",
+    "isActive", "stock", "category", "images", "tags", "createdAt", "updatedAt",
+)
+
+
+class Card(NamedTuple):
+    """
+    Сериализованная карточка товара и её версия для ETag.
+    """
+
+    id: int
+    updated_at: datetime
+    json: bytes
+
+
+def build_card(row) -> Card:
+    """
+    Карточка из строки с колонками card_columns().
+    """
+    data: dict[str, Any] = dict(zip(_FIELDS, row))
+    return Card(data["id"], data["updatedAt"], to_json(data))
+
+
+def cards_json(cards: List[Card]) -> bytes:
+    return b"[" + b",".join(card.json for card in cards) + b"]"
+
+
+def page_json(cards: List[Card], next_cursor: str | None) -> bytes:
+    return b'{"items":' + cards_json(cards) + b',"nextCursor":' + to_json(next_cursor) + b"}"
+
+
+async def build_cards(session: AsyncSession, condition: ColumnElement[bool]) -> List[Card]:
+    """
+    Собирает карточки товаров по условию из исходных таблиц.
+    """
+    result = await session.execute(select(*card_columns()).where(condition))
+    return [build_card(row) for row in result]
+
+
+async def rebuild_cards(session: AsyncSession, condition: ColumnElement[bool]) -> int:
+    """
+    Пересобирает карточки товаров, подходящих под условие, в текущей транзакции.
+    """
+    cards = await build_cards(session, condition)
+    for start in range(0, len(cards), _WRITE_BATCH):
+        stmt = insert(models.ProductCard)
+        await session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[models.ProductCard.product_id],
+                set_={"card": stmt.excluded.card, "built_at": func.now()},
+            ),
+            [{"product_id": card.id, "card": card.json.decode()} for card in cards[start:start + _WRITE_BATCH]],
+        )
+    return len(cards)
+
+
+async def _id_batches(session: AsyncSession, batch_size: int) -> AsyncIterator[List[int]]:
+    last_id = 0
+    while True:
+        ids = list(await session.scalars(
+            select(models.Product.id)
+            .where(models.Product.id > last_id)
+            .order_by(models.Product.id)
+            .limit(batch_size)
+        ))
+        if not ids:
+            return
+        yield ids
+        last_id = ids[-1]
+
+
+async def backfill(batch_size: int = 1000) -> int:
+    """
+    Пересобирает карточки всех товаров, коммитя каждую пачку отдельно.
+    """
+    total = 0
+    async with async_session_maker() as session:
+        async for ids in _id_batches(session, batch_size):
+            total += await rebuild_cards(session, models.Product.id.in_(ids))
+            await session.commit()
+            logger.info("Карточек пересобрано: %d", total)
+    return total
+
+
+async def check(batch_size: int = 1000, fix: bool = False) -> dict[str, List[int]]:
+    """
+    Сравнивает сохранённые карточки со свежесобранными. Возвращает id товаров
+    без карточки и с устаревшей карточкой; с `fix` пересобирает их.
+    """
+    missing: List[int] = []
+    stale: List[int] = []
+    async with async_session_maker() as session:
+        async for ids in _id_batches(session, batch_size):
+            result = await session.execute(
+                select(models.ProductCard.product_id, models.ProductCard.card)
+                .where(models.ProductCard.product_id.in_(ids))
+            )
+            stored = dict(result.tuples().all())
+            for card in await build_cards(session, models.Product.id.in_(ids)):
+                if card.id not in stored:
+                    missing.append(card.id)
+                elif stored[card.id].encode() != card.json:
+                    stale.append(card.id)
+
+        broken = missing + stale
+        if fix and broken:
+            for start in range(0, len(broken), batch_size):
+                await rebuild_cards(session, models.Product.id.in_(broken[start:start + batch_size]))
+            await session.commit()
+    return {"missing": missing, "stale": stale}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Материализованные карточки товаров")
+    parser.add_argument("command", choices=["backfill", "check"])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--fix", action="store_true", help="check: пересобрать расходящиеся карточки")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.command == "backfill":
+        total = asyncio.run(backfill(args.batch_size))
+        print(f"Карточек пересобрано: {total}")
+        return
+
+    report = asyncio.run(check(args.batch_size, fix=args.fix))
+    for kind, ids in report.items():
+        print(f"{kind}: {len(ids)}" + (f" {ids[:20]}" if ids else ""))
+    if any(report.values()) and not args.fix:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends, Request, Response
+
+from src.core.http import cache_control
+from src.core.settings import Settings
+from src.apps.products.schemas import CategoryOut
+from src.apps.products.taxonomy import taxonomy_snapshot
+
+settings = Settings()
+
+router = APIRouter(dependencies=[Depends(cache_control(settings.PUBLIC_CACHE_CONTROL))])
+
+
+@router.get("/", response_model=list[CategoryOut])
+async def list_categories(request: Request) -> Response:
+    """
+    Всё дерево категорий с тегами одним ответом.
+
+    Тело готово заранее и меняется только при изменении категорий и тегов;
+    ETag — версия дерева, условный запрос с ней получает 304.
+    """
+    taxonomy = await taxonomy_snapshot.get()
+    return taxonomy.tree.to_response(request)
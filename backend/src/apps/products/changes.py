@@ -0,0 +1,152 @@
+"""
+Лента изменений товаров для синхронизации маркетплейсов и поиска.
+
+ProductService и ReservationService пишут в product_changes строку на каждый
+созданный, изменённый и удалённый товар в той же транзакции, что и само
+изменение. Порядок ленты — (txid, id), где txid — номер транзакции записи.
+
+Номера транзакций выдаются при старте, а фиксируются они в другом порядке,
+поэтому лента отдаёт только строки транзакций младше xmin текущего снимка:
+все они уже завершены, и позже перед ними ничего не появится. Токен ленты —
+позиция последней отданной строки; клиент передаёт его в следующий запрос
+и получает только то, что изменилось после.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from typing import Literal
+
+from pydantic_core import to_json
+from sqlalchemy import ColumnElement, delete, func, insert, literal, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.db import async_session_maker
+from src.core.exceptions import AppException
+from src.core.pagination import decode_cursor, encode_cursor
+from src.core.settings import Settings
+from src.apps.products import models
+
+logger = logging.getLogger(__name__)
+
+settings = Settings()
+
+ChangeOp = Literal["created", "updated", "deleted"]
+
+# id позиции «после всех строк транзакции»: токен головы ленты.
+_LAST_ID = 2**63 - 1
+
+_PRUNE_BATCH = 10000
+
+
+async def record_changes(session: AsyncSession, op: ChangeOp, condition: ColumnElement[bool]) -> None:
+    """
+    Записывает в журнал товары, подходящие под условие, одним INSERT ... SELECT
+    в текущей транзакции. Удаление записывается до DELETE самих товаров.
+    """
+    await session.execute(
+        insert(models.ProductChange).from_select(
+            ["product_id", "op"],
+            select(models.Product.id, literal(op)).where(condition),
+        )
+    )
+
+
+def _token(txid: int, change_id: int) -> str:
+    return encode_cursor(txid, change_id, int(time.time()))
+
+
+def _parse_token(token: str) -> tuple[int, int]:
+    txid, change_id, issued_at = decode_cursor(token, 3)
+    if not all(isinstance(v, int) for v in (txid, change_id, issued_at)):
+        raise AppException("Некорректный токен", status_code=400)
+    if issued_at < time.time() - settings.CHANGES_RETENTION_DAYS * 86400:
+        raise AppException("Токен старше журнала изменений, нужна полная выгрузка", status_code=410)
+    return txid, change_id
+
+
+class ChangeFeed:
+    """
+    Чтение журнала изменений. Работает только с основной БД: номера
+    транзакций и снимки реплики для этого не годятся.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def _xmin(self) -> int:
+        return await self.session.scalar(text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint"))
+
+    async def watermark(self) -> str:
+        """
+        Токен текущей головы ленты: всё, что зафиксировано до сих пор, считается прочитанным.
+        Берётся перед полной выгрузкой каталога, чтобы потом читать изменения с этого места.
+        """
+        return _token(await self._xmin() - 1, _LAST_ID)
+
+    async def page(self, since: str | None, limit: int) -> bytes:
+        """
+        Изменения после токена `since` (без него — с начала журнала) в порядке
+        фиксации. В `product` — текущая карточка товара или null, если его уже нет.
+        """
+        txid, change_id = _parse_token(since) if since else (0, 0)
+        xmin = await self._xmin()
+        change = models.ProductChange
+        result = await self.session.execute(
+            select(change.txid, change.id, change.product_id, change.op, change.changed_at, models.ProductCard.card)
+            .outerjoin(models.ProductCard, models.ProductCard.product_id == change.product_id)
+            .where(tuple_(change.txid, change.id) > tuple_(txid, change_id), change.txid < xmin)
+            .order_by(change.txid, change.id)
+            .limit(limit + 1)
+        )
+        rows = result.all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        # Страница не последняя — продолжаем с её конца; иначе прочитано всё до xmin.
+        next_token = _token(rows[-1].txid, rows[-1].id) if has_more else _token(xmin - 1, _LAST_ID)
+
+        items = [
+            to_json({"productId": row.product_id, "op": row.op, "changedAt": row.changed_at})[:-1]
+            + b',"product":' + (row.card.encode() if row.card is not None else b"null") + b"}"
+            for row in rows
+        ]
+        return (
+            b'{"items":[' + b",".join(items) + b'],"next":' + to_json(next_token)
+            + b',"hasMore":' + to_json(has_more) + b"}"
+        )
+
+
+async def prune_changes(retention_days: int) -> int:
+    """
+    Удаляет из журнала записи старше `retention_days` пачками.
+    """
+    change = models.ProductChange
+    total = 0
+    async with async_session_maker() as session:
+        while True:
+            expired = (
+                select(change.id)
+                .where(change.changed_at < func.now() - timedelta(days=retention_days))
+                .limit(_PRUNE_BATCH)
+            )
+            result = await session.execute(delete(change).where(change.id.in_(expired.scalar_subquery())))
+            await session.commit()
+            total += result.rowcount
+            if result.rowcount < _PRUNE_BATCH:
+                return total
+
+
+async def run_changes_pruner(interval: float) -> None:
+    """
+    Фоновая задача воркера: периодически чистит журнал изменений.
+    Запускается из main.lifespan.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            removed = await prune_changes(settings.CHANGES_RETENTION_DAYS)
+            if removed:
+                logger.info("Из журнала изменений удалено %d записей", removed)
+        except Exception:
+            logger.exception("Не удалось почистить журнал изменений")
@@ -0,0 +1,127 @@
+import csv
+import io
+from collections import defaultdict
+from collections.abc import AsyncIterator, Sequence
+from typing import Any, Literal
+
+from pydantic_core import to_json
+from sqlalchemy import Row, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.db import async_session_maker, set_statement_timeout
+from src.apps.products import models
+
+ExportFormat = Literal["ndjson", "csv"]
+
+# Колонки совпадают с форматом импорта, поэтому выгрузку можно загрузить обратно.
+COLUMNS = (
+    "id", "name", "description", "size", "price", "discountPrice", "mainImageUrl",
+    "isActive", "stock", "categoryId", "categoryName", "tagIds", "tagNames", "imageUrls",
+    "createdAt", "updatedAt",
+)
+
+MEDIA_TYPES: dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+async def export_products(fmt: ExportFormat, chunk_size: int = 2000) -> AsyncIterator[bytes]:
+    """
+    Выгрузка всего каталога серверным курсором.
+
+    Открывает собственную сессию: зависимость get_db закрывается до того,
+    как начнёт отдаваться потоковый ответ. Связи догружаются одним запросом
+    на пачку, в памяти держится только текущая пачка.
+    """
+    product = models.Product
+    async with async_session_maker() as session:
+        # Выгрузка — одна долгая транзакция с серверным курсором.
+        await set_statement_timeout(session, 0)
+        result = await session.execute(select(models.Category.id, models.Category.name))
+        categories = dict(result.tuples().all())
+
+        if fmt == "csv":
+            yield _csv_line(COLUMNS)
+
+        stream = await session.stream(
+            select(
+                product.id, product.name, product.description, product.size,
+                product.price, product.discount_price, product.main_image_url,
+                product.is_active, product.stock, product.category_id,
+                product.created_at, product.updated_at,
+            )
+            .order_by(product.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        async for partition in stream.partitions():
+            records = await _records(session, partition, categories)
+            if fmt == "csv":
+                yield b"".join(_csv_line(_flatten(r)) for r in records)
+            else:
+                yield b"".join(to_json(r) + b"\n" for r in records)
+
+
+async def _records(
+    session: AsyncSession, rows: Sequence[Row], categories: dict[int, str]
+) -> list[dict[str, Any]]:
+    ids = [row.id for row in rows]
+
+    images: dict[int, list[str]] = defaultdict(list)
+    result = await session.execute(
+        select(models.ProductImage.product_id, models.ProductImage.image_url)
+        .where(models.ProductImage.product_id.in_(ids))
+        .order_by(models.ProductImage.id)
+    )
+    for product_id, url in result:
+        images[product_id].append(url)
+
+    tags: dict[int, list[tuple[int, str]]] = defaultdict(list)
+    result = await session.execute(
+        select(models.ProductTag.product_id, models.Tag.id, models.Tag.name)
+        .join(models.Tag, models.Tag.id == models.ProductTag.tag_id)
+        .where(models.ProductTag.product_id.in_(ids))
+        .order_by(models.Tag.id)
+    )
+    for product_id, tag_id, tag_name in result:
+        tags[product_id].append((tag_id, tag_name))
+
+    return [
+        {
+            "id": row.id,
+            "name": row.name,
+            "description": row.description,
+            "size": row.size,
+            "price": row.price,
+            "discountPrice": row.discount_price,
+            "mainImageUrl": row.main_image_url,
+            "isActive": row.is_active,
+            "stock": row.stock,
+            "categoryId": row.category_id,
+            "categoryName": categories.get(row.category_id),
+            "tagIds": [t[0] for t in tags[row.id]],
+            "tagNames": [t[1] for t in tags[row.id]],
+            "imageUrls": images[row.id],
+            "createdAt": row.created_at,
+            "updatedAt": row.updated_at,
+        }
+        for row in rows
+    ]
+
+
+def _flatten(record: dict[str, Any]) -> list[Any]:
+    values = []
+    for column in COLUMNS:
+        value = record[column]
+        if isinstance(value, list):
+            value = "|".join(str(v) for v in value)
+        elif hasattr(value, "isoformat"):
+            value = value.isoformat()
+        values.append("" if value is None else value)
+    return values
+
+
+def _csv_line(values: Sequence[Any]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerow(values)
+    return buffer.getvalue().encode()
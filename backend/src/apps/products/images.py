@@ -0,0 +1,111 @@
+"""
+Загрузка изображений товаров в объектное хранилище.
+
+Файл из multipart-запроса копируется частями во временный файл с подсчётом
+sha256 и целиком в памяти не держится. Объекты адресуются хэшем содержимого:
+
+    images/<hash[:2]>/<hash>/original.<ext>
+    images/<hash[:2]>/<hash>/<width>.<format>
+
+поэтому повторная загрузка того же файла сразу возвращает сохранённое
+изображение. Уменьшенные копии считаются в пуле процессов (core.imaging).
+URL из ответа передаётся в imageUrls товара, и ProductService переносит
+копии в product_images.variants, откуда они попадают в карточки.
+"""
+
+import asyncio
+import hashlib
+import tempfile
+from typing import IO
+
+from fastapi import UploadFile
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core import imaging
+from src.core.exceptions import AppException
+from src.core.settings import Settings
+from src.core.storage import storage
+from src.apps.products import models
+
+settings = Settings()
+
+_CHUNK = 1024 * 1024
+
+
+class ImageService:
+    """
+    Сервис загрузки изображений.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def upload(self, upload: UploadFile) -> models.StoredImage:
+        """
+        Сохраняет изображение и его копии или возвращает уже загруженное с тем же содержимым.
+        """
+        with tempfile.NamedTemporaryFile(prefix="upload-") as spool:
+            digest, size = await self._spool(upload, spool)
+            existing = await self.session.get(models.StoredImage, digest)
+            if existing is not None:
+                return existing
+
+            try:
+                rendered = await imaging.render(
+                    spool.name,
+                    settings.image_variant_widths,
+                    imaging.supported_formats(settings.image_variant_formats),
+                    settings.IMAGE_MAX_PIXELS,
+                    settings.IMAGE_WORKERS,
+                )
+            except ValueError as exc:
+                raise AppException(str(exc), status_code=422)
+
+            base = f"images/{digest[:2]}/{digest}"
+            extension, content_type = imaging.ORIGINAL_TYPES[rendered.format]
+            original_key = f"{base}/original.{extension}"
+            variant_keys = [f"{base}/{v.width}.{v.format}" for v in rendered.variants]
+            await asyncio.gather(
+                storage.put_file(original_key, spool.name, content_type),
+                *(
+                    storage.put_bytes(key, v.data, imaging.VARIANT_TYPES[v.format][1])
+                    for key, v in zip(variant_keys, rendered.variants)
+                ),
+            )
+
+        await self.session.execute(
+            insert(models.StoredImage)
+            .values(
+                content_hash=digest,
+                url=storage.url(original_key),
+                content_type=content_type,
+                size=size,
+                width=rendered.width,
+                height=rendered.height,
+                variants=[
+                    {"url": storage.url(key), "width": v.width, "format": v.format}
+                    for key, v in zip(variant_keys, rendered.variants)
+                ],
+            )
+            .on_conflict_do_nothing(index_elements=[models.StoredImage.content_hash])
+        )
+        await self.session.commit()
+        return await self.session.get(models.StoredImage, digest)
+
+    async def _spool(self, upload: UploadFile, spool: IO[bytes]) -> tuple[str, int]:
+        """
+        Копирует загрузку во временный файл. Возвращает sha256 и размер.
+        """
+        hasher = hashlib.sha256()
+        size = 0
+        while chunk := await upload.read(_CHUNK):
+            size += len(chunk)
+            if size > settings.IMAGE_MAX_BYTES:
+                raise AppException(f"Файл больше {settings.IMAGE_MAX_BYTES} байт", status_code=413)
+            hasher.update(chunk)
+            await asyncio.to_thread(spool.write, chunk)
+        if not size:
+            raise AppException("Пустой файл", status_code=422)
+        spool.flush()
+        return hasher.hexdigest(), size
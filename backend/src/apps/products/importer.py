@@ -0,0 +1,165 @@
+import json
+import logging
+import time
+from collections.abc import AsyncIterable, AsyncIterator
+from typing import Any, Literal
+
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.streaming import batched, iter_csv, iter_lines
+from src.apps.products import models, schemas
+from src.apps.products.service import ProductService
+
+logger = logging.getLogger(__name__)
+
+ImportFormat = Literal["ndjson", "csv"]
+
+# Списочные колонки CSV: значения разделяются вертикальной чертой.
+_CSV_LISTS = {"tagIds", "tag_ids", "imageUrls", "image_urls"}
+
+
+class ProductImporter:
+    """
+    Потоковый импорт товаров из NDJSON или CSV.
+
+    Тело читается построчно, строки валидируются и пишутся пачками по
+    `chunk_size`, каждая пачка — отдельной транзакцией. В памяти держится
+    только текущая пачка и ограниченный список ошибок.
+    """
+
+    MAX_ERRORS = 1000
+
+    def __init__(self, session: AsyncSession, chunk_size: int = 1000):
+        self.session = session
+        self.service = ProductService(session)
+        self.chunk_size = chunk_size
+        self.report = schemas.ImportReport()
+        self._category_ids: set[int] = set()
+        self._tag_ids: set[int] = set()
+
+    async def run(self, chunks: AsyncIterable[bytes], fmt: ImportFormat) -> schemas.ImportReport:
+        started = time.perf_counter()
+        await self._load_references()
+
+        report = self.report
+        records = self._records(iter_lines(chunks), fmt)
+        try:
+            async for batch in batched(records, self.chunk_size):
+                await self._import_batch(batch)
+        except Exception:
+            # Записанные пачки уже зафиксированы: отчёт о них нужнее, чем 500.
+            logger.exception("Импорт товаров прерван после %d строк", report.total)
+            await self.session.rollback()
+            report.aborted = True
+
+        report.elapsed_seconds = round(time.perf_counter() - started, 3)
+        if report.elapsed_seconds:
+            report.rows_per_second = round(report.total / report.elapsed_seconds, 1)
+        return report
+
+    async def _load_references(self) -> None:
+        """
+        Категории и теги проверяются по памяти, чтобы ошибка внешнего ключа
+        в одной строке не откатывала всю пачку.
+        """
+        result = await self.session.execute(select(models.Category.id))
+        self._category_ids = set(result.scalars())
+        result = await self.session.execute(select(models.Tag.id))
+        self._tag_ids = set(result.scalars())
+
+    async def _records(self, lines: AsyncIterable[str], fmt: ImportFormat) -> AsyncIterator[tuple[int, Any]]:
+        if fmt == "csv":
+            async for line_no, row in iter_csv(lines):
+                yield line_no, _from_csv(row)
+            return
+
+        line_no = 0
+        async for line in lines:
+            line_no += 1
+            if not line.strip():
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except ValueError as exc:
+                yield line_no, exc
+
+    async def _import_batch(self, batch: list[tuple[int, Any]]) -> None:
+        self.report.total += len(batch)
+
+        lines, items = [], []
+        for line_no, raw in batch:
+            item = self._validate(line_no, raw)
+            if item is not None:
+                lines.append(line_no)
+                items.append(item)
+
+        try:
+            ids = await self.service.bulk_create(items)
+        except SQLAlchemyError as exc:
+            await self.session.rollback()
+            message = str(getattr(exc, "orig", None) or exc).splitlines()[0]
+            for line_no in lines:
+                self._fail(line_no, message)
+            return
+
+        self.report.created += len(items)
+        if not ids:
+            return
+        try:
+            await self.service.publish_created(ids, items)
+        except Exception:
+            # Пачка уже записана: сбой рассылки не делает её строки ошибочными.
+            logger.exception("Не удалось разослать %d импортированных товаров", len(ids))
+
+    def _validate(self, line_no: int, raw: Any) -> schemas.ProductIn | None:
+        if isinstance(raw, Exception):
+            self._fail(line_no, f"Некорректный JSON: {raw}")
+            return None
+
+        try:
+            item = schemas.ProductIn.model_validate(raw)
+        except ValidationError as exc:
+            errors = "; ".join(
+                f"{'.'.join(str(p) for p in e['loc']) or 'row'}: {e['msg']}" for e in exc.errors()
+            )
+            self._fail(line_no, errors)
+            return None
+
+        if item.category_id is not None and item.category_id not in self._category_ids:
+            self._fail(line_no, f"Категория {item.category_id} не найдена")
+            return None
+        unknown = set(item.tag_ids) - self._tag_ids
+        if unknown:
+            self._fail(line_no, f"Теги не найдены: {sorted(unknown)}")
+            return None
+        return item
+
+    def _fail(self, line_no: int, message: str) -> None:
+        report = self.report
+        report.failed += 1
+        if len(report.errors) < self.MAX_ERRORS:
+            report.errors.append(schemas.ImportRowError(line=line_no, error=message))
+        else:
+            report.errors_truncated = True
+
+
+def _from_csv(row: dict[str, str]) -> dict[str, Any]:
+    """
+    Строка CSV в данные для ProductIn: пустые ячейки — значения по умолчанию,
+    списки — через `|`.
+    """
+    data: dict[str, Any] = {}
+    for key, value in row.items():
+        if key is None or value is None:
+            continue
+        value = value.strip()
+        if not value:
+            continue
+        if key in _CSV_LISTS:
+            data[key] = [v.strip() for v in value.split("|") if v.strip()]
+        else:
+            data[key] = value
+    return data
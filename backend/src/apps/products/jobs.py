@@ -0,0 +1,156 @@
+"""
+Фоновые задачи каталога: импорт большого файла и переиндексация товаров.
+
+Тело импорта сначала целиком сохраняется в закрытое хранилище под случайным
+ключом imports/<uuid>, задача читает его оттуда и удаляет по завершении.
+Тела, оставшиеся без задачи (её сняли как брошенную или не удалось поставить
+в очередь), удаляет run_imports_pruner.
+"""
+
+import asyncio
+import logging
+import os
+import tempfile
+from collections.abc import AsyncIterable, AsyncIterator
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.db import async_session_maker
+from src.core.jobs import Job, JobContext, enqueue, job
+from src.core.settings import Settings
+from src.core.storage import private_storage
+from src.apps.products import models
+from src.apps.products.cache import invalidate_catalog
+from src.apps.products.importer import ImportFormat, ProductImporter
+from src.apps.products.service import ProductService
+
+logger = logging.getLogger(__name__)
+
+settings = Settings()
+
+IMPORT = "products.import"
+REINDEX = "products.reindex"
+
+_IMPORTS_PREFIX = "imports/"
+
+_CHUNK = 1024 * 1024
+
+_CONTENT_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+async def enqueue_import(
+    session: AsyncSession, chunks: AsyncIterable[bytes], fmt: ImportFormat, chunk_size: int
+) -> Job:
+    """
+    Сохраняет тело импорта в закрытое хранилище и ставит задачу products.import.
+    """
+    key = f"{_IMPORTS_PREFIX}{uuid4().hex}.{fmt}"
+    with tempfile.NamedTemporaryFile(prefix="import-") as spool:
+        size = 0
+        async for chunk in chunks:
+            size += len(chunk)
+            await asyncio.to_thread(spool.write, chunk)
+        spool.flush()
+        await private_storage.put_file(key, spool.name, _CONTENT_TYPES[fmt])
+    return await enqueue(session, IMPORT, {"key": key, "format": fmt, "chunkSize": chunk_size, "size": size})
+
+
+async def _read(path: str, size: int, ctx: JobContext) -> AsyncIterator[bytes]:
+    """
+    Файл частями; прогресс задачи — прочитанные байты.
+    """
+    done = 0
+    with open(path, "rb") as f:
+        while chunk := await asyncio.to_thread(f.read, _CHUNK):
+            done += len(chunk)
+            await ctx.progress(done, size)
+            yield chunk
+
+
+# Повтор импорта создал бы уже записанные пачки заново, поэтому попытка одна.
+@job(IMPORT, max_attempts=1)
+async def import_products(ctx: JobContext) -> dict:
+    key = ctx.payload["key"]
+    try:
+        with tempfile.NamedTemporaryFile(prefix="import-") as spool:
+            await private_storage.get_file(key, spool.name)
+            size = os.path.getsize(spool.name)
+            async with async_session_maker() as session:
+                importer = ProductImporter(session, chunk_size=ctx.payload["chunkSize"])
+                report = await importer.run(_read(spool.name, size, ctx), ctx.payload["format"])
+            await ctx.progress(size, size, force=True)
+    except asyncio.CancelledError:
+        # Остановка обработчика: тело остаётся до решения о задаче, потом его удалит run_imports_pruner.
+        raise
+    except Exception:
+        # Попытка единственная, ошибка окончательная.
+        await private_storage.delete(key)
+        raise
+    await private_storage.delete(key)
+    return report.model_dump(mode="json", by_alias=True)
+
+
+@job(REINDEX)
+async def reindex_products(ctx: JobContext) -> dict:
+    """
+    Пересчитывает поисковые имена тегов и карточки всех товаров пачками,
+    каждая пачка — отдельной транзакцией. Повтор безопасен: пересчёт идемпотентен.
+    """
+    batch_size = ctx.payload.get("batchSize", 1000)
+    async with async_session_maker() as session:
+        service = ProductService(session)
+        total = await session.scalar(select(func.count()).select_from(models.Product))
+        await ctx.progress(0, total, force=True)
+        done, last_id = 0, 0
+        while ids := list(await session.scalars(
+            select(models.Product.id)
+            .where(models.Product.id > last_id)
+            .order_by(models.Product.id)
+            .limit(batch_size)
+        )):
+            await service.reindex(models.Product.id.in_(ids))
+            await session.commit()
+            done += len(ids)
+            last_id = ids[-1]
+            await ctx.progress(done, total)
+    await ctx.progress(done, total, force=True)
+    await invalidate_catalog()
+    return {"products": done}
+
+
+async def prune_imports(max_age: float) -> int:
+    """
+    Удаляет тела импортов старше `max_age` секунд, на которые не ссылается
+    ни одна ожидающая или выполняемая задача. Свежие не трогаются: задача
+    для только что загруженного тела может быть ещё не закоммичена.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=max_age)
+    async with async_session_maker() as session:
+        pending = set(await session.scalars(
+            select(Job.payload["key"].as_string())
+            .where(Job.kind == IMPORT, Job.status.in_(("queued", "running")))
+        ))
+    removed = 0
+    for key, modified in await private_storage.list_keys(_IMPORTS_PREFIX):
+        if modified < cutoff and key not in pending:
+            await private_storage.delete(key)
+            removed += 1
+    return removed
+
+
+async def run_imports_pruner(interval: float) -> None:
+    """
+    Фоновая задача воркера: периодически удаляет тела импортов без задачи.
+    Запускается из main.lifespan.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            removed = await prune_imports(settings.JOBS_IMPORTS_ORPHAN_SECONDS)
+            if removed:
+                logger.info("Удалено тел импорта без задачи: %d", removed)
+        except Exception:
+            logger.exception("Не удалось удалить тела импорта без задачи")
@@ -1,10 +1,22 @@
 from datetime import datetime
-from sqlalchemy import String, Integer, Numeric, Boolean, ForeignKey, DateTime
+from uuid import UUID, uuid4
+from sqlalchemy import (
+    JSON, BigInteger, String, Integer, Numeric, Boolean, ForeignKey, DateTime, Index, Text, Uuid, Computed, func, text, true,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from decimal import Decimal
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.core.db import Base
 
+# Поисковый вектор: имя важнее тегов, теги важнее описания.
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('russian'::regconfig, coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('russian'::regconfig, coalesce(search_tags, '')), 'B') || "
+    "setweight(to_tsvector('russian'::regconfig, coalesce(description, '')), 'C')"
+)
+
 
 class Product(Base):
     __tablename__ = "products"
@@ -27,9 +39,38 @@ class Product(Base):
         DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
     )
 
+    # Имена тегов через пробел для поиска; поддерживает ProductService.
+    search_tags: Mapped[str | None] = mapped_column(String, nullable=True, deferred=True)
+    search_vector = mapped_column(TSVECTOR, Computed(SEARCH_VECTOR, persisted=True), deferred=True)
+
     category = relationship("Category", back_populates="products")
-    images = relationship("ProductImage", back_populates="product", cascade="all, delete")
-    tags = relationship("Tag", secondary="product_tags", back_populates="products")
+    # Порядок по id — тот же, что в карточках product_cards и ProductReader.
+    images = relationship("ProductImage", back_populates="product", cascade="all, delete", order_by="ProductImage.id")
+    tags = relationship("Tag", secondary="product_tags", back_populates="products", order_by="Tag.id")
+
+    @hybrid_property
+    def effective_price(self) -> Decimal:
+        """
+        Цена с учётом скидки.
+        """
+        return self.discount_price if self.discount_price is not None else self.price
+
+    @effective_price.inplace.expression
+    @classmethod
+    def _effective_price_expression(cls):
+        return func.coalesce(cls.discount_price, cls.price)
+
+    @hybrid_property
+    def discount_amount(self) -> Decimal:
+        """
+        Размер скидки в деньгах.
+        """
+        return self.price - self.effective_price
+
+    @discount_amount.inplace.expression
+    @classmethod
+    def _discount_amount_expression(cls):
+        return cls.price - func.coalesce(cls.discount_price, cls.price)
 
 
 class Category(Base):
@@ -39,7 +80,7 @@ class Category(Base):
     name: Mapped[str] = mapped_column(String(100), unique=True, nullable=False)
 
     products = relationship("Product", back_populates="category")
-    tags = relationship("Tag", back_populates="category", cascade="all, delete-orphan")
+    tags = relationship("Tag", back_populates="category", cascade="all, delete-orphan", order_by="Tag.id")
 
 
 class Tag(Base):
@@ -59,12 +100,110 @@ class ProductImage(Base):
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     product_id: Mapped[int] = mapped_column(ForeignKey("products.id"))
     image_url: Mapped[str] = mapped_column(String, nullable=False)
+    # Уменьшенные копии [{"url", "width", "format"}], если изображение загружено через API.
+    variants: Mapped[list] = mapped_column(JSON, nullable=False, server_default=text("'[]'"))
 
     product = relationship("Product", back_populates="images")
 
 
+class StoredImage(Base):
+    """
+    Загруженное изображение, адресуемое sha256 содержимого: повторная
+    загрузка того же файла не создаёт новых объектов в хранилище.
+    """
+
+    __tablename__ = "stored_images"
+
+    content_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    url: Mapped[str] = mapped_column(String, nullable=False, unique=True)
+    content_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+    width: Mapped[int] = mapped_column(Integer, nullable=False)
+    height: Mapped[int] = mapped_column(Integer, nullable=False)
+    variants: Mapped[list] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
 class ProductTag(Base):
     __tablename__ = "product_tags"
 
     product_id: Mapped[int] = mapped_column(ForeignKey("products.id"), primary_key=True)
-    tag_id: Mapped[int] = mapped_column(ForeignKey("tags.id"), primary_key=True)
\ No newline at end of file
+    tag_id: Mapped[int] = mapped_column(ForeignKey("tags.id"), primary_key=True)
+
+
+class StockReservation(Base):
+    __tablename__ = "stock_reservations"
+
+    id: Mapped[UUID] = mapped_column(Uuid, primary_key=True, default=uuid4)
+    product_id: Mapped[int] = mapped_column(ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    quantity: Mapped[int] = mapped_column(Integer, nullable=False)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default="active")
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class ProductCard(Base):
+    """
+    Готовая публичная карточка товара: JSON в формате ProductOut.
+    Пересобирается ProductService в той же транзакции, что и изменения товара.
+    """
+
+    __tablename__ = "product_cards"
+
+    product_id: Mapped[int] = mapped_column(ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    card: Mapped[str] = mapped_column(Text, nullable=False)
+    built_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class ProductChange(Base):
+    """
+    Журнал изменений товаров для синхронизации внешних систем. Строка пишется
+    в той же транзакции, что и изменение; txid — номер этой транзакции
+    (pg_current_xact_id), по нему и id журнал читается по порядку фиксации.
+    """
+
+    __tablename__ = "product_changes"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    txid: Mapped[int] = mapped_column(
+        BigInteger, server_default=text("pg_current_xact_id()::text::bigint"), nullable=False
+    )
+    product_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    op: Mapped[str] = mapped_column(String(16), nullable=False)
+    changed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+# Индексы каталога: выражения должны совпадать с теми, что строит ProductService,
+# иначе планировщик их не использует.
+_active = Product.is_active.is_(true())
+
+Index("ix_products_category_id", Product.category_id)
+Index("ix_products_active_id", Product.id, postgresql_where=_active)
+Index("ix_products_active_category", Product.category_id, Product.id, postgresql_where=_active)
+Index("ix_products_active_price", Product.effective_price, Product.id, postgresql_where=_active)
+Index("ix_products_active_discount", Product.discount_amount, Product.id, postgresql_where=_active)
+Index("ix_products_active_created_at", Product.created_at, Product.id, postgresql_where=_active)
+Index("ix_products_active_in_stock", Product.id, postgresql_where=_active & (Product.stock > 0))
+Index("ix_product_tags_tag_id", ProductTag.tag_id, ProductTag.product_id)
+Index("ix_product_images_product_id", ProductImage.product_id, ProductImage.id)
+Index("ix_products_search_vector", Product.search_vector, postgresql_using="gin")
+Index(
+    "ix_products_name_trgm", Product.name,
+    postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"},
+)
+Index("ix_stock_reservations_product_id", StockReservation.product_id)
+Index(
+    "ix_stock_reservations_active_expires_at",
+    StockReservation.expires_at,
+    postgresql_where=StockReservation.status == "active",
+)
+Index("ix_product_changes_position", ProductChange.txid, ProductChange.id)
+Index("ix_product_changes_changed_at", ProductChange.changed_at)
@@ -1,38 +1,321 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Literal
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response
+from pydantic_core import to_json
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.core.db import get_db
-from src.apps.products.schemas import ProductOut
+from src.core.db import get_read_db, reads_pinned
+from src.core.exceptions import AppException
+from src.core.http import CachedResponse, cache_control, is_conditional, is_not_modified, make_etag, not_modified
+from src.core.responses import dump_json, json_response
+from src.core.settings import Settings
+from src.apps.products.cache import list_key, product_cache, product_key
+from src.apps.products.cards import Card, cards_json, page_json
+from src.apps.products.reader import ProductReader
+from src.apps.products.schemas import (
+    BATCH_MAX_IDS, PRODUCT_ID_MAX, Price, ProductBatch, ProductBatchIn, ProductFacets, ProductFilter,
+    ProductOut, ProductPage, ProductSort,
+    SuggestionOut,
+)
 from src.apps.products.service import ProductService
+from src.apps.products.snapshot import CatalogSnapshot, catalog_snapshot
+from src.apps.products.suggest import suggest_index
 
-router = APIRouter()
+settings = Settings()
 
+router = APIRouter(dependencies=[Depends(cache_control(settings.PUBLIC_CACHE_CONTROL))])
 
-@router.get("/", response_model=list[ProductOut])
+
+def _page_validators(versions: list[tuple[int, datetime]], has_next: bool) -> tuple[str, datetime | None]:
+    """
+    ETag и Last-Modified страницы по (id, updated_at) её товаров и наличию следующей.
+    """
+    return make_etag(versions, has_next), max((v[1] for v in versions), default=None)
+
+
+def product_filter(
+    category_id: int | None = Query(None, alias="categoryId"),
+    tag_ids: list[int] = Query([], alias="tagIds"),
+    tag_mode: Literal["any", "all"] = Query("any", alias="tagMode"),
+    min_price: Price | None = Query(None, alias="minPrice", ge=0),
+    max_price: Price | None = Query(None, alias="maxPrice", ge=0),
+    in_stock: bool | None = Query(None, alias="inStock"),
+    sort: ProductSort = Query(ProductSort.newest),
+) -> ProductFilter:
+    """
+    Собирает фильтры каталога из query-параметров.
+    """
+    return ProductFilter(
+        category_id=category_id,
+        tag_ids=tag_ids,
+        tag_mode=tag_mode,
+        min_price=min_price,
+        max_price=max_price,
+        in_stock=in_stock,
+        sort=sort,
+    )
+
+
+def _reader(db: AsyncSession) -> ProductReader:
+    return ProductReader(db, use_cards=settings.PUBLIC_READ_ENGINE in ("cards", "memory"))
+
+
+def _snapshot(request: Request) -> CatalogSnapshot | None:
+    """
+    Снимок каталога, если включён и загружен. Клиент, который только что писал,
+    читает из БД: изменения доходят до снимка с небольшой задержкой.
+    Ответы из снимка не кладутся в кэш товаров — снимок сам держит всё в памяти.
+    """
+    if settings.PUBLIC_READ_ENGINE == "memory" and catalog_snapshot.ready and not reads_pinned(request):
+        return catalog_snapshot
+    return None
+
+
+def _card_response(card: Card) -> CachedResponse:
+    return CachedResponse(card.json, make_etag(card.id, card.updated_at), card.updated_at)
+
+
+def _product_response(product) -> CachedResponse:
+    return CachedResponse(dump_json(ProductOut, product), make_etag(product.id, product.updated_at), product.updated_at)
+
+
+async def _load_list_lean(
+    reader: ProductReader | CatalogSnapshot,
+    limit: int,
+    offset: int,
+    cursor: str | None,
+    filters: ProductFilter,
+) -> CachedResponse:
+    """
+    Страница списка через ProductReader или снимок каталога: тело склеивается
+    из готовых JSON карточек.
+    """
+    if cursor is not None:
+        cards, next_cursor = await reader.list_public_page(limit=limit, cursor=cursor, filters=filters)
+        body = page_json(cards, next_cursor)
+    else:
+        cards, next_cursor = await reader.list_public(limit=limit, offset=offset, filters=filters), None
+        body = cards_json(cards)
+    versions = [(card.id, card.updated_at) for card in cards]
+    return CachedResponse(body, *_page_validators(versions, next_cursor is not None))
+
+
+@router.get("/", response_model=list[ProductOut] | ProductPage)
 async def list_products(
+    request: Request,
     limit: int = Query(20, ge=1, le=200),
     offset: int = Query(0, ge=0),
-    db: AsyncSession = Depends(get_db),
-) -> list[ProductOut]:
+    cursor: str | None = Query(None, description="Курсор страницы; пустое значение — первая страница"),
+    filters: ProductFilter = Depends(product_filter),
+    db: AsyncSession = Depends(get_read_db),
+) -> Response:
     """
-    Публичный список активных товаров.
+    Публичный список активных товаров с фильтрами и сортировкой.
+
+    Без `cursor` работает по limit/offset, с `cursor` — keyset-страницами с `nextCursor`.
+    Ответ целиком кэшируется по набору параметров и поддерживает условные запросы.
     """
+    snapshot = _snapshot(request)
+    if snapshot is not None:
+        page = await _load_list_lean(snapshot, limit, offset, cursor, filters)
+        return page.to_response(request)
+
     service = ProductService(db)
-    items = await service.list_public(limit=limit, offset=offset)
-    return [ProductOut.model_validate(p, from_attributes=True) for p in items]
+    key = list_key(limit, offset, cursor, filters.model_dump_json())
+
+    cached = product_cache.get(key)
+    if cached is None and is_conditional(request):
+        versions = await service.public_versions(limit=limit, offset=offset, cursor=cursor, filters=filters)
+        etag, last_modified = _page_validators(versions[:limit], len(versions) > limit)
+        if is_not_modified(request, etag, last_modified):
+            return not_modified(request, etag, last_modified)
+
+    async def load() -> CachedResponse:
+        if settings.PUBLIC_READ_ENGINE != "orm":
+            return await _load_list_lean(_reader(db), limit, offset, cursor, filters)
+
+        if cursor is not None:
+            items, next_cursor = await service.list_public_page(limit=limit, cursor=cursor, filters=filters)
+            body = dump_json(ProductPage, {"items": items, "next_cursor": next_cursor})
+            has_next = next_cursor is not None
+        else:
+            items = await service.list_public(limit=limit, offset=offset, filters=filters)
+            body = dump_json(list[ProductOut], items)
+            has_next = False
+        versions = [(p.id, p.updated_at) for p in items]
+        return CachedResponse(body, *_page_validators(versions, has_next))
+
+    cached = cached or await product_cache.get_or_load(key, load)
+    return cached.to_response(request)
+
+
+@router.get("/facets", response_model=ProductFacets)
+async def product_facets(
+    request: Request,
+    filters: ProductFilter = Depends(product_filter),
+    db: AsyncSession = Depends(get_read_db),
+) -> Response:
+    """
+    Счётчики для панели фильтров: по категориям, тегам и ценовым диапазонам
+    с учётом текущих фильтров. Кэшируются по набору фильтров.
+    """
+    async def load() -> CachedResponse:
+        facets = await ProductService(db).facets(filters, settings.price_facet_bounds)
+        body = facets.model_dump_json(by_alias=True).encode()
+        return CachedResponse(body, make_etag(body))
+
+    key = list_key("facets", filters.model_dump_json(exclude={"sort"}))
+    cached = await product_cache.get_or_load(key, load)
+    return cached.to_response(request)
+
+
+@router.get("/search", response_model=list[ProductOut])
+async def search_products(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=1000),
+    db: AsyncSession = Depends(get_read_db),
+) -> Response:
+    """
+    Поиск по каталогу с ранжированием и устойчивостью к опечаткам.
+    """
+    async def load() -> CachedResponse:
+        items = await ProductService(db).search_public(q, limit=limit, offset=offset)
+        body = dump_json(list[ProductOut], items)
+        return CachedResponse(body, *_page_validators([(p.id, p.updated_at) for p in items], False))
+
+    cached = await product_cache.get_or_load(list_key("search", q.strip().lower(), limit, offset), load)
+    return cached.to_response(request)
+
+
+@router.get("/suggest", response_model=list[SuggestionOut])
+async def suggest(
+    request: Request,
+    prefix: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=20),
+) -> Response:
+    """
+    Подсказки по мере ввода из индекса в памяти воркера, без обращения к БД.
+    """
+    return json_response(request, list[SuggestionOut], suggest_index.suggest(prefix, limit))
+
+
+async def _batch_response(request: Request, db: AsyncSession, product_ids: list[int]) -> Response:
+    """
+    Пакет карточек: из снимка каталога или сначала из кэша карточек по id,
+    а промахи — одним походом в БД.
+    """
+    snapshot = _snapshot(request)
+    if snapshot is not None:
+        cards, missing = await snapshot.get_many_public(product_ids)
+        return _batch_body([_card_response(card) for card in cards], missing).to_response(request)
+
+    keys = {product_key(pid): pid for pid in product_ids}
+
+    async def load(missed: list[str]) -> dict[str, CachedResponse]:
+        wanted = [keys[key] for key in missed]
+        if settings.PUBLIC_READ_ENGINE != "orm":
+            cards, _ = await _reader(db).get_many_public(wanted)
+            return {product_key(card.id): _card_response(card) for card in cards}
+        products, _ = await ProductService(db).get_many_public(wanted)
+        return {product_key(product.id): _product_response(product) for product in products}
+
+    cached = await product_cache.get_many_or_load(keys, load)
+    items = [cached[key] for key in keys if key in cached]
+    missing = [pid for key, pid in keys.items() if key not in cached]
+    return _batch_body(items, missing).to_response(request)
+
+
+def _batch_body(items: list[CachedResponse], missing: list[int]) -> CachedResponse:
+    body = b'{"items":[' + b",".join(item.body for item in items) + b'],"missing":' + to_json(missing) + b"}"
+    etag = make_etag([item.etag for item in items], missing)
+    last_modified = max((item.last_modified for item in items if item.last_modified), default=None)
+    return CachedResponse(body, etag, last_modified)
+
+
+@router.get("/batch", response_model=ProductBatch)
+async def get_products_batch(
+    request: Request,
+    ids: str = Query(
+        ...,
+        pattern=r"^\d{1,10}(,\d{1,10})*$",
+        max_length=BATCH_MAX_IDS * 11,
+        description="id товаров через запятую",
+    ),
+    db: AsyncSession = Depends(get_read_db),
+) -> Response:
+    """
+    Публичные карточки по списку id (корзина, избранное, недавно просмотренные).
+
+    Товары идут в порядке запроса без повторов; id, которых нет среди активных,
+    перечислены в `missing`.
+    """
+    product_ids = [int(pid) for pid in ids.split(",")]
+    if len(product_ids) > BATCH_MAX_IDS:
+        raise HTTPException(status_code=422, detail=f"Не больше {BATCH_MAX_IDS} id за запрос")
+    if not all(1 <= pid <= PRODUCT_ID_MAX for pid in product_ids):
+        raise HTTPException(status_code=422, detail=f"id товара — от 1 до {PRODUCT_ID_MAX}")
+    return await _batch_response(request, db, product_ids)
+
+
+@router.post("/batch", response_model=ProductBatch)
+async def post_products_batch(
+    request: Request,
+    payload: ProductBatchIn,
+    db: AsyncSession = Depends(get_read_db),
+) -> Response:
+    """
+    То же, что GET /batch, для длинных списков id в теле запроса.
+    """
+    return await _batch_response(request, db, payload.ids)
 
 
 @router.get("/{product_id}", response_model=ProductOut)
 async def get_product(
-    product_id: int,
-    db: AsyncSession = Depends(get_db),
-) -> ProductOut:
+    request: Request,
+    product_id: int = Path(ge=1, le=PRODUCT_ID_MAX),
+    db: AsyncSession = Depends(get_read_db),
+) -> Response:
     """
     Публичная карточка товара.
+
+    ETag строится из (id, updated_at); условный запрос без кэша проверяется
+    лёгким запросом без загрузки связей.
     """
+    snapshot = _snapshot(request)
+    if snapshot is not None:
+        try:
+            card = await snapshot.get_public(product_id)
+        except AppException:
+            raise HTTPException(status_code=404, detail="Товар не найден")
+        return _card_response(card).to_response(request)
+
     service = ProductService(db)
-    try:
-        product = await service.get_public(product_id)
-    except Exception:
-        raise HTTPException(status_code=404, detail="Товар не найден")
-    return ProductOut.model_validate(product, from_attributes=True)
\ No newline at end of file
+    key = product_key(product_id)
+
+    cached = product_cache.get(key)
+    if cached is None and is_conditional(request):
+        version = await service.get_public_version(product_id)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Товар не найден")
+        etag = make_etag(*version)
+        if is_not_modified(request, etag, version[1]):
+            return not_modified(request, etag, version[1])
+
+    async def load() -> CachedResponse:
+        if settings.PUBLIC_READ_ENGINE != "orm":
+            try:
+                card = await _reader(db).get_public(product_id)
+            except AppException:
+                raise HTTPException(status_code=404, detail="Товар не найден")
+            return _card_response(card)
+
+        try:
+            product = await service.get_public(product_id)
+        except Exception:
+            raise HTTPException(status_code=404, detail="Товар не найден")
+        return _product_response(product)
+
+    cached = cached or await product_cache.get_or_load(key, load)
+    return cached.to_response(request)
@@ -0,0 +1,118 @@
+"""
+Облегчённое чтение публичных карточек товаров.
+
+Вместо ORM-объектов с тремя selectinload и последующей валидации ProductOut
+карточка собирается одним Core-запросом: колонки товара плюс изображения,
+теги и категория, агрегированные в JSON на стороне Postgres. Строки сразу
+превращаются в словари в формате ProductOut и сериализуются pydantic_core.
+
+С `use_cards=True` готовый JSON карточки берётся из product_cards одной строкой
+на товар; карточки, которых там ещё нет, собираются на лету.
+"""
+
+from typing import Iterable, List
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.exceptions import AppException
+from src.core.pagination import encode_cursor
+from src.apps.products import models, schemas
+from src.apps.products.cards import Card, build_card, build_cards, card_columns
+from src.apps.products.service import ProductService
+from src.apps.products.sorting import SORTS, after_cursor, apply_order, dump_sort_key
+
+
+class ProductReader:
+    """
+    Чтение публичного каталога без гидратации ORM: отдаёт карточки
+    уже сериализованными в формате ProductOut.
+    """
+
+    def __init__(self, session: AsyncSession, use_cards: bool = False):
+        self.session = session
+        self.use_cards = use_cards
+
+    async def list_public(
+        self,
+        limit: int = 20,
+        offset: int = 0,
+        filters: schemas.ProductFilter | None = None,
+    ) -> List[Card]:
+        """
+        То же, что ProductService.list_public.
+        """
+        filters = filters or schemas.ProductFilter()
+        stmt = self._query(filters).limit(limit).offset(offset)
+        result = await self.session.execute(apply_order(stmt, filters.sort))
+        return await self._cards(result.all())
+
+    async def list_public_page(
+        self,
+        limit: int = 20,
+        cursor: str | None = None,
+        filters: schemas.ProductFilter | None = None,
+    ) -> tuple[List[Card], str | None]:
+        """
+        То же, что ProductService.list_public_page.
+        """
+        filters = filters or schemas.ProductFilter()
+        attr, _ = SORTS[filters.sort]
+        stmt = self._query(filters)
+        if attr:
+            stmt = stmt.add_columns(getattr(models.Product, attr).label("sort_key"))
+        if cursor:
+            stmt = stmt.where(after_cursor(cursor, filters.sort))
+
+        result = await self.session.execute(apply_order(stmt, filters.sort).limit(limit + 1))
+        rows = result.all()
+        cards = await self._cards(rows[:limit])
+        if len(rows) <= limit:
+            return cards, None
+
+        last = rows[limit - 1]
+        key = dump_sort_key(last.sort_key) if attr else None
+        return cards, encode_cursor(filters.sort.value, key, last.id)
+
+    async def get_public(self, product_id: int) -> Card:
+        """
+        То же, что ProductService.get_public.
+        """
+        stmt = self._query(schemas.ProductFilter()).where(models.Product.id == product_id)
+        cards = await self._cards((await self.session.execute(stmt)).all())
+        if not cards:
+            raise AppException("Товар не найден", status_code=404)
+        return cards[0]
+
+    async def get_many_public(self, product_ids: Iterable[int]) -> tuple[List[Card], List[int]]:
+        """
+        То же, что ProductService.get_many_public.
+        """
+        ids = list(dict.fromkeys(product_ids))
+        stmt = self._query(schemas.ProductFilter()).where(models.Product.id.in_(ids))
+        found = {card.id: card for card in await self._cards((await self.session.execute(stmt)).all())}
+        return [found[pid] for pid in ids if pid in found], [pid for pid in ids if pid not in found]
+
+    def _query(self, filters: schemas.ProductFilter) -> Select:
+        if not self.use_cards:
+            return ProductService(self.session)._public_query(filters, *card_columns())
+
+        product, card = models.Product, models.ProductCard
+        return (
+            ProductService(self.session)
+            ._public_query(filters, product.id, product.updated_at, card.card)
+            .outerjoin(card, card.product_id == product.id)
+        )
+
+    async def _cards(self, rows) -> List[Card]:
+        if not self.use_cards:
+            return [build_card(row) for row in rows]
+
+        missing = [row.id for row in rows if row.card is None]
+        built = {}
+        if missing:
+            built = {c.id: c for c in await build_cards(self.session, models.Product.id.in_(missing))}
+        return [
+            built[row.id] if row.card is None else Card(row.id, row.updated_at, row.card.encode())
+            for row in rows
+        ]
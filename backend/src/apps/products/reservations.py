@@ -0,0 +1,223 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List
+from uuid import UUID
+
+from sqlalchemy import Integer, column, func, insert, select, true, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.db import async_session_maker
+from src.core.exceptions import AppException
+from src.apps.products import models, schemas
+from src.apps.products.cache import invalidate_products
+from src.apps.products.cards import rebuild_cards
+from src.apps.products.changes import record_changes
+
+logger = logging.getLogger(__name__)
+
+# Сколько просроченных резервов снимается за одну транзакцию.
+_EXPIRE_BATCH = 1000
+
+
+class ReservationService:
+    """
+    Резервирование остатков товаров.
+
+    Остаток уменьшается одним условным UPDATE ... WHERE stock >= n, поэтому
+    параллельные резервы не могут увести его в минус и не теряют обновлений.
+    Карточки товаров (в них есть остаток) пересобираются в той же транзакции.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def reserve(self, product_id: int, data: schemas.ReservationIn) -> models.StockReservation:
+        """
+        Резерв одного товара.
+        """
+        product = models.Product
+        result = await self.session.execute(
+            update(product)
+            .where(
+                product.id == product_id,
+                product.is_active.is_(true()),
+                product.stock >= data.quantity,
+            )
+            .values(stock=product.stock - data.quantity, updated_at=func.now())
+            .returning(product.id)
+            .execution_options(synchronize_session=False)
+        )
+        if result.scalar_one_or_none() is None:
+            await self.session.rollback()
+            exists = await self.session.scalar(
+                select(product.id).where(product.id == product_id, product.is_active.is_(true()))
+            )
+            if exists is None:
+                raise AppException("Товар не найден", status_code=404)
+            raise AppException("Недостаточно товара", status_code=409)
+
+        await rebuild_cards(self.session, product.id == product_id)
+        await record_changes(self.session, "updated", product.id == product_id)
+        (reservation,) = await self._create_reservations({product_id: data.quantity}, data.ttl_seconds)
+        await self.session.commit()
+        await invalidate_products(product_id)
+        return reservation
+
+    async def reserve_many(self, data: schemas.ReservationBatchIn) -> List[models.StockReservation]:
+        """
+        Пакетный резерв: либо все позиции, либо ни одной.
+
+        Строки товаров блокируются в порядке id, чтобы встречные пакеты
+        не взаимоблокировались, затем остатки списываются одним UPDATE ... FROM (VALUES ...).
+        """
+        quantities: dict[int, int] = {}
+        for item in data.items:
+            quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+        product_ids = sorted(quantities)
+
+        product = models.Product
+        await self.session.execute(
+            select(product.id).where(product.id.in_(product_ids)).order_by(product.id).with_for_update()
+        )
+
+        requested = values(
+            column("product_id", Integer), column("quantity", Integer), name="requested"
+        ).data([(pid, quantities[pid]) for pid in product_ids])
+        result = await self.session.execute(
+            update(product)
+            .where(
+                product.id == requested.c.product_id,
+                product.is_active.is_(true()),
+                product.stock >= requested.c.quantity,
+            )
+            .values(stock=product.stock - requested.c.quantity, updated_at=func.now())
+            .returning(product.id)
+            .execution_options(synchronize_session=False)
+        )
+        reserved = set(result.scalars())
+        missing = [pid for pid in product_ids if pid not in reserved]
+        if missing:
+            await self.session.rollback()
+            raise AppException(f"Недостаточно товара или товар не найден: {missing}", status_code=409)
+
+        await rebuild_cards(self.session, product.id.in_(product_ids))
+        await record_changes(self.session, "updated", product.id.in_(product_ids))
+        reservations = await self._create_reservations(quantities, data.ttl_seconds)
+        await self.session.commit()
+        await invalidate_products(*product_ids)
+        return reservations
+
+    async def release(self, reservation_id: UUID) -> models.StockReservation | None:
+        """
+        Отмена активного резерва с возвратом остатка.
+        """
+        return await self._close(reservation_id, "released", restock=True)
+
+    async def confirm(self, reservation_id: UUID) -> models.StockReservation | None:
+        """
+        Подтверждение резерва: остаток остаётся списанным.
+        """
+        return await self._close(reservation_id, "confirmed", restock=False)
+
+    async def release_expired(self, batch_size: int = _EXPIRE_BATCH) -> int:
+        """
+        Возвращает на склад остатки просроченных резервов. Резервы снимаются
+        пачками по `batch_size`, каждая — одним запросом в своей транзакции,
+        чтобы не держать блокировки на весь набор и не рассылать его одной
+        инвалидацией. Возвращает число пополненных товаров по всем пачкам.
+        """
+        reservation = models.StockReservation
+        released = 0
+        while True:
+            batch = (
+                select(reservation.id)
+                .where(reservation.status == "active", reservation.expires_at < func.now())
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            expired = (
+                update(reservation)
+                .where(reservation.id.in_(batch.scalar_subquery()))
+                .values(status="expired")
+                .returning(reservation.product_id, reservation.quantity)
+                .cte("expired")
+            )
+            totals = (
+                select(expired.c.product_id, func.sum(expired.c.quantity).label("quantity"))
+                .group_by(expired.c.product_id)
+                .subquery()
+            )
+            result = await self.session.execute(
+                update(models.Product)
+                .where(models.Product.id == totals.c.product_id)
+                .values(stock=models.Product.stock + totals.c.quantity, updated_at=func.now())
+                .returning(models.Product.id)
+                .execution_options(synchronize_session=False)
+            )
+            product_ids = list(result.scalars())
+            if not product_ids:
+                await self.session.commit()
+                return released
+            await rebuild_cards(self.session, models.Product.id.in_(product_ids))
+            await record_changes(self.session, "updated", models.Product.id.in_(product_ids))
+            await self.session.commit()
+            await invalidate_products(*product_ids)
+            released += len(product_ids)
+
+    async def _create_reservations(
+        self, quantities: dict[int, int], ttl_seconds: int
+    ) -> List[models.StockReservation]:
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=ttl_seconds)
+        result = await self.session.scalars(
+            insert(models.StockReservation).returning(models.StockReservation, sort_by_parameter_order=True),
+            [
+                {"product_id": pid, "quantity": quantity, "expires_at": expires_at}
+                for pid, quantity in quantities.items()
+            ],
+        )
+        return list(result)
+
+    async def _close(self, reservation_id: UUID, status: str, restock: bool) -> models.StockReservation | None:
+        reservation = models.StockReservation
+        result = await self.session.scalars(
+            update(reservation)
+            .where(reservation.id == reservation_id, reservation.status == "active")
+            .values(status=status)
+            .returning(reservation)
+        )
+        closed = result.one_or_none()
+        if closed is None:
+            await self.session.rollback()
+            return None
+
+        if restock:
+            await self.session.execute(
+                update(models.Product)
+                .where(models.Product.id == closed.product_id)
+                .values(stock=models.Product.stock + closed.quantity, updated_at=func.now())
+                .execution_options(synchronize_session=False)
+            )
+            await rebuild_cards(self.session, models.Product.id == closed.product_id)
+            await record_changes(self.session, "updated", models.Product.id == closed.product_id)
+        await self.session.commit()
+        if restock:
+            await invalidate_products(closed.product_id)
+        return closed
+
+
+async def run_expiry_sweeper(interval: float) -> None:
+    """
+    Фоновая задача воркера: периодически снимает просроченные резервы.
+    Запускается из main.lifespan; несколько воркеров не мешают друг другу —
+    резерв закрывается ровно одним UPDATE.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with async_session_maker() as session:
+                released = await ReservationService(session).release_expired()
+            if released:
+                logger.info("Сняты просроченные резервы по %d товарам", released)
+        except Exception:
+            logger.exception("Не удалось снять просроченные резервы")
@@ -0,0 +1,74 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.db import get_db
+from src.core.http import cache_control
+from src.core.responses import json_response
+from src.apps.products.reservations import ReservationService
+from src.apps.products.schemas import PRODUCT_ID_MAX, ReservationBatchIn, ReservationIn, ReservationOut
+
+# Ответы меняют остатки и относятся к одному клиенту: общим кэшам их хранить нельзя.
+router = APIRouter(dependencies=[Depends(cache_control("private, no-store"))])
+
+
+@router.post("/reserve", response_model=list[ReservationOut])
+async def reserve_products(
+    request: Request,
+    payload: ReservationBatchIn,
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """
+    Пакетный резерв товаров: все позиции или ни одной.
+    """
+    service = ReservationService(db)
+    items = await service.reserve_many(payload)
+    return json_response(request, list[ReservationOut], items)
+
+
+@router.post("/{product_id}/reserve", response_model=ReservationOut)
+async def reserve_product(
+    request: Request,
+    payload: ReservationIn,
+    product_id: int = Path(ge=1, le=PRODUCT_ID_MAX),
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """
+    Резерв товара на время `ttlSeconds`.
+    """
+    service = ReservationService(db)
+    reservation = await service.reserve(product_id, payload)
+    return json_response(request, ReservationOut, reservation)
+
+
+@router.post("/reservations/{reservation_id}/release", response_model=ReservationOut)
+async def release_reservation(
+    reservation_id: UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """
+    Отмена резерва с возвратом остатка.
+    """
+    service = ReservationService(db)
+    reservation = await service.release(reservation_id)
+    if reservation is None:
+        raise HTTPException(status_code=404, detail="Активный резерв не найден")
+    return json_response(request, ReservationOut, reservation)
+
+
+@router.post("/reservations/{reservation_id}/confirm", response_model=ReservationOut)
+async def confirm_reservation(
+    reservation_id: UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """
+    Подтверждение резерва при оформлении заказа.
+    """
+    service = ReservationService(db)
+    reservation = await service.confirm(reservation_id)
+    if reservation is None:
+        raise HTTPException(status_code=404, detail="Активный резерв не найден")
+    return json_response(request, ReservationOut, reservation)
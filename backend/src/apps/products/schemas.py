@@ -1,7 +1,9 @@
 from datetime import datetime
 from decimal import Decimal
-from typing import Annotated
-from pydantic import Field, ConfigDict
+from enum import Enum
+from typing import Annotated, Literal
+from uuid import UUID
+from pydantic import Field, ConfigDict, model_validator
 from pydantic import BaseModel, condecimal
 
 from src.core.utils import to_camel
@@ -9,6 +11,10 @@ from src.core.utils import to_camel
 
 Price = Annotated[Decimal, condecimal(max_digits=10, decimal_places=2)]
 
+# id товара в пределах integer Postgres: больший в запросе даёт ошибку БД, а не 422.
+PRODUCT_ID_MAX = 2**31 - 1
+ProductId = Annotated[int, Field(ge=1, le=PRODUCT_ID_MAX)]
+
 
 class CamelModel(BaseModel):
     model_config = ConfigDict(
@@ -17,6 +23,16 @@ class CamelModel(BaseModel):
         populate_by_name=True,
     )
 
+class ImageVariantOut(CamelModel):
+    """
+    DTO уменьшенной копии изображения.
+    """
+
+    url: str
+    width: int
+    format: str
+
+
 class ProductImageOut(CamelModel):
     """
     DTO изображения товара.
@@ -24,6 +40,21 @@ class ProductImageOut(CamelModel):
     
     id: int
     url: str = Field(validation_alias='image_url')
+    variants: list[ImageVariantOut] = []
+
+
+class StoredImageOut(CamelModel):
+    """
+    DTO загруженного изображения: `url` передаётся в imageUrls или mainImageUrl товара.
+    """
+
+    url: str
+    content_hash: str
+    content_type: str
+    size: int
+    width: int
+    height: int
+    variants: list[ImageVariantOut]
 
 
 class TagOut(CamelModel):
@@ -117,4 +148,254 @@ class ProductUpdate(CamelModel):
     stock: int | None = None
     category_id: int | None = None
     tag_ids: list[int] | None = None
-    image_urls: list[str] | None = None
\ No newline at end of file
+    image_urls: list[str] | None = None
+
+class ProductPage(CamelModel):
+    """
+    DTO страницы товаров при постраничной выборке по курсору.
+    """
+
+    items: list[ProductOut]
+    next_cursor: str | None
+
+
+class ProductChangeOut(CamelModel):
+    """
+    DTO записи ленты изменений: что случилось с товаром и его текущее состояние.
+    """
+
+    product_id: int
+    op: Literal["created", "updated", "deleted"]
+    changed_at: datetime
+    product: ProductOut | None
+
+
+class ProductChanges(CamelModel):
+    """
+    DTO страницы ленты изменений; `next` передаётся в следующий запрос как `since`.
+    """
+
+    items: list[ProductChangeOut]
+    next: str
+    has_more: bool
+
+
+class ChangeWatermark(CamelModel):
+    """
+    DTO текущей головы ленты изменений.
+    """
+
+    token: str
+
+
+# Сколько товаров можно запросить одним пакетом.
+BATCH_MAX_IDS = 500
+
+
+class ProductBatchIn(CamelModel):
+    """
+    DTO пакетного запроса товаров по списку id.
+    """
+
+    ids: list[ProductId] = Field(min_length=1, max_length=BATCH_MAX_IDS)
+
+
+class ProductBatch(CamelModel):
+    """
+    DTO пакета товаров: найденные в порядке запроса и id, которых нет среди активных.
+    """
+
+    items: list[ProductOut]
+    missing: list[int]
+
+
+# Сколько товаров можно изменить или удалить одним пакетным запросом.
+BULK_MAX_ITEMS = 5000
+
+
+class ProductBulkItem(CamelModel):
+    """
+    DTO пакетного изменения одного товара: переданные поля заменяются, остальные не трогаются.
+    """
+
+    id: ProductId
+    price: Price | None = None
+    discount_price: Price | None = None
+    stock: int | None = None
+    is_active: bool | None = None
+
+    @model_validator(mode="after")
+    def _check_fields(self) -> "ProductBulkItem":
+        changed = self.model_fields_set - {"id"}
+        if not changed:
+            raise ValueError("Не указано ни одного изменяемого поля")
+        for field in changed - {"discount_price"}:
+            if getattr(self, field) is None:
+                raise ValueError(f"Поле {to_camel(field)} не может быть null")
+        return self
+
+
+class ProductBulkUpdateIn(CamelModel):
+    """
+    DTO пакетного изменения цен, остатков и видимости товаров.
+    """
+
+    items: list[ProductBulkItem] = Field(min_length=1, max_length=BULK_MAX_ITEMS)
+
+
+class ProductBulkDeleteIn(CamelModel):
+    """
+    DTO пакетного удаления товаров.
+    """
+
+    ids: list[ProductId] = Field(min_length=1, max_length=BULK_MAX_ITEMS)
+
+
+class BulkResult(CamelModel):
+    """
+    DTO исхода пакетной операции по одному товару.
+    """
+
+    id: int
+    status: Literal["updated", "deleted", "notFound"]
+
+
+class BulkReport(CamelModel):
+    """
+    DTO итогов пакетной операции: исходы по id в порядке запроса без повторов.
+    """
+
+    processed: int
+    results: list[BulkResult]
+
+
+class ProductSort(str, Enum):
+    """
+    Варианты сортировки публичного каталога.
+    """
+
+    newest = "newest"
+    price_asc = "priceAsc"
+    price_desc = "priceDesc"
+    created_at_asc = "createdAtAsc"
+    created_at_desc = "createdAtDesc"
+    discount_desc = "discountDesc"
+
+
+class ProductFilter(CamelModel):
+    """
+    Фильтры и сортировка публичного каталога.
+    """
+
+    category_id: int | None = None
+    tag_ids: list[int] = []
+    tag_mode: Literal["any", "all"] = "any"
+    min_price: Price | None = None
+    max_price: Price | None = None
+    in_stock: bool | None = None
+    sort: ProductSort = ProductSort.newest
+
+
+class ImportRowError(CamelModel):
+    """
+    DTO ошибки в строке импорта.
+    """
+
+    line: int
+    error: str
+
+
+class ImportReport(CamelModel):
+    """
+    DTO итогов массового импорта товаров.
+    """
+
+    total: int = 0
+    created: int = 0
+    failed: int = 0
+    errors: list[ImportRowError] = []
+    errors_truncated: bool = False
+    # Импорт остановлен сбоем: записано только то, что посчитано в created.
+    aborted: bool = False
+    elapsed_seconds: float = 0.0
+    rows_per_second: float = 0.0
+
+
+class ReservationIn(CamelModel):
+    """
+    DTO резервирования одного товара.
+    """
+
+    quantity: int = Field(gt=0)
+    ttl_seconds: int = Field(900, ge=10, le=86400)
+
+
+class ReservationItemIn(CamelModel):
+    """
+    DTO позиции пакетного резервирования.
+    """
+
+    product_id: ProductId
+    quantity: int = Field(gt=0)
+
+
+class ReservationBatchIn(CamelModel):
+    """
+    DTO пакетного резервирования: все позиции резервируются вместе или ни одна.
+    """
+
+    items: list[ReservationItemIn] = Field(min_length=1, max_length=500)
+    ttl_seconds: int = Field(900, ge=10, le=86400)
+
+
+class ReservationOut(CamelModel):
+    """
+    DTO резерва товара.
+    """
+
+    id: UUID
+    product_id: int
+    quantity: int
+    status: str
+    expires_at: datetime
+
+
+class SuggestionOut(CamelModel):
+    """
+    DTO подсказки поиска.
+    """
+
+    type: Literal["product", "category", "tag"]
+    id: int
+    name: str
+
+
+class FacetCount(CamelModel):
+    """
+    DTO значения фасета с числом товаров.
+    """
+
+    id: int
+    name: str
+    count: int
+
+
+class PriceBucket(CamelModel):
+    """
+    DTO ценового диапазона [min, max) с числом товаров.
+    """
+
+    min: Decimal | None
+    max: Decimal | None
+    count: int
+
+
+class ProductFacets(CamelModel):
+    """
+    DTO счётчиков для панели фильтров каталога.
+    """
+
+    total: int
+    categories: list[FacetCount]
+    tags: list[FacetCount]
+    prices: list[PriceBucket]
@@ -1,10 +1,55 @@
-from typing import Iterable, List
-from sqlalchemy import select, delete, true
+import re
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Iterable, List
+from sqlalchemy import (
+    ColumnElement, Integer, Select, all_, any_, cast, column, select, delete, func, insert, literal, literal_column, or_,
+    true, tuple_, update, values,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, array
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from src.core.exceptions import AppException
+from src.core.pagination import encode_cursor
 from src.apps.products import models, schemas
+from src.apps.products.cache import invalidate_catalog, invalidate_products
+from src.apps.products.cards import rebuild_cards
+from src.apps.products.changes import ChangeOp, record_changes
+from src.apps.products.sorting import SORTS, after_cursor, apply_order, dump_sort_key
+from src.apps.products.suggest import publish_products, publish_suggest
+from src.apps.products.taxonomy import publish_taxonomy
+
+
+def _card_options() -> tuple:
+    """
+    Связи, которые нужны для сборки карточки товара.
+    """
+    return (
+        selectinload(models.Product.category).selectinload(models.Category.tags),
+        selectinload(models.Product.images),
+        selectinload(models.Product.tags),
+    )
+
+
+def _any(ids: Iterable[int]) -> ColumnElement:
+    """
+    `ANY($1)` для сравнения `column == _any(ids)`: список id уходит одним
+    параметром-массивом, а не тысячами параметров IN.
+    """
+    return any_(literal(list(ids), ARRAY(Integer)))
+
+
+def _search_tags() -> ColumnElement:
+    """
+    Имена тегов товара через пробел (products.search_tags) для UPDATE товаров.
+    """
+    return (
+        select(func.string_agg(models.Tag.name, " "))
+        .join(models.ProductTag, models.ProductTag.tag_id == models.Tag.id)
+        .where(models.ProductTag.product_id == models.Product.id)
+        .scalar_subquery()
+    )
 
 
 class ProductService:
@@ -29,23 +74,62 @@ class ProductService:
             is_active=data.is_active,
             stock=data.stock,
             category_id=data.category_id,
+            tags=list(await self._load_tags(data.tag_ids)),
         )
         self.session.add(product)
         await self.session.flush()
 
         if data.image_urls:
-            self.session.add_all(
-                models.ProductImage(product_id=product.id, image_url=url)
-                for url in data.image_urls
-            )
+            self.session.add_all(await self._images(product.id, data.image_urls))
+
+        await self._touch_products(models.Product.id == product.id, "created")
+        await self.session.commit()
+        await invalidate_products(product.id)
+        await publish_products((product.id, data.name, data.is_active))
+        return await self._reload(product.id)
+
+    async def bulk_create(self, items: List[schemas.ProductIn]) -> List[int]:
+        """
+        Создание пачки товаров многострочными INSERT ... RETURNING без ORM-объектов.
+        Возвращает id в порядке входных данных. Кэши и подсказки после коммита
+        обновляет publish_created: так ошибку записи можно отличить от ошибки рассылки.
+        """
+        if not items:
+            return []
+
+        result = await self.session.execute(
+            insert(models.Product).returning(models.Product.id, sort_by_parameter_order=True),
+            [item.model_dump(exclude={"tag_ids", "image_urls"}) for item in items],
+        )
+        ids = list(result.scalars())
+
+        variants = await self._image_variants(url for item in items for url in item.image_urls)
+        images = [
+            {"product_id": product_id, "image_url": url, "variants": variants.get(url, [])}
+            for product_id, item in zip(ids, items)
+            for url in item.image_urls
+        ]
+        if images:
+            await self.session.execute(insert(models.ProductImage), images)
 
-        if data.tag_ids:
-            tags = await self._load_tags(data.tag_ids)
-            product.tags = list(tags)
+        tags = [
+            {"product_id": product_id, "tag_id": tag_id}
+            for product_id, item in zip(ids, items)
+            for tag_id in dict.fromkeys(item.tag_ids)
+        ]
+        if tags:
+            await self.session.execute(insert(models.ProductTag), tags)
 
+        await self._touch_products(models.Product.id.in_(ids), "created")
         await self.session.commit()
-        await self.session.refresh(product, attribute_names=("category", "images", "tags"))
-        return product
+        return ids
+
+    async def publish_created(self, ids: List[int], items: List[schemas.ProductIn]) -> None:
+        """
+        Рассылает воркерам товары, записанные bulk_create.
+        """
+        await invalidate_products(*ids)
+        await publish_products(*((pid, item.name, item.is_active) for pid, item in zip(ids, items)))
 
     async def get(self, product_id: int) -> models.Product | None:
         """
@@ -53,11 +137,7 @@ class ProductService:
         """
         result = await self.session.execute(
             select(models.Product)
-            .options(
-                selectinload(models.Product.category),
-                selectinload(models.Product.images),
-                selectinload(models.Product.tags),
-            )
+            .options(*_card_options())
             .where(models.Product.id == product_id)
         )
         return result.scalar_one_or_none()
@@ -68,61 +148,233 @@ class ProductService:
         """
         result = await self.session.execute(
             select(models.Product)
-            .options(
-                selectinload(models.Product.category),
-                selectinload(models.Product.images),
-                selectinload(models.Product.tags),
-            )
+            .options(*_card_options())
             .order_by(models.Product.id.desc())
             .limit(limit)
             .offset(offset)
         )
         return list(result.scalars().all())
 
+    async def list_page(
+        self, limit: int = 20, cursor: str | None = None
+    ) -> tuple[List[models.Product], str | None]:
+        """
+        Страница товаров по курсору (keyset) вместо OFFSET.
+        """
+        stmt = select(models.Product).options(*_card_options())
+        return await self._keyset_page(stmt, limit, cursor)
+
     async def update(self, product_id: int, data: schemas.ProductUpdate) -> models.Product | None:
         """
-        Частичное обновление товара с пересборкой связей по необходимости.
+        Частичное обновление товара одним UPDATE; теги и изображения
+        синхронизируются по разнице с текущими, а не пересоздаются.
         """
-        product = await self.get(product_id)
-        if product is None:
+        product = models.Product
+        changes = data.model_dump(exclude_unset=True, exclude={"tag_ids", "image_urls", "category_id"})
+        if data.category_id is not None:
+            changes["category_id"] = data.category_id
+
+        if changes:
+            stmt = (
+                update(product)
+                .where(product.id == product_id)
+                .values(changes)
+                .returning(product.id, product.name, product.is_active)
+                .execution_options(synchronize_session=False)
+            )
+        else:
+            stmt = (
+                select(product.id, product.name, product.is_active)
+                .where(product.id == product_id)
+                .with_for_update()
+            )
+        row = (await self.session.execute(stmt)).one_or_none()
+        if row is None:
             return None
 
-        for field, value in data.model_dump(exclude_unset=True).items():
-            if field in {"tag_ids", "image_urls", "category_id"}:
-                continue
-            setattr(product, field, value)
+        if data.tag_ids is not None:
+            await self._sync_tags(product_id, data.tag_ids)
+        if data.image_urls is not None:
+            await self._sync_images(product_id, data.image_urls)
 
-        if data.category_id is not None:
-            product.category_id = data.category_id
+        await self._touch_products(product.id == product_id)
+        await self.session.commit()
+        await invalidate_products(product_id)
+        await publish_products((row.id, row.name, row.is_active))
+        return await self._reload(product_id)
 
-        if data.tag_ids is not None:
-            tags = await self._load_tags(data.tag_ids)
-            product.tags = list(tags)
+    async def bulk_update(self, items: List[schemas.ProductBulkItem]) -> schemas.BulkReport:
+        """
+        Пакетное изменение цен, остатков и видимости в одной транзакции.
 
-        if data.image_urls is not None:
-            await self.session.execute(
-                delete(models.ProductImage).where(models.ProductImage.product_id == product.id)
+        Изменения одного id сливаются (последнее значение поля побеждает), строки
+        блокируются в порядке id, чтобы встречные пакеты не взаимоблокировались,
+        затем на каждый набор изменяемых полей выполняется один UPDATE ... FROM (VALUES ...).
+        """
+        changes: dict[int, dict[str, Any]] = {}
+        for item in items:
+            changes.setdefault(item.id, {}).update(item.model_dump(exclude_unset=True, exclude={"id"}))
+
+        product = models.Product
+        await self.session.execute(
+            select(product.id).where(models.Product.id == _any(changes)).order_by(product.id).with_for_update()
+        )
+
+        groups: dict[tuple[str, ...], List[int]] = {}
+        for product_id, fields in changes.items():
+            groups.setdefault(tuple(sorted(fields)), []).append(product_id)
+
+        types = product.__table__.c
+        updated: dict[int, Any] = {}
+        for fields, product_ids in groups.items():
+            rows = values(
+                column("id", Integer),
+                *(column(field, types[field].type) for field in fields),
+                name="changes",
+            ).data([(pid, *(changes[pid][field] for field in fields)) for pid in product_ids])
+            result = await self.session.execute(
+                update(product)
+                .where(product.id == rows.c.id)
+                # NULL в VALUES без типа Postgres считает text, поэтому значения приводятся явно.
+                .values({field: cast(rows.c[field], types[field].type) for field in fields})
+                .returning(product.id, product.name, product.is_active)
+                .execution_options(synchronize_session=False)
             )
-            if data.image_urls:
-                self.session.add_all(
-                    models.ProductImage(product_id=product.id, image_url=url)
-                    for url in data.image_urls
-                )
+            updated.update((row.id, row) for row in result)
 
+        if updated:
+            await self._touch_products(product.id == _any(updated))
         await self.session.commit()
-        await self.session.refresh(product, attribute_names=("category", "images", "tags"))
-        return product
+        if updated:
+            await invalidate_products(*updated)
+            await publish_products(*(
+                (row.id, row.name, row.is_active) for row in updated.values() if "is_active" in changes[row.id]
+            ))
+        return schemas.BulkReport(
+            processed=len(updated),
+            results=[
+                schemas.BulkResult(id=pid, status="updated" if pid in updated else "notFound")
+                for pid in changes
+            ],
+        )
+
+    async def bulk_delete(self, product_ids: Iterable[int]) -> schemas.BulkReport:
+        """
+        Пакетное удаление товаров в одной транзакции: изображения, теги и сами
+        товары удаляются DELETE ... WHERE product_id = ANY(...), без загрузки
+        ORM-объектов. Карточки и резервы удаляет каскад в БД.
+        """
+        ids = list(dict.fromkeys(product_ids))
+        product = models.Product
+        result = await self.session.execute(
+            select(product.id).where(product.id == _any(ids)).order_by(product.id).with_for_update()
+        )
+        deleted = list(result.scalars())
+        if deleted:
+            await record_changes(self.session, "deleted", product.id == _any(deleted))
+            await self.session.execute(
+                delete(models.ProductImage).where(models.ProductImage.product_id == _any(deleted))
+            )
+            await self.session.execute(
+                delete(models.ProductTag).where(models.ProductTag.product_id == _any(deleted))
+            )
+            await self.session.execute(
+                delete(product).where(product.id == _any(deleted)).execution_options(synchronize_session=False)
+            )
+        await self.session.commit()
+
+        if deleted:
+            await invalidate_products(*deleted)
+            await publish_suggest(remove=[("product", pid) for pid in deleted])
+        found = set(deleted)
+        return schemas.BulkReport(
+            processed=len(deleted),
+            results=[
+                schemas.BulkResult(id=pid, status="deleted" if pid in found else "notFound") for pid in ids
+            ],
+        )
+
+    async def _sync_tags(self, product_id: int, tag_ids: Iterable[int]) -> None:
+        """
+        Приводит теги товара к заданным: удаляет лишние и добавляет недостающие
+        из существующих, не трогая общие.
+        """
+        wanted = literal(list(dict.fromkeys(tag_ids)), ARRAY(Integer))
+        link = models.ProductTag
+        await self.session.execute(
+            delete(link).where(link.product_id == product_id, link.tag_id != all_(wanted))
+        )
+        current = select(link.tag_id).where(link.product_id == product_id)
+        await self.session.execute(
+            insert(link).from_select(
+                ["product_id", "tag_id"],
+                select(literal(product_id, Integer), models.Tag.id)
+                .where(models.Tag.id == any_(wanted), models.Tag.id.not_in(current)),
+            )
+        )
+
+    async def _sync_images(self, product_id: int, urls: List[str]) -> None:
+        """
+        Приводит изображения товара к заданному списку. Порядок карточки задаётся
+        id строк, поэтому остаются текущие изображения, совпадающие с началом
+        списка как подпоследовательность, а остальные удаляются; новые
+        добавляются после них.
+        """
+        image = models.ProductImage
+        result = await self.session.execute(
+            select(image.id, image.image_url).where(image.product_id == product_id).order_by(image.id)
+        )
+        kept, stale = 0, []
+        for image_id, url in result:
+            if kept < len(urls) and url == urls[kept]:
+                kept += 1
+            else:
+                stale.append(image_id)
+
+        if stale:
+            await self.session.execute(delete(image).where(image.id == any_(literal(stale, ARRAY(Integer)))))
+        if kept < len(urls):
+            self.session.add_all(await self._images(product_id, urls[kept:]))
+            await self.session.flush()
+
+    async def _image_variants(self, urls: Iterable[str]) -> dict[str, list]:
+        """
+        Уменьшенные копии изображений, загруженных через API, по их URL.
+        """
+        urls = set(urls)
+        if not urls:
+            return {}
+        result = await self.session.execute(
+            select(models.StoredImage.url, models.StoredImage.variants)
+            .where(models.StoredImage.url.in_(urls))
+        )
+        return dict(result.tuples().all())
+
+    async def _images(self, product_id: int, urls: List[str]) -> List[models.ProductImage]:
+        variants = await self._image_variants(urls)
+        return [
+            models.ProductImage(product_id=product_id, image_url=url, variants=variants.get(url, []))
+            for url in urls
+        ]
+
+    async def _reload(self, product_id: int) -> models.Product:
+        """
+        Перечитывает товар со всеми связями карточки после изменения.
+        """
+        result = await self.session.execute(
+            select(models.Product)
+            .options(*_card_options())
+            .where(models.Product.id == product_id)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one()
 
     async def delete(self, product_id: int) -> bool:
         """
         Удаление товара.
         """
-        product = await self.session.get(models.Product, product_id)
-        if product is None:
-            return False
-        await self.session.delete(product)
-        await self.session.commit()
-        return True
+        report = await self.bulk_delete([product_id])
+        return report.processed == 1
 
     async def _load_tags(self, tag_ids: Iterable[int]) -> Iterable[models.Tag]:
         """
@@ -135,23 +387,175 @@ class ProductService:
         )
         return result.scalars().all()
 
-    async def list_public(self, limit: int = 20, offset: int = 0) -> List[models.Product]:
+    async def list_public(
+        self,
+        limit: int = 20,
+        offset: int = 0,
+        filters: schemas.ProductFilter | None = None,
+    ) -> List[models.Product]:
+        """
+        Возвращает список активных товаров с учётом фильтров и сортировки.
+        """
+        filters = filters or schemas.ProductFilter()
+        stmt = self._public_query(filters).limit(limit).offset(offset)
+        result = await self.session.execute(apply_order(stmt, filters.sort))
+        return result.scalars().all()
+
+    async def list_public_page(
+        self,
+        limit: int = 20,
+        cursor: str | None = None,
+        filters: schemas.ProductFilter | None = None,
+    ) -> tuple[List[models.Product], str | None]:
         """
-        Возвращает список активных товаров.
+        Страница активных товаров по курсору (keyset) вместо OFFSET.
         """
-        result = await self.session.execute(
-            select(models.Product)
-            .options(
-                selectinload(models.Product.category),
-                selectinload(models.Product.images),
-                selectinload(models.Product.tags),
+        filters = filters or schemas.ProductFilter()
+        return await self._keyset_page(self._public_query(filters), limit, cursor, filters.sort)
+
+    async def public_versions(
+        self,
+        limit: int = 20,
+        offset: int = 0,
+        cursor: str | None = None,
+        filters: schemas.ProductFilter | None = None,
+    ) -> List[tuple[int, datetime]]:
+        """
+        Пары (id, updated_at) той же страницы, что вернут list_public/list_public_page,
+        без загрузки связей. Для страницы по курсору берётся limit + 1 строк:
+        от лишней строки зависит nextCursor.
+        """
+        filters = filters or schemas.ProductFilter()
+        stmt = self._public_query(filters, models.Product.id, models.Product.updated_at)
+        if cursor is None:
+            stmt = stmt.limit(limit).offset(offset)
+        else:
+            if cursor:
+                stmt = stmt.where(after_cursor(cursor, filters.sort))
+            stmt = stmt.limit(limit + 1)
+
+        result = await self.session.execute(apply_order(stmt, filters.sort))
+        return [(row.id, row.updated_at) for row in result]
+
+    async def facets(
+        self, filters: schemas.ProductFilter, price_bounds: List[Decimal]
+    ) -> schemas.ProductFacets:
+        """
+        Счётчики товаров по категориям, тегам и ценовым диапазонам для текущих
+        фильтров — одним запросом с GROUPING SETS.
+        """
+        product = models.Product
+        filtered = self._public_query(
+            filters,
+            product.id,
+            product.category_id,
+            func.width_bucket(product.effective_price, array(price_bounds)).label("price_bucket"),
+        ).subquery("filtered")
+        category, tag = models.Category, models.Tag
+
+        stmt = (
+            select(
+                func.grouping(filtered.c.category_id, tag.id, filtered.c.price_bucket).label("grouping"),
+                filtered.c.category_id,
+                category.name.label("category_name"),
+                tag.id.label("tag_id"),
+                tag.name.label("tag_name"),
+                filtered.c.price_bucket,
+                func.count(filtered.c.id.distinct()).label("count"),
             )
-            .where(models.Product.is_active.is_(true()))
-            .order_by(models.Product.id.desc())
-            .limit(limit)
-            .offset(offset)
+            .select_from(filtered)
+            .outerjoin(category, category.id == filtered.c.category_id)
+            .outerjoin(models.ProductTag, models.ProductTag.product_id == filtered.c.id)
+            .outerjoin(tag, tag.id == models.ProductTag.tag_id)
+            .group_by(func.grouping_sets(
+                tuple_(filtered.c.category_id, category.name),
+                tuple_(tag.id, tag.name),
+                tuple_(filtered.c.price_bucket),
+            ))
         )
-        return result.scalars().all()
+
+        categories, tags = [], []
+        bucket_counts = [0] * (len(price_bounds) + 1)
+        # Биты grouping(): 1 — колонка не входит в набор группировки (старший бит — категория).
+        for row in await self.session.execute(stmt):
+            if row.grouping == 0b011 and row.category_id is not None:
+                categories.append(schemas.FacetCount(id=row.category_id, name=row.category_name, count=row.count))
+            elif row.grouping == 0b101 and row.tag_id is not None:
+                tags.append(schemas.FacetCount(id=row.tag_id, name=row.tag_name, count=row.count))
+            elif row.grouping == 0b110:
+                bucket_counts[row.price_bucket] = row.count
+
+        edges = [None, *price_bounds, None]
+        return schemas.ProductFacets(
+            total=sum(bucket_counts),
+            categories=sorted(categories, key=lambda f: (-f.count, f.name)),
+            tags=sorted(tags, key=lambda f: (-f.count, f.name)),
+            prices=[
+                schemas.PriceBucket(min=edges[i], max=edges[i + 1], count=count)
+                for i, count in enumerate(bucket_counts)
+            ],
+        )
+
+    def _public_query(self, filters: schemas.ProductFilter, *columns) -> Select:
+        """
+        Запрос активных товаров с применёнными фильтрами: целые товары со связями
+        карточки либо только переданные колонки.
+        """
+        product = models.Product
+        if columns:
+            stmt = select(*columns)
+        else:
+            stmt = select(product).options(*_card_options())
+        stmt = stmt.where(product.is_active.is_(true()))
+
+        if filters.category_id is not None:
+            stmt = stmt.where(product.category_id == filters.category_id)
+
+        if filters.tag_ids:
+            tag_ids = set(filters.tag_ids)
+            tagged = select(models.ProductTag.product_id).where(models.ProductTag.tag_id.in_(tag_ids))
+            if filters.tag_mode == "all" and len(tag_ids) > 1:
+                tagged = tagged.group_by(models.ProductTag.product_id).having(
+                    func.count(models.ProductTag.tag_id) == len(tag_ids)
+                )
+            stmt = stmt.where(product.id.in_(tagged))
+
+        if filters.min_price is not None:
+            stmt = stmt.where(product.effective_price >= filters.min_price)
+        if filters.max_price is not None:
+            stmt = stmt.where(product.effective_price <= filters.max_price)
+
+        if filters.in_stock is True:
+            stmt = stmt.where(product.stock > 0)
+        elif filters.in_stock is False:
+            stmt = stmt.where(product.stock <= 0)
+
+        return stmt
+
+    async def _keyset_page(
+        self,
+        stmt: Select,
+        limit: int,
+        cursor: str | None,
+        sort: schemas.ProductSort = schemas.ProductSort.newest,
+    ) -> tuple[List[models.Product], str | None]:
+        """
+        Выборка страницы после последней увиденной пары (ключ сортировки, id)
+        и курсор следующей страницы.
+        """
+        attr, _ = SORTS[sort]
+        if cursor:
+            stmt = stmt.where(after_cursor(cursor, sort))
+
+        result = await self.session.execute(apply_order(stmt, sort).limit(limit + 1))
+        items = list(result.scalars().all())
+        if len(items) <= limit:
+            return items, None
+
+        items = items[:limit]
+        last = items[-1]
+        key = dump_sort_key(getattr(last, attr)) if attr else None
+        return items, encode_cursor(sort.value, key, last.id)
 
     async def get_public(self, product_id: int) -> models.Product:
         """
@@ -159,11 +563,7 @@ class ProductService:
         """
         result = await self.session.execute(
             select(models.Product)
-            .options(
-                selectinload(models.Product.category),
-                selectinload(models.Product.images),
-                selectinload(models.Product.tags),
-            )
+            .options(*_card_options())
             .where(
                 models.Product.id == product_id,
                 models.Product.is_active.is_(true()),
@@ -174,6 +574,107 @@ class ProductService:
             raise AppException("Товар не найден", status_code=404)
         return product
 
+    async def get_many_public(self, product_ids: Iterable[int]) -> tuple[List[models.Product], List[int]]:
+        """
+        Активные товары по списку id постоянным числом запросов (товары и три
+        selectinload), в порядке запроса без повторов, и id, которых среди них нет.
+        """
+        ids = list(dict.fromkeys(product_ids))
+        result = await self.session.execute(
+            select(models.Product)
+            .options(*_card_options())
+            .where(models.Product.id.in_(ids), models.Product.is_active.is_(true()))
+        )
+        found = {product.id: product for product in result.scalars()}
+        return [found[pid] for pid in ids if pid in found], [pid for pid in ids if pid not in found]
+
+    async def search_public(self, query: str, limit: int = 20, offset: int = 0) -> List[models.Product]:
+        """
+        Поиск активных товаров: полнотекстовый по имени, тегам и описанию
+        (русская морфология, префиксы слов) плюс нечёткий по триграммам имени
+        для опечаток. Результаты упорядочены по релевантности.
+        """
+        product = models.Product
+        terms = re.findall(r"\w+", query.lower())
+        similarity = func.word_similarity(query, product.name)
+        condition = literal(query).op("<%")(product.name)
+        rank = similarity
+
+        if terms:
+            ts_query = func.to_tsquery(
+                literal_column("'russian'"), " & ".join(f"{term}:*" for term in terms)
+            )
+            condition = or_(product.search_vector.op("@@")(ts_query), condition)
+            rank = func.ts_rank_cd(product.search_vector, ts_query) + similarity
+
+        result = await self.session.execute(
+            select(product)
+            .options(*_card_options())
+            .where(product.is_active.is_(true()), condition)
+            .order_by(rank.desc(), product.id.desc())
+            .limit(limit)
+            .offset(offset)
+        )
+        return result.scalars().all()
+
+    async def get_public_version(self, product_id: int) -> tuple[int, datetime] | None:
+        """
+        (id, updated_at) активного товара без загрузки связей.
+        """
+        result = await self.session.execute(
+            select(models.Product.id, models.Product.updated_at).where(
+                models.Product.id == product_id,
+                models.Product.is_active.is_(true()),
+            )
+        )
+        row = result.one_or_none()
+        return (row.id, row.updated_at) if row else None
+
+    async def _touch_products(self, condition: ColumnElement[bool], op: ChangeOp = "updated") -> None:
+        """
+        Пересчитывает производные данные товаров после изменения их самих, тегов
+        или категории: updated_at (от него зависят ETag), поисковые имена тегов
+        и материализованные карточки — и пишет изменение в журнал. Вызывается
+        до commit, в той же транзакции.
+        """
+        await self.session.execute(
+            update(models.Product)
+            .where(condition)
+            .values(updated_at=func.now(), search_tags=_search_tags())
+            .execution_options(synchronize_session=False)
+        )
+        await rebuild_cards(self.session, condition)
+        await record_changes(self.session, op, condition)
+
+    async def reindex(self, condition: ColumnElement[bool]) -> None:
+        """
+        Пересчитывает поисковые имена тегов и карточки товаров без изменения
+        updated_at: содержимое ответов не меняется, если производные данные
+        были в порядке. Коммит — на вызывающем.
+        """
+        await self.session.execute(
+            update(models.Product)
+            .where(condition)
+            .values(search_tags=_search_tags())
+            .execution_options(synchronize_session=False)
+        )
+        await rebuild_cards(self.session, condition)
+
+    async def _product_ids(self, condition: ColumnElement[bool]) -> List[int]:
+        result = await self.session.execute(select(models.Product.id).where(condition))
+        return list(result.scalars())
+
+    def _tag_products(self, tag: models.Tag) -> ColumnElement[bool]:
+        """
+        Товары, в карточках которых виден тег: отмеченные им и товары его категории.
+        """
+        return or_(
+            models.Product.category_id == tag.category_id,
+            models.Product.id.in_(
+                select(models.ProductTag.product_id).where(models.ProductTag.tag_id == tag.id)
+            ),
+        )
+
     async def create_category(self, name: str) -> models.Category:
         """
         Создать категорию
@@ -183,17 +684,10 @@ class ProductService:
         await self.session.flush()
         await self.session.refresh(category)
         await self.session.commit()
+        await publish_taxonomy()
+        await publish_suggest(upsert=[("category", category.id, name)])
         return category
 
-    async def list_categories(self) -> List[models.Category]:
-        """
-        Получить все категории (с тегами).
-        """
-        result = await self.session.execute(
-            select(models.Category).options(selectinload(models.Category.tags))
-        )
-        return result.scalars().all()
-
     async def update_category(self, category_id: int, name: str) -> models.Category | None:
         """
         Обновить категорию.
@@ -202,19 +696,44 @@ class ProductService:
         if not category:
             return None
         category.name = name
+        await self._touch_products(models.Product.category_id == category_id)
         await self.session.commit()
+        await invalidate_catalog()
+        await publish_taxonomy()
+        await publish_suggest(upsert=[("category", category_id, name)])
         await self.session.refresh(category)
         return category
 
     async def delete_category(self, category_id: int) -> bool:
         """
-        Удалить категорию.
+        Удалить категорию вместе с её тегами. Товары категории остаются без
+        категории; всё делается несколькими DELETE/UPDATE без загрузки ORM-объектов.
         """
-        category = await self.session.get(models.Category, category_id)
-        if not category:
+        exists = await self.session.scalar(select(models.Category.id).where(models.Category.id == category_id))
+        if exists is None:
             return False
-        await self.session.delete(category)
+        category_tags = select(models.Tag.id).where(models.Tag.category_id == category_id)
+        tag_ids = list(await self.session.scalars(category_tags))
+        affected = await self._product_ids(or_(
+            models.Product.category_id == category_id,
+            models.Product.id.in_(
+                select(models.ProductTag.product_id).where(models.ProductTag.tag_id.in_(category_tags))
+            ),
+        ))
+        await self.session.execute(
+            update(models.Product)
+            .where(models.Product.category_id == category_id)
+            .values(category_id=None)
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.execute(delete(models.ProductTag).where(models.ProductTag.tag_id.in_(category_tags)))
+        # Теги категории удаляет ON DELETE CASCADE.
+        await self.session.execute(delete(models.Category).where(models.Category.id == category_id))
+        await self._touch_products(models.Product.id == _any(affected))
         await self.session.commit()
+        await invalidate_catalog()
+        await publish_taxonomy()
+        await publish_suggest(remove=[("category", category_id), *(("tag", tid) for tid in tag_ids)])
         return True
 
     async def create_tag(self, name: str, category_id: int) -> models.Tag:
@@ -227,26 +746,14 @@ class ProductService:
 
         tag = models.Tag(name=name, category_id=category_id)
         self.session.add(tag)
+        await self._touch_products(models.Product.category_id == category_id)
         await self.session.commit()
+        await invalidate_catalog()
+        await publish_taxonomy()
         await self.session.refresh(tag)
+        await publish_suggest(upsert=[("tag", tag.id, tag.name)])
         return tag
 
-    async def list_tags(self) -> List[models.Tag]:
-        """
-        Получить все теги.
-        """
-        result = await self.session.execute(select(models.Tag))
-        return result.scalars().all()
-
-    async def list_tags_by_category(self, category_id: int) -> List[models.Tag]:
-        """
-        Получить все теги определённой категории.
-        """
-        result = await self.session.execute(
-            select(models.Tag).where(models.Tag.category_id == category_id)
-        )
-        return result.scalars().all()
-
     async def update_tag(self, tag_id: int, name: str) -> models.Tag | None:
         """
         Обновить тег.
@@ -255,17 +762,27 @@ class ProductService:
         if not tag:
             return None
         tag.name = name
+        await self._touch_products(self._tag_products(tag))
         await self.session.commit()
+        await invalidate_catalog()
+        await publish_taxonomy()
         await self.session.refresh(tag)
+        await publish_suggest(upsert=[("tag", tag.id, tag.name)])
         return tag
 
     async def delete_tag(self, tag_id: int) -> bool:
         """
-        Удалить тег.
+        Удалить тег и его привязки к товарам.
         """
         tag = await self.session.get(models.Tag, tag_id)
         if not tag:
             return False
-        await self.session.delete(tag)
+        affected = await self._product_ids(self._tag_products(tag))
+        await self.session.execute(delete(models.ProductTag).where(models.ProductTag.tag_id == tag_id))
+        await self.session.execute(delete(models.Tag).where(models.Tag.id == tag_id))
+        await self._touch_products(models.Product.id == _any(affected))
         await self.session.commit()
-        return True
\ No newline at end of file
+        await invalidate_catalog()
+        await publish_taxonomy()
+        await publish_suggest(remove=[("tag", tag_id)])
+        return True
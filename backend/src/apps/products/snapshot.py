@@ -0,0 +1,611 @@
+"""
+Снимок публичного каталога в памяти воркера (PUBLIC_READ_ENGINE=memory).
+
+Активные товары при старте загружаются в колоночное хранилище: числовые
+колонки (id, цены в копейках, даты в микросекундах) лежат в array, куски JSON
+карточки — в списках bytes, а принадлежность товаров категориям, тегам и
+наличию на складе — в битовых масках (int, бит на строку). Фильтр — это AND/OR
+масок, сортировки — заранее упорядоченные массивы номеров строк, поэтому
+list_public, list_public_page, get_public и get_many_public отвечают без БД
+и отдают те же байты, что и product_cards.
+
+Изменения товаров приходят по шине вместе с инвалидациями кэша товаров:
+изменённые строки перечитываются из БД и применяются на месте, изменения
+категорий и тегов, переподключение шины и таймер SNAPSHOT_RECONCILE_SECONDS
+вызывают полную пересборку. Все загрузки идут по одной, поэтому более
+поздняя всегда применяется последней.
+"""
+
+import asyncio
+import logging
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Callable, Iterable, Iterator
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from functools import reduce
+from itertools import islice
+from operator import or_
+from typing import Any, List
+
+from pydantic_core import to_json
+from sqlalchemy import ColumnElement, func, select, true
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+
+from src.core.bus import RECONNECTED, EventBus, bus
+from src.core.db import async_session_maker, set_statement_timeout
+from src.core.exceptions import AppException
+from src.core.pagination import encode_cursor
+from src.core.settings import Settings
+from src.apps.products import models, schemas
+from src.apps.products.cache import parse_product_key, product_cache
+from src.apps.products.cards import Card, images_column
+from src.apps.products.sorting import SORTS, dump_sort_key, parse_cursor
+
+logger = logging.getLogger(__name__)
+
+settings = Settings()
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+_NO_TAGS: tuple[int, ...] = ()
+
+# Фильтр, под который попадает меньше 1/_SPARSE строк, выгоднее отсортировать
+# целиком, чем искать его строки в полном порядке сортировки.
+_SPARSE = 16
+
+# Пачка строк при загрузке: разбор одной пачки не должен надолго занимать event loop.
+_LOAD_BATCH = 1000
+
+# До стольких изменённых товаров порядки сортировки правятся вставками, больше — строятся заново.
+_INCREMENTAL_ORDERS = 256
+
+
+def _cents(value: Decimal) -> int:
+    return int(value * 100)
+
+
+def _micros(value: datetime) -> int:
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def _sort_values(row) -> tuple[int, int, int]:
+    """
+    Ключи сортировок товара: цена с учётом скидки и скидка в копейках, создание в микросекундах.
+    """
+    price = _cents(row.price)
+    effective = _cents(row.discount_price) if row.discount_price is not None else price
+    return effective, price - effective, _micros(row.created_at)
+
+
+def _bits(mask: int) -> Iterator[int]:
+    """
+    Номера установленных битов маски по возрастанию.
+    """
+    text = format(mask, "b")[::-1]
+    position = text.find("1")
+    while position >= 0:
+        yield position
+        position = text.find("1", position + 1)
+
+
+def _product_columns() -> tuple[ColumnElement, ...]:
+    product, link = models.Product, models.ProductTag
+    tag_ids = (
+        select(func.array_agg(aggregate_order_by(link.tag_id, link.tag_id)))
+        .where(link.product_id == product.id)
+        .scalar_subquery()
+    )
+    return (
+        product.id, product.name, product.description, product.size,
+        product.price, product.discount_price, product.main_image_url,
+        product.is_active, product.stock, product.category_id,
+        images_column().label("images"), tag_ids.label("tag_ids"),
+        product.created_at, product.updated_at,
+    )
+
+
+class Snapshot:
+    """
+    Колоночное хранилище активных товаров. Строка — номер товара в колонках;
+    удалённые строки только снимаются с маски `alive` и пропадают при пересборке.
+    """
+
+    def __init__(self, categories: Iterable[tuple[int, str]], tags: Iterable[tuple[int, str, int]]):
+        self.ids = array("q")
+        self.price = array("q")
+        self.discount = array("q")
+        self.created = array("q")
+        self.updated = array("q")
+        self.category = array("q")
+        # Карточка: head + category + images + tags + tail.
+        self.head: list[bytes] = []
+        self.images: list[bytes] = []
+        self.tags: list[tuple[int, ...]] = []
+        self.tail: list[bytes] = []
+        self.pos: dict[int, int] = {}
+
+        self.alive = 0
+        self.stocked = 0
+        self.by_category: dict[int, int] = {}
+        self.by_tag: dict[int, int] = {}
+        self._orders: dict[schemas.ProductSort, array] = {}
+        self._members: dict[tuple[str, int], list[int]] = {}
+
+        tag_json: dict[int, bytes] = {}
+        category_tags: dict[int, list[dict]] = {}
+        for tag_id, name, category_id in sorted(tags):
+            tag = {"id": tag_id, "name": name, "categoryId": category_id}
+            tag_json[tag_id] = to_json(tag)
+            category_tags.setdefault(category_id, []).append(tag)
+        self.tag_json = tag_json
+        self.category_json = {
+            category_id: to_json({"id": category_id, "name": name, "tags": category_tags.get(category_id, [])})
+            for category_id, name in categories
+        }
+
+    def __len__(self) -> int:
+        return self.alive.bit_count()
+
+    def knows(self, row) -> bool:
+        """
+        Известны ли снимку категория и теги товара: новые категории и теги
+        появляются в нём только при пересборке.
+        """
+        return (row.category_id is None or row.category_id in self.category_json) and all(
+            tag_id in self.tag_json for tag_id in row.tag_ids or ()
+        )
+
+    def extend(self, rows: Iterable) -> None:
+        """
+        Дописывает пачку товаров при полной загрузке. Маски собираются один раз
+        в seal(): побитовое OR с растущим int на каждой строке обходится квадратично.
+        """
+        members = self._members
+        for row in rows:
+            r = self._new_row(row.id)
+            self._write(r, row)
+            members.setdefault(("alive", 0), []).append(r)
+            if row.stock > 0:
+                members.setdefault(("stocked", 0), []).append(r)
+            if row.category_id is not None:
+                members.setdefault(("category", row.category_id), []).append(r)
+            for tag_id in self.tags[r]:
+                members.setdefault(("tag", tag_id), []).append(r)
+
+    def seal(self) -> None:
+        """
+        Строит маски из строк, собранных extend().
+        """
+        size = (len(self.ids) + 7) // 8
+        for (kind, item_id), rows in self._members.items():
+            bitmap = bytearray(size)
+            for r in rows:
+                bitmap[r >> 3] |= 1 << (r & 7)
+            mask = int.from_bytes(bitmap, "little")
+            if kind == "category":
+                self.by_category[item_id] = mask
+            elif kind == "tag":
+                self.by_tag[item_id] = mask
+            else:
+                setattr(self, kind, mask)
+        self._members.clear()
+
+    def upsert(self, row) -> None:
+        """
+        Добавляет или заменяет товар по строке с колонками _product_columns().
+        Построенные порядки сортировки поправляются вставкой, а не пересортировкой.
+        """
+        r = self.pos.get(row.id)
+        if r is None:
+            r = self._new_row(row.id)
+            self._write(r, row)
+            moved = True
+        else:
+            self._unlink(r)
+            moved = _sort_values(row) != (self.price[r], self.discount[r], self.created[r])
+            if moved:
+                self._take_out(r)
+            self._write(r, row)
+
+        bit = 1 << r
+        self.alive |= bit
+        if row.stock > 0:
+            self.stocked |= bit
+        if row.category_id is not None:
+            self.by_category[row.category_id] = self.by_category.get(row.category_id, 0) | bit
+        for tag_id in self.tags[r]:
+            self.by_tag[tag_id] = self.by_tag.get(tag_id, 0) | bit
+        if moved:
+            for sort, order in self._orders.items():
+                insort(order, r, key=self._sort_key(sort))
+
+    def _new_row(self, product_id: int) -> int:
+        r = len(self.ids)
+        self.pos[product_id] = r
+        for column in (self.ids, self.price, self.discount, self.created, self.updated, self.category):
+            column.append(0)
+        for column in (self.head, self.images, self.tail):
+            column.append(b"")
+        self.tags.append(_NO_TAGS)
+        self.ids[r] = product_id
+        return r
+
+    def _write(self, r: int, row) -> None:
+        self.price[r], self.discount[r], self.created[r] = _sort_values(row)
+        self.updated[r] = _micros(row.updated_at)
+        self.category[r] = row.category_id or 0
+        self.head[r] = to_json({
+            "id": row.id, "name": row.name, "description": row.description, "size": row.size,
+            "price": row.price, "discountPrice": row.discount_price, "mainImageUrl": row.main_image_url,
+            "isActive": row.is_active, "stock": row.stock,
+        })[:-1]
+        self.images[r] = to_json(row.images)
+        self.tags[r] = tuple(row.tag_ids) if row.tag_ids else _NO_TAGS
+        self.tail[r] = b"," + to_json({"createdAt": row.created_at, "updatedAt": row.updated_at})[1:]
+
+    def drop_orders(self) -> None:
+        """
+        Сбрасывает порядки сортировки: перед большой пачкой изменений дешевле
+        отсортировать заново при следующем запросе, чем вставлять по одной строке.
+        """
+        self._orders.clear()
+
+    def _take_out(self, r: int) -> None:
+        """
+        Убирает строку из построенных порядков сортировки по её текущим ключам.
+        """
+        for sort, order in self._orders.items():
+            key = self._sort_key(sort)
+            i = bisect_left(order, key(r), key=key)
+            # Удалённая и снова добавленная строка того же товара может иметь тот же ключ.
+            while order[i] != r:
+                i += 1
+            del order[i]
+
+    def remove(self, product_id: int) -> None:
+        r = self.pos.pop(product_id, None)
+        if r is None:
+            return
+        self._unlink(r)
+        self.alive &= ~(1 << r)
+        self.head[r] = self.images[r] = self.tail[r] = b""
+        self.tags[r] = _NO_TAGS
+
+    def _unlink(self, r: int) -> None:
+        """
+        Снимает строку с масок категории, тегов и наличия.
+        """
+        clear = ~(1 << r)
+        self.stocked &= clear
+        if self.category[r]:
+            self.by_category[self.category[r]] &= clear
+        for tag_id in self.tags[r]:
+            self.by_tag[tag_id] &= clear
+
+    def card(self, r: int) -> Card:
+        category = self.category_json.get(self.category[r], b"null")
+        tags = b"[" + b",".join(self.tag_json[t] for t in self.tags[r] if t in self.tag_json) + b"]"
+        body = b"".join((
+            self.head[r], b',"category":', category, b',"images":', self.images[r], b',"tags":', tags, self.tail[r],
+        ))
+        return Card(self.ids[r], _EPOCH + self.updated[r] * _MICROSECOND, body)
+
+    def _sort_key(self, sort: schemas.ProductSort) -> Callable[[int], Any]:
+        """
+        Ключ строки, по возрастанию которого идут товары в сортировке `sort`.
+        """
+        ids = self.ids
+        attr, descending = SORTS[sort]
+        if attr is None:
+            return lambda r: -ids[r]
+        column = {"effective_price": self.price, "discount_amount": self.discount, "created_at": self.created}[attr]
+        if descending:
+            return lambda r: (-column[r], -ids[r])
+        return lambda r: (column[r], ids[r])
+
+    def _cursor_key(self, sort: schemas.ProductSort, cursor: str) -> Any:
+        key, last_id = parse_cursor(cursor, sort)
+        attr, descending = SORTS[sort]
+        if attr is None:
+            return -last_id
+        value = _micros(key) if attr == "created_at" else _cents(key)
+        return (-value, -last_id) if descending else (value, last_id)
+
+    def next_cursor(self, sort: schemas.ProductSort, r: int) -> str:
+        attr, _ = SORTS[sort]
+        if attr == "created_at":
+            key = _EPOCH + self.created[r] * _MICROSECOND
+        elif attr:
+            column = self.price if attr == "effective_price" else self.discount
+            key = Decimal(column[r]).scaleb(-2)
+        else:
+            key = None
+        return encode_cursor(sort.value, dump_sort_key(key), self.ids[r])
+
+    def order(self, sort: schemas.ProductSort) -> array:
+        """
+        Живые строки в порядке сортировки; после изменений строится заново при первом запросе.
+        """
+        order = self._orders.get(sort)
+        if order is None:
+            order = array("q", sorted(_bits(self.alive), key=self._sort_key(sort)))
+            self._orders[sort] = order
+        return order
+
+    def _mask(self, filters: schemas.ProductFilter) -> int:
+        mask = self.alive
+        if filters.category_id is not None:
+            mask &= self.by_category.get(filters.category_id, 0)
+        if filters.tag_ids:
+            tags = [self.by_tag.get(tag_id, 0) for tag_id in set(filters.tag_ids)]
+            mask &= reduce(int.__and__ if filters.tag_mode == "all" else or_, tags)
+        if filters.in_stock is True:
+            mask &= self.stocked
+        elif filters.in_stock is False:
+            mask &= ~self.stocked
+        return mask
+
+    def select(self, filters: schemas.ProductFilter, offset: int, limit: int, after: str | None = None) -> List[int]:
+        """
+        Строки страницы: `limit` строк после курсора `after` и `offset` пропущенных.
+        """
+        mask = self._mask(filters)
+        low = _cents(filters.min_price) if filters.min_price is not None else None
+        high = _cents(filters.max_price) if filters.max_price is not None else None
+        price = self.price
+
+        def matches(r: int) -> bool:
+            return (low is None or price[r] >= low) and (high is None or price[r] <= high)
+
+        key = self._sort_key(filters.sort)
+        start_key = self._cursor_key(filters.sort, after) if after else None
+
+        if mask.bit_count() * _SPARSE < len(self.ids):
+            rows = sorted((r for r in _bits(mask) if matches(r)), key=key)
+            start = bisect_right(rows, start_key, key=key) if start_key is not None else 0
+            return rows[start + offset:start + offset + limit]
+
+        order = self.order(filters.sort)
+        start = bisect_right(order, start_key, key=key) if start_key is not None else 0
+        bits = mask.to_bytes((len(self.ids) + 7) // 8, "little")
+        found: List[int] = []
+        for r in islice(order, start, None):
+            if bits[r >> 3] >> (r & 7) & 1 and matches(r):
+                if offset:
+                    offset -= 1
+                    continue
+                found.append(r)
+                if len(found) == limit:
+                    break
+        return found
+
+    def nbytes(self) -> int:
+        """
+        Приблизительный объём снимка в байтах (колонки, куски карточек, маски и индексы).
+        """
+        total = sum(
+            column.buffer_info()[1] * column.itemsize
+            for column in (self.ids, self.price, self.discount, self.created, self.updated, self.category)
+        )
+        for column in (self.head, self.images, self.tail, self.tags):
+            total += sys.getsizeof(column) + sum(sys.getsizeof(item) for item in column if item)
+        total += sum(sys.getsizeof(mask) for mask in (self.alive, self.stocked))
+        total += sum(sys.getsizeof(mask) for mask in (*self.by_category.values(), *self.by_tag.values()))
+        total += sys.getsizeof(self.pos) + sum(o.buffer_info()[1] * o.itemsize for o in self._orders.values())
+        total += sum(map(len, self.category_json.values())) + sum(map(len, self.tag_json.values()))
+        return total
+
+
+async def load_snapshot() -> Snapshot:
+    """
+    Полная загрузка активных товаров, категорий и тегов из основной БД.
+    """
+    async with async_session_maker() as session:
+        await set_statement_timeout(session, 0)
+        categories = (await session.execute(select(models.Category.id, models.Category.name))).tuples()
+        tags = (await session.execute(select(models.Tag.id, models.Tag.name, models.Tag.category_id))).tuples()
+        snapshot = Snapshot(categories, tags)
+        stream = await session.stream(
+            select(*_product_columns())
+            .where(models.Product.is_active.is_(true()))
+            .order_by(models.Product.id)
+            .execution_options(yield_per=_LOAD_BATCH)
+        )
+        async for rows in stream.partitions():
+            snapshot.extend(rows)
+    snapshot.seal()
+    return snapshot
+
+
+class CatalogSnapshot:
+    """
+    Снимок каталога воркера: чтение в интерфейсе ProductReader и фоновое
+    применение изменений. Пока снимок не загружен, `ready` ложно и
+    публичные ручки читают из БД.
+    """
+
+    def __init__(self, bus: EventBus, reconcile_interval: float):
+        self.reconcile_interval = reconcile_interval
+        self.data: Snapshot | None = None
+        self.loaded_at: float | None = None
+        self.load_seconds = 0.0
+        self.nbytes = 0
+        self.deltas = 0
+        self._pending: set[int] = set()
+        self._full = False
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+        bus.subscribe(product_cache.topic, self._on_invalidate)
+        bus.subscribe(RECONNECTED, lambda _: self._request(full=True))
+
+    @property
+    def ready(self) -> bool:
+        return self.data is not None
+
+    async def start(self) -> None:
+        """
+        Загружает снимок и запускает фоновое применение изменений. Если БД
+        недоступна, загрузка повторится в фоне.
+        """
+        try:
+            await self.reload()
+        except Exception:
+            logger.exception("Не удалось загрузить снимок каталога")
+            self._full = True
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def reload(self) -> None:
+        started = time.perf_counter()
+        data = await load_snapshot()
+        # Порядки сортировки строятся до подмены снимка, а не первым запросом после неё.
+        for sort in schemas.ProductSort:
+            data.order(sort)
+            await asyncio.sleep(0)
+        self.load_seconds = time.perf_counter() - started
+        self.nbytes = data.nbytes()
+        self.data = data
+        self.loaded_at = time.time()
+        logger.info("Снимок каталога загружен: %d товаров за %.2f с", len(data), self.load_seconds)
+
+    async def apply(self, product_ids: Iterable[int]) -> None:
+        """
+        Перечитывает товары из БД и применяет их к снимку: неактивные и удалённые убираются.
+        """
+        data = self.data
+        ids = list(product_ids)
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(*_product_columns()).where(models.Product.id.in_(ids))
+            )
+            rows = result.all()
+        if any(not data.knows(row) for row in rows):
+            await self.reload()
+            return
+
+        if len(rows) > _INCREMENTAL_ORDERS:
+            data.drop_orders()
+        found = set()
+        for row in rows:
+            found.add(row.id)
+            if row.is_active:
+                data.upsert(row)
+            else:
+                data.remove(row.id)
+        for product_id in ids:
+            if product_id not in found:
+                data.remove(product_id)
+        self.deltas += 1
+
+    async def list_public(
+        self,
+        limit: int = 20,
+        offset: int = 0,
+        filters: schemas.ProductFilter | None = None,
+    ) -> List[Card]:
+        """
+        То же, что ProductService.list_public.
+        """
+        filters = filters or schemas.ProductFilter()
+        return [self.data.card(r) for r in self.data.select(filters, offset, limit)]
+
+    async def list_public_page(
+        self,
+        limit: int = 20,
+        cursor: str | None = None,
+        filters: schemas.ProductFilter | None = None,
+    ) -> tuple[List[Card], str | None]:
+        """
+        То же, что ProductService.list_public_page.
+        """
+        filters = filters or schemas.ProductFilter()
+        data = self.data
+        rows = data.select(filters, 0, limit + 1, after=cursor or None)
+        cards = [data.card(r) for r in rows[:limit]]
+        if len(rows) <= limit:
+            return cards, None
+        return cards, data.next_cursor(filters.sort, rows[limit - 1])
+
+    async def get_public(self, product_id: int) -> Card:
+        """
+        То же, что ProductService.get_public.
+        """
+        r = self.data.pos.get(product_id)
+        if r is None:
+            raise AppException("Товар не найден", status_code=404)
+        return self.data.card(r)
+
+    async def get_many_public(self, product_ids: Iterable[int]) -> tuple[List[Card], List[int]]:
+        """
+        То же, что ProductService.get_many_public.
+        """
+        data = self.data
+        ids = list(dict.fromkeys(product_ids))
+        return (
+            [data.card(data.pos[pid]) for pid in ids if pid in data.pos],
+            [pid for pid in ids if pid not in data.pos],
+        )
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "products": len(self.data) if self.data else 0,
+            "rows": len(self.data.ids) if self.data else 0,
+            "bytes": self.nbytes,
+            "load_seconds": self.load_seconds,
+            "loaded_at": self.loaded_at,
+            "deltas": self.deltas,
+            "pending": len(self._pending),
+        }
+
+    def _on_invalidate(self, data: dict) -> None:
+        if self._task is None:
+            return
+        if data["everything"]:
+            self._request(full=True)
+            return
+        ids = [pid for pid in map(parse_product_key, data["keys"]) if pid is not None]
+        if ids:
+            self._request(ids)
+
+    def _request(self, ids: Iterable[int] = (), full: bool = False) -> None:
+        self._full = self._full or full
+        self._pending.update(ids)
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.reconcile_interval)
+            except TimeoutError:
+                self._full = True
+            self._wakeup.clear()
+            try:
+                if self._full or self.data is None:
+                    # Изменения, пришедшие до начала загрузки, в неё уже попадут.
+                    self._full = False
+                    self._pending.clear()
+                    await self.reload()
+                elif self._pending:
+                    ids, self._pending = self._pending, set()
+                    await self.apply(ids)
+            except Exception:
+                logger.exception("Не удалось обновить снимок каталога")
+                self._full = True
+                await asyncio.sleep(1.0)
+                self._wakeup.set()
+
+
+catalog_snapshot = CatalogSnapshot(bus, reconcile_interval=settings.SNAPSHOT_RECONCILE_SECONDS)
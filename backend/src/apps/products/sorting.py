@@ -0,0 +1,86 @@
+"""
+Сортировки публичного каталога и курсоры keyset-пагинации.
+
+Общие для всех путей чтения: ProductService (ORM), ProductReader (Core)
+и снимка каталога в памяти, поэтому курсор, выданный одним путём,
+принимается любым другим.
+"""
+
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any
+
+from sqlalchemy import ColumnElement, Select, tuple_
+
+from src.core.exceptions import AppException
+from src.core.pagination import decode_cursor
+from src.apps.products import models, schemas
+
+# Сортировка -> (атрибут товара с ключом сортировки, по убыванию ли).
+# Для каждого ключа есть частичный индекс (ключ, id) из models.
+SORTS: dict[schemas.ProductSort, tuple[str | None, bool]] = {
+    schemas.ProductSort.newest: (None, True),
+    schemas.ProductSort.price_asc: ("effective_price", False),
+    schemas.ProductSort.price_desc: ("effective_price", True),
+    schemas.ProductSort.created_at_asc: ("created_at", False),
+    schemas.ProductSort.created_at_desc: ("created_at", True),
+    schemas.ProductSort.discount_desc: ("discount_amount", True),
+}
+
+
+def apply_order(stmt: Select, sort: schemas.ProductSort) -> Select:
+    """
+    Добавляет сортировку с id в качестве последнего ключа.
+    """
+    attr, descending = SORTS[sort]
+    columns = [models.Product.id]
+    if attr:
+        columns.insert(0, getattr(models.Product, attr))
+    return stmt.order_by(*(c.desc() if descending else c.asc() for c in columns))
+
+
+def dump_sort_key(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def parse_cursor(cursor: str, sort: schemas.ProductSort) -> tuple[Any, int]:
+    """
+    Ключ сортировки и id последней записи из курсора.
+    """
+    sort_value, key, last_id = decode_cursor(cursor, 3)
+    if sort_value != sort.value:
+        raise AppException("Курсор относится к другой сортировке", status_code=400)
+
+    attr, _ = SORTS[sort]
+    try:
+        last_id = int(last_id)
+        if attr == "created_at":
+            key = datetime.fromisoformat(key)
+        elif attr:
+            key = Decimal(key)
+            # Цены — numeric(10, 2): NaN, бесконечность и число длиннее в курсоре взяться не могли.
+            if not key.is_finite() or key.adjusted() >= 8:
+                raise ValueError(key)
+    except (TypeError, ValueError, InvalidOperation):
+        raise AppException("Некорректный курсор", status_code=400)
+    if not 0 <= last_id <= schemas.PRODUCT_ID_MAX:
+        raise AppException("Некорректный курсор", status_code=400)
+    return key, last_id
+
+
+def after_cursor(cursor: str, sort: schemas.ProductSort) -> ColumnElement[bool]:
+    """
+    Условие «после курсора» в виде сравнения строк (ключ, id), которое идёт по индексу.
+    """
+    key, last_id = parse_cursor(cursor, sort)
+    attr, descending = SORTS[sort]
+    if attr is None:
+        current, last = models.Product.id, last_id
+    else:
+        current = tuple_(getattr(models.Product, attr), models.Product.id)
+        last = tuple_(key, last_id)
+    return current < last if descending else current > last
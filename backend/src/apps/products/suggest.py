@@ -0,0 +1,229 @@
+"""
+Индекс подсказок для поиска по мере ввода.
+
+Имена активных товаров, категорий и тегов лежат в памяти воркера в отсортированном
+массиве ключей, поиск по префиксу — двоичный (bisect). Ключ — нормализованное имя,
+начиная с каждого его слова, поэтому «gal» находит «Samsung Galaxy». Индекс строится
+при старте приложения, а изменения из ProductService приходят через шину событий
+во все воркеры.
+"""
+
+import asyncio
+import logging
+import re
+from bisect import bisect_left
+from collections.abc import Iterable
+from typing import Literal
+
+from sqlalchemy import select, true
+
+from src.core.bus import RECONNECTED, EventBus, bus, fits
+from src.core.db import async_session_maker
+from src.core.settings import Settings
+from src.apps.products import models
+
+logger = logging.getLogger(__name__)
+
+settings = Settings()
+
+Kind = Literal["product", "category", "tag"]
+Ref = tuple[str, int]
+
+TOPIC = "suggest.products"
+
+# Сколько подходящих ключей просматривать на запрос: ограничивает время ответа
+# для коротких префиксов, под которые попадает весь каталог.
+_SCAN_LIMIT = 256
+
+
+def normalize(text: str) -> str:
+    return text.casefold().replace("ё", "е").strip()
+
+
+def _keys(label: str, key_length: int) -> list[str]:
+    """
+    Ключи имени: нормализованный хвост строки от начала каждого слова, обрезанный до `key_length`.
+    """
+    text = normalize(label)
+    return list(dict.fromkeys(text[m.start():m.start() + key_length] for m in re.finditer(r"\w+", text)))
+
+
+class SuggestIndex:
+    """
+    Префиксный индекс на параллельных отсортированных списках: ключи и ссылки (тип, id).
+
+    Память ограничена: ключи обрезаются до `key_length` символов, а сверх
+    `max_entries` ключей новые имена в индекс не попадают.
+    """
+
+    def __init__(self, bus: EventBus, max_entries: int, key_length: int):
+        self.max_entries = max_entries
+        self.key_length = key_length
+        self.ready = False
+        self.dropped = 0
+        self._keys: list[str] = []
+        self._refs: list[Ref] = []
+        self._labels: dict[Ref, str] = {}
+        self._rebuild: asyncio.Task | None = None
+        self._rebuild_pending = False
+
+        bus.subscribe(TOPIC, self._on_change)
+        bus.subscribe(RECONNECTED, lambda _: self._schedule_rebuild())
+
+    async def build(self) -> None:
+        """
+        Полная сборка индекса из БД.
+        """
+        async with async_session_maker() as session:
+            products = await session.execute(
+                select(models.Product.id, models.Product.name).where(models.Product.is_active.is_(true()))
+            )
+            categories = await session.execute(select(models.Category.id, models.Category.name))
+            tags = await session.execute(select(models.Tag.id, models.Tag.name))
+            entries = [
+                *((("product", pid), name) for pid, name in products),
+                *((("category", cid), name) for cid, name in categories),
+                *((("tag", tid), name) for tid, name in tags),
+            ]
+        self.load(entries)
+        logger.info("Индекс подсказок собран: %d имён, %d ключей", len(self._labels), len(self._keys))
+
+    def load(self, entries: Iterable[tuple[Ref, str]]) -> None:
+        """
+        Заменяет содержимое индекса целиком: одна сортировка вместо вставок по одному.
+        """
+        pairs: list[tuple[str, Ref]] = []
+        labels: dict[Ref, str] = {}
+        self.dropped = 0
+        for ref, label in entries:
+            keys = _keys(label, self.key_length)
+            if len(pairs) + len(keys) > self.max_entries:
+                self.dropped += 1
+                continue
+            labels[ref] = label
+            pairs.extend((key, ref) for key in keys)
+        pairs.sort()
+        self._keys = [key for key, _ in pairs]
+        self._refs = [ref for _, ref in pairs]
+        self._labels = labels
+        self.ready = True
+
+    def upsert(self, kind: Kind, item_id: int, label: str) -> None:
+        ref = (kind, item_id)
+        self.remove(kind, item_id)
+        keys = _keys(label, self.key_length)
+        if len(self._keys) + len(keys) > self.max_entries:
+            self.dropped += 1
+            return
+        self._labels[ref] = label
+        for key in keys:
+            position = bisect_left(self._keys, key)
+            self._keys.insert(position, key)
+            self._refs.insert(position, ref)
+
+    def remove(self, kind: Kind, item_id: int) -> None:
+        ref = (kind, item_id)
+        label = self._labels.pop(ref, None)
+        if label is None:
+            return
+        for key in _keys(label, self.key_length):
+            position = bisect_left(self._keys, key)
+            while position < len(self._keys) and self._keys[position] == key:
+                if self._refs[position] == ref:
+                    del self._keys[position]
+                    del self._refs[position]
+                    break
+                position += 1
+
+    def suggest(self, prefix: str, limit: int = 10) -> list[dict]:
+        """
+        Подсказки по префиксу: сначала совпадения с начала имени, затем короткие имена.
+        """
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        probe = prefix[:self.key_length]
+        found: dict[Ref, bool] = {}
+        position = bisect_left(self._keys, probe)
+        end = min(len(self._keys), position + _SCAN_LIMIT)
+        while position < end and self._keys[position].startswith(probe):
+            ref = self._refs[position]
+            if ref not in found:
+                label = normalize(self._labels[ref])
+                # Ключи обрезаны: длинный префикс сверяем с полным именем.
+                starts = label.startswith(prefix)
+                if starts or len(prefix) <= self.key_length or f" {prefix}" in f" {label}":
+                    found[ref] = starts
+            position += 1
+
+        ranked = sorted(found, key=lambda ref: (not found[ref], len(self._labels[ref]), self._labels[ref]))
+        return [
+            {"type": kind, "id": item_id, "name": self._labels[(kind, item_id)]}
+            for kind, item_id in ranked[:limit]
+        ]
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "names": len(self._labels),
+            "keys": len(self._keys),
+            "max_entries": self.max_entries,
+            "dropped": self.dropped,
+        }
+
+    def _on_change(self, data: dict) -> None:
+        if data.get("rebuild"):
+            self._schedule_rebuild()
+            return
+        for kind, item_id in data.get("remove", ()):
+            self.remove(kind, item_id)
+        for kind, item_id, label in data.get("upsert", ()):
+            self.upsert(kind, item_id, label)
+
+    def _schedule_rebuild(self) -> None:
+        # Пока шина была недоступна, часть изменений могла потеряться,
+        # либо их было слишком много для одного события.
+        # Идущая сборка могла прочитать БД до этих изменений — тогда нужна ещё одна.
+        self._rebuild_pending = True
+        if self._rebuild is None or self._rebuild.done():
+            self._rebuild = asyncio.create_task(self._safe_build())
+
+    async def _safe_build(self) -> None:
+        while self._rebuild_pending:
+            self._rebuild_pending = False
+            try:
+                await self.build()
+            except Exception:
+                logger.exception("Не удалось пересобрать индекс подсказок")
+
+
+suggest_index = SuggestIndex(
+    bus,
+    max_entries=settings.SUGGEST_MAX_ENTRIES,
+    key_length=settings.SUGGEST_KEY_LENGTH,
+)
+
+
+async def publish_suggest(
+    upsert: Iterable[tuple[Kind, int, str]] = (),
+    remove: Iterable[tuple[Kind, int]] = (),
+) -> None:
+    """
+    Рассылает изменения имён всем воркерам (включая текущий). Пачка, которая
+    не помещается в одно событие (импорт, массовые правки), рассылается как
+    команда пересобрать индекс из БД.
+    """
+    data = {"upsert": [list(item) for item in upsert], "remove": [list(item) for item in remove]}
+    if not (data["upsert"] or data["remove"]):
+        return
+    await bus.publish(TOPIC, data if fits(data) else {"rebuild": True})
+
+
+async def publish_products(*products: tuple[int, str, bool]) -> None:
+    """
+    Изменения товаров (id, имя, активен): в подсказках остаются только активные.
+    """
+    await publish_suggest(
+        upsert=[("product", pid, name) for pid, name, is_active in products if is_active],
+        remove=[("product", pid) for pid, _, is_active in products if not is_active],
+    )
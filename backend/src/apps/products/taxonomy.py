@@ -0,0 +1,140 @@
+"""
+Снимок дерева категорий и тегов в памяти воркера.
+
+Дерево меняется редко, а читается на каждой странице витрины, поэтому
+собирается из БД одним проходом и хранится готовыми JSON-телами: всё дерево
+и теги каждой категории. Снимок неизменяем и заменяется целиком. Версия —
+хэш содержимого, поэтому она совпадает во всех воркерах и не меняется от
+пересборки без изменений; из неё строится ETag ответов.
+
+ProductService после изменения категорий и тегов рассылает событие через
+шину, и каждый воркер пересобирает снимок при следующем чтении. На случай
+потерянных событий снимок старше TAXONOMY_MAX_AGE_SECONDS тоже пересобирается.
+"""
+
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import select
+
+from src.core.bus import RECONNECTED, EventBus, bus
+from src.core.db import async_session_maker
+from src.core.http import CachedResponse
+from src.core.responses import dump_json
+from src.core.settings import Settings
+from src.apps.products import models
+from src.apps.products.schemas import CategoryOut, TagOut
+
+settings = Settings()
+
+TOPIC = "taxonomy.products"
+
+
+@dataclass(frozen=True, slots=True)
+class Taxonomy:
+    """
+    Готовые ответы по дереву категорий одной версии.
+    """
+
+    version: str
+    tree: CachedResponse
+    tags: dict[int, CachedResponse]
+    built_at: float
+
+    def category_tags(self, category_id: int) -> CachedResponse:
+        """
+        Теги категории; для неизвестной категории — пустой список той же версии.
+        """
+        return self.tags.get(category_id) or CachedResponse(b"[]", f'"{self.version}-{category_id}"')
+
+
+def build_taxonomy(categories: list[tuple[int, str]], tags: list[tuple[int, str, int]]) -> Taxonomy:
+    """
+    Собирает снимок из строк (id, name) категорий и (id, name, category_id) тегов,
+    отсортированных по id. Тела совпадают с сериализацией CategoryOut и TagOut.
+    """
+    by_category: dict[int, list[dict]] = {cid: [] for cid, _ in categories}
+    for tid, name, cid in tags:
+        if cid in by_category:
+            by_category[cid].append({"id": tid, "name": name, "category_id": cid})
+
+    tree = dump_json(list[CategoryOut], [
+        {"id": cid, "name": name, "tags": by_category[cid]} for cid, name in categories
+    ])
+    version = hashlib.sha1(tree).hexdigest()
+    return Taxonomy(
+        version=version,
+        tree=CachedResponse(tree, f'"{version}"'),
+        tags={
+            cid: CachedResponse(dump_json(list[TagOut], items), f'"{version}-{cid}"')
+            for cid, items in by_category.items()
+        },
+        built_at=time.monotonic(),
+    )
+
+
+class TaxonomySnapshot:
+    """
+    Текущий снимок дерева с ленивой пересборкой после изменений.
+    """
+
+    def __init__(self, bus: EventBus, max_age: float):
+        self.max_age = max_age
+        self.builds = 0
+        self._current: Taxonomy | None = None
+        self._generation = 0
+        self._lock = asyncio.Lock()
+
+        bus.subscribe(TOPIC, lambda _: self.invalidate())
+        bus.subscribe(RECONNECTED, lambda _: self.invalidate())
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._current = None
+
+    def _fresh(self) -> Taxonomy | None:
+        current = self._current
+        if current is not None and time.monotonic() - current.built_at < self.max_age:
+            return current
+        return None
+
+    async def get(self) -> Taxonomy:
+        """
+        Текущий снимок; после изменения его собирает один запрос, остальные ждут.
+        """
+        current = self._fresh()
+        if current is not None:
+            return current
+        async with self._lock:
+            current = self._fresh()
+            if current is not None:
+                return current
+            generation = self._generation
+            current = await self._load()
+            self.builds += 1
+            # Изменение во время сборки: снимок отдаётся, но не сохраняется.
+            if generation == self._generation:
+                self._current = current
+            return current
+
+    async def _load(self) -> Taxonomy:
+        async with async_session_maker() as session:
+            categories = await session.execute(
+                select(models.Category.id, models.Category.name).order_by(models.Category.id)
+            )
+            tags = await session.execute(
+                select(models.Tag.id, models.Tag.name, models.Tag.category_id).order_by(models.Tag.id)
+            )
+            return build_taxonomy([tuple(row) for row in categories], [tuple(row) for row in tags])
+
+
+async def publish_taxonomy() -> None:
+    """
+    Сообщает всем воркерам (включая текущий), что дерево категорий изменилось.
+    """
+    await bus.publish(TOPIC, {})
+
+
+taxonomy_snapshot = TaxonomySnapshot(bus, max_age=settings.TAXONOMY_MAX_AGE_SECONDS)
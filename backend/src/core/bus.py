@@ -0,0 +1,201 @@
+"""
+Шина событий между воркерами приложения.
+
+Воркеры uvicorn — отдельные процессы, поэтому всё, что хранится в памяти процесса
+(кэши, индексы), нужно синхронизировать через общий канал. Событие сначала
+доставляется подписчикам своего процесса, затем рассылается остальным.
+"""
+
+import asyncio
+import inspect
+import json
+import logging
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from uuid import uuid4
+
+from src.core.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[dict], Awaitable[None] | None]
+
+# Событие, которое шина публикует локально после восстановления соединения:
+# пока его не было, часть событий могла потеряться. Подписчики по нему
+# пересобирают своё состояние целиком.
+RECONNECTED = "bus.reconnected"
+
+# Postgres не принимает NOTIFY длиннее 8000 байт.
+MAX_PAYLOAD_BYTES = 7900
+
+# Запас на служебные поля сообщения: origin и topic.
+_ENVELOPE_BYTES = 200
+
+
+def fits(data: dict) -> bool:
+    """
+    Поместятся ли данные события в одно сообщение шины. Если нет, издатель
+    рассылает вместо них грубое событие: «пересобрать всё» вместо списка id.
+    """
+    return len(json.dumps(data).encode()) <= MAX_PAYLOAD_BYTES - _ENVELOPE_BYTES
+
+
+class EventBus:
+    """
+    Базовая шина: доставка подписчикам внутри процесса.
+    """
+
+    def __init__(self):
+        self.origin = uuid4().hex
+        self._handlers: dict[str, list[Handler]] = defaultdict(list)
+
+    def subscribe(self, topic: str, handler: Handler) -> None:
+        self._handlers[topic].append(handler)
+
+    async def publish(self, topic: str, data: dict) -> None:
+        """
+        Доставляет событие локальным подписчикам и остальным воркерам.
+        """
+        await self._dispatch(topic, data)
+        await self._send(topic, data)
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def _send(self, topic: str, data: dict) -> None:
+        pass
+
+    async def _dispatch(self, topic: str, data: dict) -> None:
+        for handler in self._handlers.get(topic, ()):
+            try:
+                result = handler(data)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception("Ошибка обработчика события %s", topic)
+
+
+class MemoryEventBus(EventBus):
+    """
+    Шина в памяти. Экземпляры с общим `hub` ведут себя как воркеры одного
+    приложения — используется в тестах и при запуске в один процесс.
+    """
+
+    def __init__(self, hub: list["MemoryEventBus"] | None = None):
+        super().__init__()
+        self._hub = hub if hub is not None else []
+        self._hub.append(self)
+
+    async def _send(self, topic: str, data: dict) -> None:
+        for peer in self._hub:
+            if peer is not self:
+                await peer._dispatch(topic, data)
+
+
+class PostgresEventBus(EventBus):
+    """
+    Шина на LISTEN/NOTIFY Postgres: отдельное соединение слушает канал и
+    через него же отправляются уведомления.
+    """
+
+    def __init__(self, dsn: str, channel: str = "store_api_events", reconnect_delay: float = 1.0):
+        super().__init__()
+        self.dsn = dsn
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self._conn = None
+        self._send_lock = asyncio.Lock()
+        self._reconnect_task: asyncio.Task | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self._stopping = False
+
+    async def start(self) -> None:
+        self._stopping = False
+        try:
+            await self._connect()
+        except Exception:
+            logger.warning("Шина событий недоступна, переподключаемся в фоне", exc_info=True)
+            self._schedule_reconnect()
+
+    async def stop(self) -> None:
+        self._stopping = True
+        if self._reconnect_task:
+            self._reconnect_task.cancel()
+        if self._conn is not None and not self._conn.is_closed():
+            await self._conn.close()
+        self._conn = None
+
+    async def _connect(self) -> None:
+        import asyncpg
+
+        conn = await asyncpg.connect(self.dsn)
+        await conn.add_listener(self.channel, self._on_notify)
+        conn.add_termination_listener(self._on_terminate)
+        self._conn = conn
+
+    def _schedule_reconnect(self) -> None:
+        if self._stopping or (self._reconnect_task and not self._reconnect_task.done()):
+            return
+        self._reconnect_task = asyncio.create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        delay = self.reconnect_delay
+        while not self._stopping:
+            await asyncio.sleep(delay)
+            try:
+                await self._connect()
+            except Exception:
+                delay = min(delay * 2, 30.0)
+                continue
+            logger.info("Шина событий переподключена")
+            await self._dispatch(RECONNECTED, {})
+            return
+
+    def _on_terminate(self, conn) -> None:
+        self._conn = None
+        self._schedule_reconnect()
+
+    def _on_notify(self, conn, pid: int, channel: str, payload: str) -> None:
+        message = json.loads(payload)
+        if message.get("origin") == self.origin:
+            return
+        task = asyncio.create_task(self._dispatch(message["topic"], message["data"]))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, topic: str, data: dict) -> None:
+        """
+        Рассылает событие остальным воркерам. Слишком большое событие заменяется
+        на RECONNECTED — получатели пересоберут состояние целиком. Ошибки
+        только логируются: событие публикуется после коммита, и запрос из-за
+        него падать не должен.
+        """
+        if self._conn is None:
+            logger.warning("Событие %s не разослано: нет соединения с шиной", topic)
+            return
+        payload = json.dumps({"origin": self.origin, "topic": topic, "data": data})
+        if len(payload.encode()) > MAX_PAYLOAD_BYTES:
+            logger.warning("Событие %s больше %d байт, вместо него разослан %s", topic, MAX_PAYLOAD_BYTES, RECONNECTED)
+            payload = json.dumps({"origin": self.origin, "topic": RECONNECTED, "data": {}})
+        try:
+            async with self._send_lock:
+                await self._conn.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+        except Exception:
+            logger.exception("Событие %s не разослано", topic)
+
+
+def create_bus(settings: Settings) -> EventBus:
+    """
+    Шина по настройке EVENT_BUS: `postgres` или `memory`.
+    """
+    if settings.EVENT_BUS == "memory":
+        return MemoryEventBus()
+    url = settings.DATABASE_DIRECT_URL or settings.DATABASE_URL
+    dsn = url.replace("postgresql+asyncpg://", "postgresql://")
+    return PostgresEventBus(dsn)
+
+
+bus = create_bus(Settings())
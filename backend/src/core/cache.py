@@ -0,0 +1,212 @@
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any
+
+from src.core.bus import RECONNECTED, EventBus
+
+
+class TTLCache:
+    """
+    LRU-кэш в памяти процесса с ограничением по размеру и времени жизни записей.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str) -> Any | None:
+        """
+        Значение по ключу или None, если его нет или оно устарело.
+        """
+        item = self._data.get(key)
+        if item is None or item[0] < time.monotonic():
+            if item is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return item[1]
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Сохраняет значение, вытесняя самые давно использованные записи сверх лимита.
+        """
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._data.pop(key, None)
+
+    def delete_prefix(self, prefix: str) -> None:
+        """
+        Удаляет все записи, ключи которых начинаются с `prefix`.
+        """
+        for key in [k for k in self._data if k.startswith(prefix)]:
+            del self._data[key]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class Cache:
+    """
+    Кэш воркера, согласованный с остальными воркерами через шину событий.
+
+    Значения хранятся локально в TTLCache, а инвалидации рассылаются всем
+    воркерам. Одновременные промахи по одному ключу схлопываются в одну загрузку.
+
+    Если данные читаются с реплик, `settle` — сколько секунд после инвалидации
+    загруженные значения не сохраняются: реплика могла ещё не догнать запись.
+    """
+
+    def __init__(self, name: str, bus: EventBus, maxsize: int, ttl: float, settle: float = 0.0):
+        self.name = name
+        self.bus = bus
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.coalesced = 0
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._generation = 0
+        self.settle = settle
+        self._invalidated_at = float("-inf")
+
+        bus.subscribe(self.topic, self._on_invalidate)
+        bus.subscribe(RECONNECTED, lambda _: self._apply(everything=True))
+
+    @property
+    def topic(self) -> str:
+        return f"cache.{self.name}"
+
+    def get(self, key: str) -> Any | None:
+        return self.local.get(key)
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Значение из кэша или результат `loader`. Пока загрузка идёт, остальные
+        запросы того же ключа ждут её, а не ходят в БД сами. None не кэшируется.
+        """
+        while True:
+            value = self.local.get(key)
+            if value is not None:
+                return value
+
+            future = self._inflight.get(key)
+            if future is None:
+                break
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # Отменили загружающий запрос, а не нас — пробуем снова.
+                if not future.cancelled():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        generation = self._generation
+        settled = time.monotonic() - self._invalidated_at >= self.settle
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()
+            raise
+        else:
+            # Если во время загрузки пришла инвалидация, результат мог устареть.
+            if value is not None and settled and generation == self._generation:
+                self.local.set(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    async def get_many_or_load(
+        self,
+        keys: Iterable[str],
+        loader: Callable[[list[str]], Awaitable[dict[str, Any]]],
+    ) -> dict[str, Any]:
+        """
+        Значения по ключам из кэша; все промахи загружаются одним вызовом
+        `loader(промахи)`, который возвращает словарь ключ -> значение.
+        Ключа, для которого loader ничего не вернул, в результате нет.
+        С одиночными загрузками get_or_load промахи не схлопываются.
+        """
+        found: dict[str, Any] = {}
+        missing: list[str] = []
+        for key in keys:
+            value = self.local.get(key)
+            if value is None:
+                missing.append(key)
+            else:
+                found[key] = value
+        if not missing:
+            return found
+
+        generation = self._generation
+        settled = time.monotonic() - self._invalidated_at >= self.settle
+        loaded = await loader(missing)
+        # Как в get_or_load: после инвалидации во время загрузки результат не кэшируется.
+        if settled and generation == self._generation:
+            for key, value in loaded.items():
+                if value is not None:
+                    self.local.set(key, value)
+        found.update((key, value) for key, value in loaded.items() if value is not None)
+        return found
+
+    async def invalidate(
+        self,
+        keys: Iterable[str] = (),
+        prefixes: Iterable[str] = (),
+        everything: bool = False,
+    ) -> None:
+        """
+        Сбрасывает ключи во всех воркерах.
+        """
+        await self.bus.publish(
+            self.topic,
+            {"keys": list(keys), "prefixes": list(prefixes), "everything": everything},
+        )
+
+    def _on_invalidate(self, data: dict) -> None:
+        self._apply(data["keys"], data["prefixes"], data["everything"])
+
+    def _apply(
+        self,
+        keys: Iterable[str] = (),
+        prefixes: Iterable[str] = (),
+        everything: bool = False,
+    ) -> None:
+        self._generation += 1
+        self._invalidated_at = time.monotonic()
+        self._inflight.clear()
+        if everything:
+            self.local.clear()
+            return
+        self.local.delete(*keys)
+        for prefix in prefixes:
+            self.local.delete_prefix(prefix)
+
+    def stats(self) -> dict:
+        return {**self.local.stats(), "coalesced": self.coalesced}
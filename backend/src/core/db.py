@@ -1,11 +1,26 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+import itertools
+import logging
+import time
 from collections.abc import AsyncGenerator
+from contextvars import ContextVar
+from uuid import uuid4
+
+from fastapi import Request
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker, DeclarativeBase, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from src.core.settings import Settings
 
 settings = Settings()
 
+logger = logging.getLogger(__name__)
+
+# Кука, пока жива которая, чтения клиента идут на основную БД.
+PRIMARY_COOKIE = "db_primary_until"
+
 
 class Base(DeclarativeBase):
     """
@@ -13,22 +28,252 @@ class Base(DeclarativeBase):
     """
 
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=True,
-)
+class PoolStats:
+    """
+    Счётчики ожидания соединения из пула.
+    """
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record(self, waited: float, timed_out: bool = False) -> None:
+        self.checkouts += 1
+        self.timeouts += timed_out
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+
+
+pool_stats = PoolStats()
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Пул, который замеряет время ожидания свободного соединения.
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        pool_stats.record(time.perf_counter() - started)
+        return connection
+
+
+def _engine_options() -> dict:
+    """
+    Параметры движка из настроек.
+
+    В режиме DB_PGBOUNCER (пулинг транзакций) кэши подготовленных выражений
+    отключены, а имена выражений уникальны: соседние транзакции могут попасть
+    на другое серверное соединение. Таймаут выражений там выставляется
+    SET LOCAL в начале каждой транзакции, иначе — параметром соединения.
+    """
+    connect_args: dict = {}
+    if settings.DB_PGBOUNCER:
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    elif settings.DB_STATEMENT_TIMEOUT_MS:
+        connect_args["server_settings"] = {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+
+    options = {
+        "echo": settings.DB_ECHO,
+        "poolclass": TimedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
+    if settings.DB_PGBOUNCER:
+        options["prepared_statement_cache_size"] = 0
+    return options
+
+
+engine = create_async_engine(settings.DATABASE_URL, **_engine_options())
+
+# Таймаут выражений текущего запроса, если он отличается от DB_STATEMENT_TIMEOUT_MS.
+_statement_timeout: ContextVar[int | None] = ContextVar("statement_timeout", default=None)
+
+
+class _Session(Session):
+    pass
+
+
+@event.listens_for(_Session, "after_begin")
+def _set_statement_timeout(session, transaction, connection) -> None:
+    timeout = _statement_timeout.get()
+    if timeout is None:
+        if not settings.DB_PGBOUNCER or not settings.DB_STATEMENT_TIMEOUT_MS:
+            return
+        timeout = settings.DB_STATEMENT_TIMEOUT_MS
+    connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout)}")
+
 
 async_session_maker = sessionmaker(
     engine,
     class_=AsyncSession,
+    sync_session_class=_Session,
     expire_on_commit=False,
 )
 
 
+class ReplicaSet:
+    """
+    Реплики для чтения с круговым выбором.
+
+    Реплика, к которой не удалось подключиться, выводится из ротации на
+    REPLICA_RETRY_SECONDS; если живых реплик нет, читается основная БД.
+    """
+
+    def __init__(self, urls: list[str]):
+        self.urls = urls
+        self.makers = [self._session_maker(url) for url in urls]
+        self.fallbacks = 0
+        self._down_until = [0.0] * len(urls)
+        self._next = itertools.count()
+
+    @staticmethod
+    def _session_maker(url: str) -> sessionmaker:
+        options = _engine_options()
+        options.pop("poolclass")
+        options["connect_args"]["timeout"] = settings.REPLICA_CONNECT_TIMEOUT
+        return sessionmaker(
+            create_async_engine(url, **options),
+            class_=AsyncSession,
+            sync_session_class=_Session,
+            expire_on_commit=False,
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self.makers)
+
+    async def session(self) -> AsyncSession | None:
+        """
+        Сессия на первой доступной реплике (соединение уже взято) или None.
+        """
+        start = next(self._next)
+        now = time.monotonic()
+        for step in range(len(self.makers)):
+            index = (start + step) % len(self.makers)
+            if self._down_until[index] > now:
+                continue
+
+            session = self.makers[index]()
+            try:
+                await session.connection()
+            except PoolTimeoutError:
+                await session.close()
+                continue
+            except (DBAPIError, OSError, TimeoutError) as exc:
+                await session.close()
+                self._down_until[index] = time.monotonic() + settings.REPLICA_RETRY_SECONDS
+                logger.warning("Реплика %d недоступна, выведена из ротации: %s", index, exc)
+                continue
+            return session
+
+        self.fallbacks += 1
+        return None
+
+    def status(self) -> list[dict]:
+        now = time.monotonic()
+        return [
+            {
+                "index": index,
+                "healthy": self._down_until[index] <= now,
+                "checked_out": maker.kw["bind"].pool.checkedout(),
+            }
+            for index, maker in enumerate(self.makers)
+        ]
+
+
+replicas = ReplicaSet(settings.replica_urls)
+
+
+def reads_pinned(request: Request) -> bool:
+    """
+    Клиент недавно писал, и его чтения должны идти на основную БД.
+    """
+    value = request.cookies.get(PRIMARY_COOKIE)
+    if value is None:
+        return False
+    try:
+        return float(value) > time.time()
+    except ValueError:
+        return False
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Зависимость для работы с БД в ручках FastAPI.
     """
-    
+
     async with async_session_maker() as session:
-        yield session
\ No newline at end of file
+        yield session
+
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Зависимость для читающих ручек: сессия на реплике, если они настроены,
+    живы и клиент не писал в последние READ_AFTER_WRITE_SECONDS, иначе на основной БД.
+    """
+
+    # Ручка только читает: POST с такой сессией не закрепляет клиента за основной БД.
+    request.state.read_only = True
+    session = None
+    if replicas and not reads_pinned(request):
+        session = await replicas.session()
+    async with session or async_session_maker() as session:
+        yield session
+
+
+def statement_timeout(milliseconds: int):
+    """
+    Зависимость роутера, задающая таймаут SQL-выражений его ручкам (0 — без ограничения).
+    """
+
+    # Асинхронная, чтобы значение осталось в контексте запроса, а не в потоке пула.
+    async def dependency() -> None:
+        use_statement_timeout(milliseconds)
+
+    return dependency
+
+
+def use_statement_timeout(milliseconds: int) -> None:
+    """
+    Таймаут SQL-выражений для сессий, начатых дальше в текущем контексте (задаче asyncio).
+    """
+    _statement_timeout.set(milliseconds)
+
+
+async def set_statement_timeout(session: AsyncSession, milliseconds: int) -> None:
+    """
+    Таймаут выражений до конца текущей транзакции сессии (0 — без ограничения).
+    """
+    await session.execute(text(f"SET LOCAL statement_timeout = {int(milliseconds)}"))
+
+
+def pool_status() -> dict:
+    """
+    Состояние пула соединений воркера.
+    """
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "checkouts": pool_stats.checkouts,
+        "timeouts": pool_stats.timeouts,
+        "wait_avg_ms": pool_stats.wait_total / pool_stats.checkouts * 1000 if pool_stats.checkouts else 0.0,
+        "wait_max_ms": pool_stats.wait_max * 1000,
+        "replicas": replicas.status(),
+        "replica_fallbacks": replicas.fallbacks,
+    }
@@ -0,0 +1,98 @@
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+
+
+def make_etag(*parts: object) -> str:
+    """
+    Сильный ETag из значений, однозначно определяющих содержимое ответа.
+    """
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def is_conditional(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime | None) -> bool:
+    """
+    Проверка If-None-Match / If-Modified-Since. If-None-Match, если он есть, главнее.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+        return "*" in tags or etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    return _as_utc(last_modified) <= _as_utc(since)
+
+
+def cache_control(value: str):
+    """
+    Зависимость роутера, задающая Cache-Control его ответам.
+
+    Ответам, которые ручка собирает сама (Response), заголовок выставляет
+    apply_cache_control по значению из request.state.
+    """
+
+    def dependency(request: Request, response: Response) -> None:
+        request.state.cache_control = value
+        response.headers["Cache-Control"] = value
+
+    return dependency
+
+
+@dataclass(frozen=True, slots=True)
+class CachedResponse:
+    """
+    Готовое JSON-тело ответа вместе с его валидаторами.
+    """
+
+    body: bytes
+    etag: str
+    last_modified: datetime | None = None
+
+    def to_response(self, request: Request) -> Response:
+        if is_not_modified(request, self.etag, self.last_modified):
+            return not_modified(request, self.etag, self.last_modified)
+        response = Response(self.body, media_type="application/json")
+        _set_validators(request, response, self.etag, self.last_modified)
+        return response
+
+
+def not_modified(request: Request, etag: str, last_modified: datetime | None) -> Response:
+    response = Response(status_code=304)
+    _set_validators(request, response, etag, last_modified)
+    return response
+
+
+def _set_validators(request: Request, response: Response, etag: str, last_modified: datetime | None) -> None:
+    response.headers["ETag"] = etag
+    if last_modified is not None:
+        response.headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+    apply_cache_control(request, response)
+
+
+def apply_cache_control(request: Request, response: Response) -> None:
+    """
+    Переносит Cache-Control роутера на ответ, собранный ручкой.
+    """
+    value = getattr(request.state, "cache_control", None)
+    if value:
+        response.headers["Cache-Control"] = value
@@ -0,0 +1,108 @@
+"""
+Уменьшенные копии изображений в пуле процессов.
+
+Декодирование и кодирование WebP/AVIF занимают процессор на сотни
+миллисекунд, поэтому выполняются в отдельных процессах, а не в event loop
+воркера. Модуль не зависит от приложения: дочерние процессы (spawn)
+импортируют только его и Pillow.
+"""
+
+import asyncio
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+
+# Формат оригинала -> (расширение, Content-Type).
+ORIGINAL_TYPES = {
+    "JPEG": ("jpg", "image/jpeg"),
+    "PNG": ("png", "image/png"),
+    "WEBP": ("webp", "image/webp"),
+    "GIF": ("gif", "image/gif"),
+    "AVIF": ("avif", "image/avif"),
+}
+
+# Формат копии -> (формат Pillow, Content-Type, параметры кодека).
+VARIANT_TYPES = {
+    "webp": ("WEBP", "image/webp", {"quality": 80, "method": 4}),
+    "avif": ("AVIF", "image/avif", {"quality": 55, "speed": 6}),
+}
+
+
+class Variant(NamedTuple):
+    width: int
+    format: str
+    data: bytes
+
+
+class Rendered(NamedTuple):
+    format: str
+    width: int
+    height: int
+    variants: list[Variant]
+
+
+def supported_formats(formats: list[str]) -> list[str]:
+    """
+    Форматы копий, которые умеет кодировать установленный Pillow.
+    """
+    return [f for f in formats if f in VARIANT_TYPES and (f != "avif" or features.check("avif"))]
+
+
+def render_variants(path: str, widths: list[int], formats: list[str], max_pixels: int) -> Rendered:
+    """
+    Читает изображение и кодирует копии шириной из `widths` (не больше оригинала;
+    если оригинал уже всех, то одну копию его ширины) в каждом из `formats`.
+    Выполняется в процессе пула; о непригодном файле сообщает ValueError.
+    """
+    Image.MAX_IMAGE_PIXELS = max_pixels
+    try:
+        with Image.open(path) as source:
+            if source.format not in ORIGINAL_TYPES:
+                raise ValueError(f"Неподдерживаемый формат: {source.format}")
+            original_format = source.format
+            image = ImageOps.exif_transpose(source)
+            width, height = image.size
+            has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+            image = image.convert("RGBA" if has_alpha else "RGB")
+
+            variants = []
+            for target in [w for w in widths if w < width] or [width]:
+                resized = image if target == width else image.resize(
+                    (target, max(1, round(height * target / width))), Image.Resampling.LANCZOS,
+                )
+                for fmt in formats:
+                    pil_format, _, options = VARIANT_TYPES[fmt]
+                    buffer = io.BytesIO()
+                    resized.save(buffer, pil_format, **options)
+                    variants.append(Variant(target, fmt, buffer.getvalue()))
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as exc:
+        raise ValueError(f"Не удалось прочитать изображение: {exc}") from None
+    return Rendered(original_format, width, height, variants)
+
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def _executor(workers: int) -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+async def render(path: str, widths: list[int], formats: list[str], max_pixels: int, workers: int) -> Rendered:
+    """
+    render_variants в пуле процессов; пул создаётся при первой загрузке.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor(workers), render_variants, path, widths, formats, max_pixels)
+
+
+def shutdown() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
@@ -0,0 +1,17 @@
+"""
+Фоновые задачи в Postgres без отдельного брокера.
+
+Задача — строка таблицы jobs. Ручка ставит её в очередь (enqueue) и сразу
+отвечает 202 с id задачи; обработчик (JobWorker) в отдельном процессе
+`python -m src.worker` захватывает задачи через FOR UPDATE SKIP LOCKED,
+выполняет зарегистрированную декоратором @job функцию, пишет прогресс и
+результат, а после ошибки повторяет задачу с растущей задержкой. Состояние
+отдаёт GET /api/admin/jobs/{id}. Так долгая работа не занимает event loop
+и пул соединений воркеров API.
+"""
+
+from src.core.jobs.models import Job, JobStatus
+from src.core.jobs.queue import JobContext, enqueue, get_job, job, registered
+from src.core.jobs.worker import JobWorker
+
+__all__ = ["Job", "JobContext", "JobStatus", "JobWorker", "enqueue", "get_job", "job", "registered"]
@@ -0,0 +1,111 @@
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any
+
+from sqlalchemy import func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.bus import bus
+from src.core.db import async_session_maker
+from src.core.jobs.models import Job
+from src.core.settings import Settings
+
+settings = Settings()
+
+# Событие о новой задаче: будит обработчики, не дожидаясь опроса очереди.
+TOPIC = "jobs.enqueued"
+
+# Прогресс пишется в БД не чаще раза в столько секунд.
+_PROGRESS_INTERVAL = 1.0
+
+
+class JobContext:
+    """
+    Выполняемая задача глазами обработчика: параметры и отчёт о прогрессе.
+    """
+
+    def __init__(self, job: Job, worker_id: str):
+        self.job = job
+        self.worker_id = worker_id
+        self._reported_at = 0.0
+
+    @property
+    def payload(self) -> dict[str, Any]:
+        return self.job.payload
+
+    @property
+    def attempt(self) -> int:
+        return self.job.attempts
+
+    async def progress(self, done: int, total: int | None = None, force: bool = False) -> None:
+        """
+        Сохраняет прогресс (заодно это отметка, что задача жива). Частые вызовы
+        прореживаются; `force` пишет сразу.
+        """
+        now = time.monotonic()
+        if not force and now - self._reported_at < _PROGRESS_INTERVAL:
+            return
+        self._reported_at = now
+        values: dict[str, Any] = {"progress_done": done, "heartbeat_at": func.now()}
+        if total is not None:
+            values["progress_total"] = total
+        async with async_session_maker() as session:
+            await session.execute(
+                update(Job)
+                .where(Job.id == self.job.id, Job.locked_by == self.worker_id)
+                .values(**values)
+            )
+            await session.commit()
+
+
+Handler = Callable[[JobContext], Awaitable[dict[str, Any] | None]]
+
+
+@dataclass(frozen=True, slots=True)
+class JobSpec:
+    handler: Handler
+    max_attempts: int
+
+
+_registry: dict[str, JobSpec] = {}
+
+
+def job(kind: str, max_attempts: int | None = None) -> Callable[[Handler], Handler]:
+    """
+    Регистрирует обработчик задач вида `kind`. Обработчик получает JobContext
+    и возвращает JSON-совместимый результат; исключение — повтор с задержкой,
+    пока не кончатся попытки. Неидемпотентным задачам нужен max_attempts=1.
+    """
+
+    def register(handler: Handler) -> Handler:
+        _registry[kind] = JobSpec(handler, max_attempts or settings.JOBS_MAX_ATTEMPTS)
+        return handler
+
+    return register
+
+
+def registered() -> dict[str, JobSpec]:
+    return _registry
+
+
+async def enqueue(session: AsyncSession, kind: str, payload: dict[str, Any], delay: float = 0.0) -> Job:
+    """
+    Ставит задачу в очередь (коммитит сессию) и будит обработчики.
+    """
+    spec = _registry.get(kind)
+    if spec is None:
+        raise ValueError(f"Нет обработчика задач {kind}")
+    job = Job(kind=kind, payload=payload, max_attempts=spec.max_attempts)
+    if delay:
+        job.run_at = func.now() + timedelta(seconds=delay)
+    session.add(job)
+    await session.commit()
+    await session.refresh(job)
+    await bus.publish(TOPIC, {"id": job.id, "kind": kind})
+    return job
+
+
+async def get_job(session: AsyncSession, job_id: int) -> Job | None:
+    return await session.get(Job, job_id)
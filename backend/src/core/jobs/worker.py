@@ -0,0 +1,234 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+from contextlib import suppress
+from datetime import timedelta
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy import case, func, select, update
+
+from src.core.bus import EventBus
+from src.core.db import async_session_maker, use_statement_timeout
+from src.core.jobs.models import Job
+from src.core.jobs.queue import TOPIC, JobContext, registered
+from src.core.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+settings = Settings()
+
+
+def retry_delay(attempt: int) -> float:
+    """
+    Задержка перед повтором после неудачной попытки номер `attempt` (с 1).
+    """
+    return min(settings.JOBS_RETRY_BASE_SECONDS * 2 ** (attempt - 1), settings.JOBS_RETRY_MAX_SECONDS)
+
+
+class JobWorker:
+    """
+    Обработчик очереди: захватывает до `concurrency` задач зарегистрированных
+    видов и выполняет их параллельно в задачах asyncio своего процесса.
+
+    Несколько обработчиков (процессов или воркеров API) делят очередь без
+    координации: захват — один UPDATE по строкам, выбранным с SKIP LOCKED.
+    Выполняемые задачи регулярно отмечаются; задачи, чей обработчик пропал,
+    любой живой обработчик возвращает в очередь.
+    """
+
+    def __init__(self, bus: EventBus, concurrency: int, poll_interval: float | None = None):
+        self.id = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval or settings.JOBS_POLL_SECONDS
+        self.succeeded = 0
+        self.failed = 0
+        self._running: dict[int, asyncio.Task] = {}
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._loop: asyncio.Task | None = None
+        self._maintained_at = 0.0
+
+        bus.subscribe(TOPIC, self._on_enqueued)
+
+    async def start(self) -> None:
+        self._stopping = False
+        self._loop = asyncio.create_task(self._run())
+        logger.info("Обработчик задач %s запущен: %d одновременно", self.id, self.concurrency)
+
+    async def stop(self, timeout: float | None = None) -> None:
+        """
+        Перестаёт брать задачи и ждёт выполняемые до `timeout` секунд;
+        не успевшие прерываются и возвращаются в очередь без траты попытки,
+        а неповторяемые (max_attempts=1) завершаются ошибкой отмены.
+        """
+        self._stopping = True
+        self._wakeup.set()
+        if self._loop is not None:
+            with suppress(asyncio.CancelledError):
+                await self._loop
+            self._loop = None
+        if not self._running:
+            return
+        _, pending = await asyncio.wait(
+            list(self._running.values()),
+            timeout=settings.JOBS_SHUTDOWN_SECONDS if timeout is None else timeout,
+        )
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    def _on_enqueued(self, data: dict) -> None:
+        if data.get("kind") in registered():
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            # Сброс до захвата: событие, пришедшее во время захвата, не теряется.
+            self._wakeup.clear()
+            try:
+                await self._maintain()
+                free = self.concurrency - len(self._running)
+                for job in await self._claim(free) if free > 0 else []:
+                    self._spawn(job)
+            except Exception:
+                logger.exception("Ошибка очереди задач")
+            timeout = min(self.poll_interval, settings.JOBS_HEARTBEAT_SECONDS)
+            with suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+
+    async def _claim(self, limit: int) -> list[Job]:
+        kinds = list(registered())
+        if not kinds:
+            return []
+        claimable = (
+            select(Job.id)
+            .where(Job.status == "queued", Job.run_at <= func.now(), Job.kind.in_(kinds))
+            .order_by(Job.run_at, Job.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .cte("claimable")
+        )
+        stmt = (
+            update(Job)
+            .where(Job.id == claimable.c.id)
+            .values(
+                status="running",
+                attempts=Job.attempts + 1,
+                locked_by=self.id,
+                heartbeat_at=func.now(),
+                started_at=func.coalesce(Job.started_at, func.now()),
+            )
+            .returning(Job)
+            .execution_options(synchronize_session=False)
+        )
+        async with async_session_maker() as session:
+            jobs = list(await session.scalars(stmt))
+            await session.commit()
+        return jobs
+
+    def _spawn(self, job: Job) -> None:
+        task = asyncio.create_task(self._execute(job), name=f"job-{job.id}")
+        self._running[job.id] = task
+
+        def done(_: asyncio.Task) -> None:
+            self._running.pop(job.id, None)
+            self._wakeup.set()
+
+        task.add_done_callback(done)
+
+    async def _execute(self, job: Job) -> None:
+        spec = registered()[job.kind]
+        use_statement_timeout(settings.JOBS_STATEMENT_TIMEOUT_MS)
+        started = time.perf_counter()
+        try:
+            result = await spec.handler(JobContext(job, self.id))
+        except asyncio.CancelledError:
+            if job.max_attempts == 1:
+                await self._cancel(job)
+            else:
+                await self._release(job)
+            raise
+        except Exception as exc:
+            logger.exception("Задача %s #%d: ошибка в попытке %d из %d", job.kind, job.id, job.attempts, job.max_attempts)
+            await self._fail(job, f"{type(exc).__name__}: {exc}")
+        else:
+            await self._finish(job, result)
+            logger.info("Задача %s #%d выполнена за %.1f с", job.kind, job.id, time.perf_counter() - started)
+
+    async def _update(self, job: Job, **values: Any) -> None:
+        """
+        Меняет свою задачу; если её уже вернули в очередь как брошенную, ничего не делает.
+        """
+        try:
+            async with async_session_maker() as session:
+                await session.execute(
+                    update(Job)
+                    .where(Job.id == job.id, Job.status == "running", Job.locked_by == self.id)
+                    .values(locked_by=None, heartbeat_at=None, **values)
+                )
+                await session.commit()
+        except Exception:
+            # Задача останется running и вернётся в очередь как брошенная.
+            logger.exception("Не удалось сохранить состояние задачи #%d", job.id)
+
+    async def _finish(self, job: Job, result: dict[str, Any] | None) -> None:
+        self.succeeded += 1
+        await self._update(job, status="succeeded", result=result, finished_at=func.now())
+
+    async def _fail(self, job: Job, error: str) -> None:
+        self.failed += 1
+        if job.attempts >= job.max_attempts:
+            await self._update(job, status="failed", last_error=error, finished_at=func.now())
+            return
+        delay = timedelta(seconds=retry_delay(job.attempts))
+        await self._update(job, status="queued", last_error=error, run_at=func.now() + delay)
+
+    async def _release(self, job: Job) -> None:
+        await self._update(job, status="queued", attempts=Job.attempts - 1, run_at=func.now())
+
+    async def _cancel(self, job: Job) -> None:
+        # Прерванную неповторяемую задачу нельзя запустить заново: часть работы уже сделана.
+        self.failed += 1
+        await self._update(
+            job, status="failed", last_error="Задача отменена при остановке обработчика", finished_at=func.now()
+        )
+
+    async def _maintain(self) -> None:
+        """
+        Раз в JOBS_HEARTBEAT_SECONDS отмечает свои задачи и возвращает в очередь брошенные.
+        """
+        now = time.monotonic()
+        if now - self._maintained_at < settings.JOBS_HEARTBEAT_SECONDS:
+            return
+        self._maintained_at = now
+        exhausted = Job.attempts >= Job.max_attempts
+        async with async_session_maker() as session:
+            if self._running:
+                await session.execute(
+                    update(Job)
+                    .where(Job.id.in_(list(self._running)), Job.locked_by == self.id)
+                    .values(heartbeat_at=func.now())
+                )
+            result = await session.execute(
+                update(Job)
+                .where(
+                    Job.status == "running",
+                    Job.heartbeat_at < func.now() - timedelta(seconds=settings.JOBS_STALE_SECONDS),
+                )
+                .values(
+                    status=case((exhausted, "failed"), else_="queued"),
+                    finished_at=case((exhausted, func.now()), else_=None),
+                    last_error="Обработчик задачи перестал отвечать",
+                    locked_by=None,
+                    heartbeat_at=None,
+                    run_at=func.now(),
+                )
+                .returning(Job.id)
+            )
+            stale = list(result.scalars())
+            await session.commit()
+        if stale:
+            logger.warning("Возвращены брошенные задачи: %s", stale)
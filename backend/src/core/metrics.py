@@ -0,0 +1,217 @@
+"""
+Метрики запросов в формате Prometheus.
+
+MetricsMiddleware заводит на каждый HTTP-запрос RequestStats в контекстной
+переменной. Слушатели before/after_cursor_execute на всех движках SQLAlchemy
+считают в неё SQL-запросы и время в БД, dump_json — время сериализации.
+По завершении запроса статистика попадает в гистограммы по маршрутам, а
+повторы одного и того же SQL сверх N_PLUS_ONE_THRESHOLD отмечаются как N+1.
+
+Метрики живут в памяти воркера: при нескольких воркерах uvicorn каждый
+отдаёт по /metrics только свои.
+"""
+
+import logging
+import time
+from bisect import bisect_left
+from collections import Counter as StatementCounter
+from collections.abc import Iterable, Iterator
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple, **extra: str) -> str:
+    pairs = [*zip(names, values), *extra.items()]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in pairs) + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Histogram:
+    """
+    Гистограмма с фиксированными границами корзин и набором меток.
+    """
+
+    def __init__(self, name: str, description: str, labels: tuple[str, ...], buckets: tuple[float, ...]):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.buckets = buckets
+        # Значения меток -> [счётчики корзин (последняя — +Inf), сумма, количество].
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, labels: tuple, value: float) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.description}"
+        yield f"# TYPE {self.name} histogram"
+        for values, (counts, total, count) in self._series.items():
+            cumulative = 0
+            for bound, bucket in zip((*self.buckets, "+Inf"), counts):
+                cumulative += bucket
+                le = bound if isinstance(bound, str) else _number(bound)
+                yield f"{self.name}_bucket{_labels(self.labels, values, le=le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labels, values)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.labels, values)} {count}"
+
+
+class Counter:
+    """
+    Монотонный счётчик с набором меток.
+    """
+
+    def __init__(self, name: str, description: str, labels: tuple[str, ...]):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self._series: dict[tuple, float] = {}
+
+    def inc(self, labels: tuple, amount: float = 1) -> None:
+        self._series[labels] = self._series.get(labels, 0) + amount
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.description}"
+        yield f"# TYPE {self.name} counter"
+        for values, total in self._series.items():
+            yield f"{self.name}{_labels(self.labels, values)} {_number(total)}"
+
+
+def gauge(name: str, description: str, value: float) -> Iterator[str]:
+    """
+    Строки одного значения-гауджа без меток.
+    """
+    yield f"# HELP {name} {description}"
+    yield f"# TYPE {name} gauge"
+    yield f"{name} {_number(value)}"
+
+
+request_duration = Histogram(
+    "http_request_duration_seconds", "Время обработки HTTP-запроса",
+    ("method", "route", "status"), _TIME_BUCKETS,
+)
+request_db_seconds = Histogram(
+    "http_request_db_seconds", "Время SQL-запросов за HTTP-запрос",
+    ("method", "route"), _TIME_BUCKETS,
+)
+request_queries = Histogram(
+    "http_request_db_queries", "Число SQL-запросов за HTTP-запрос",
+    ("method", "route"), _QUERY_BUCKETS,
+)
+n_plus_one = Counter(
+    "http_request_n_plus_one_total", "Запросы, в которых один SQL повторился не меньше порога",
+    ("method", "route"),
+)
+
+METRICS = (request_duration, request_db_seconds, request_queries, n_plus_one)
+
+
+class RequestStats:
+    """
+    Статистика текущего HTTP-запроса.
+    """
+
+    __slots__ = ("started", "queries", "db_time", "serialize_time", "statements")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.statements: StatementCounter[str] = StatementCounter()
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        """
+        Значение заголовка Server-Timing: БД, сериализация и весь запрос до ответа.
+        """
+        return (
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries", '
+            f"serialize;dur={self.serialize_time * 1000:.1f}, "
+            f"app;dur={self.elapsed() * 1000:.1f}"
+        )
+
+
+_current: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def start_request() -> tuple[RequestStats, object]:
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def finish_request(token, method: str, route: str, status: int, n_plus_one_threshold: int) -> None:
+    """
+    Снимает статистику запроса из контекста и записывает её в метрики.
+    """
+    stats = _current.get()
+    _current.reset(token)
+    if stats is None:
+        return
+
+    request_duration.observe((method, route, str(status)), stats.elapsed())
+    request_db_seconds.observe((method, route), stats.db_time)
+    request_queries.observe((method, route), stats.queries)
+
+    if n_plus_one_threshold and stats.statements:
+        statement, repeats = stats.statements.most_common(1)[0]
+        if repeats >= n_plus_one_threshold:
+            n_plus_one.inc((method, route))
+            logger.warning(
+                "Возможный N+1: %s %s выполнил один SQL %d раз: %s",
+                method, route, repeats, " ".join(statement.split())[:200],
+            )
+
+
+def add_serialize_time(seconds: float) -> None:
+    stats = _current.get()
+    if stats is not None:
+        stats.serialize_time += seconds
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if context is not None and _current.get() is not None:
+        context._metrics_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current.get()
+    started = getattr(context, "_metrics_started", None)
+    if stats is None or started is None:
+        return
+    stats.queries += 1
+    stats.db_time += time.perf_counter() - started
+    stats.statements[statement] += 1
+
+
+def render(extra: Iterable[str] = ()) -> str:
+    """
+    Все метрики воркера в текстовом формате Prometheus.
+    """
+    lines = [line for metric in METRICS for line in metric.render()]
+    lines.extend(extra)
+    return "\n".join(lines) + "\n"
@@ -1,10 +1,96 @@
+import math
+import time
+
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.db import PRIMARY_COOKIE
+from src.core.metrics import finish_request, start_request
+from src.core.settings import Settings
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class ReadAfterWriteMiddleware:
+    """
+    После успешного изменяющего запроса ставит клиенту куку, которая на
+    `window` секунд направляет его чтения на основную БД (см. get_read_db).
+    Читающие POST-ручки на get_read_db куку не ставят.
+    """
+
+    def __init__(self, app: ASGIApp, window: float):
+        self.app = app
+        self.window = window
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            read_only = scope.get("state", {}).get("read_only", False)
+            if message["type"] == "http.response.start" and message["status"] < 400 and not read_only:
+                until = time.time() + self.window
+                MutableHeaders(scope=message).append(
+                    "set-cookie",
+                    f"{PRIMARY_COOKIE}={until:.3f}; Max-Age={math.ceil(self.window)}; "
+                    "Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
+
+class MetricsMiddleware:
+    """
+    Замеряет запросы для /metrics (см. core.metrics) и при `server_timing`
+    отдаёт время БД и сериализации в заголовке Server-Timing.
+    """
+
+    def __init__(self, app: ASGIApp, server_timing: bool, n_plus_one_threshold: int):
+        self.app = app
+        self.server_timing = server_timing
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats, token = start_request()
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    MutableHeaders(scope=message).append("server-timing", stats.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            # Путь маршрута, а не запроса: метки не размножаются по id товаров.
+            route = scope.get("route")
+            finish_request(
+                token, scope["method"], getattr(route, "path", "<unmatched>"),
+                status, self.n_plus_one_threshold,
+            )
 
-def use_middleware(app, origins: list[str]) -> None:
+
+def use_middleware(app, settings: Settings) -> None:
     """
-    Подключает CORS-мидлварь, если задан список разрешённых источников.
+    Подключает CORS-мидлварь, если задан список разрешённых источников,
+    закрепление чтений за основной БД после записи, если заданы реплики,
+    и сбор метрик запросов.
     """
-    
+
+    if settings.replica_urls and settings.READ_AFTER_WRITE_SECONDS > 0:
+        app.add_middleware(ReadAfterWriteMiddleware, window=settings.READ_AFTER_WRITE_SECONDS)
+
+    origins = settings.cors_origins_list
     if origins:
         app.add_middleware(
             CORSMiddleware,
@@ -13,3 +99,10 @@ def use_middleware(app, origins: list[str]) -> None:
             allow_methods=["*"],
             allow_headers=["*"],
         )
+
+    if settings.METRICS_ENABLED:
+        app.add_middleware(
+            MetricsMiddleware,
+            server_timing=settings.SERVER_TIMING,
+            n_plus_one_threshold=settings.N_PLUS_ONE_THRESHOLD,
+        )
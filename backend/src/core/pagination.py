@@ -0,0 +1,31 @@
+import base64
+import binascii
+import json
+from typing import Any
+
+from src.core.exceptions import AppException
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Упаковывает значения ключа сортировки последней записи в непрозрачный курсор.
+    """
+
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, size: int) -> list[Any]:
+    """
+    Распаковывает курсор, ожидая ровно `size` значений.
+    """
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError):
+        raise AppException("Некорректный курсор", status_code=400)
+
+    if not isinstance(values, list) or len(values) != size:
+        raise AppException("Некорректный курсор", status_code=400)
+    return values
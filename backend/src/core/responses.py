@@ -0,0 +1,58 @@
+"""
+Быстрая отдача JSON-ответов.
+
+Если ручка возвращает схему, FastAPI ещё раз валидирует её по response_model,
+прогоняет через jsonable_encoder и сериализует stdlib json. Здесь данные
+валидируются в схему один раз и сразу кодируются сериализатором pydantic-core
+(Decimal, datetime и алиасы camelCase — без промежуточных dict). Готовый
+Response FastAPI отдаёт как есть, response_model остаётся только для OpenAPI.
+"""
+
+import time
+from functools import lru_cache
+from typing import Any
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+
+from src.core.http import apply_cache_control
+from src.core.metrics import add_serialize_time
+
+
+@lru_cache(maxsize=None)
+def _adapter(schema: Any) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+def dump_json(schema: Any, value: Any) -> bytes:
+    """
+    Сериализует `value` (ORM-объекты, словари или уже схемы) как `schema` с алиасами.
+    """
+    started = time.perf_counter()
+    adapter = _adapter(schema)
+    body = adapter.dump_json(adapter.validate_python(value, from_attributes=True), by_alias=True)
+    add_serialize_time(time.perf_counter() - started)
+    return body
+
+
+class JSONBytesResponse(Response):
+    """
+    JSON-ответ, который принимает готовые байты или кодирует содержимое pydantic-core.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return to_json(content, by_alias=True)
+
+
+def json_response(request: Request, schema: Any, value: Any, status_code: int = 200) -> JSONBytesResponse:
+    """
+    Ответ с `value`, сериализованным как `schema`, и Cache-Control роутера.
+    """
+    response = JSONBytesResponse(dump_json(schema, value), status_code=status_code)
+    apply_cache_control(request, response)
+    return response
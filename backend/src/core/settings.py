@@ -1,3 +1,6 @@
+from decimal import Decimal
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
 
@@ -8,6 +11,28 @@ class Settings(BaseSettings):
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str
     DATABASE_URL:str
+    # Прямое подключение к Postgres в обход pgbouncer: нужно шине событий (LISTEN).
+    DATABASE_DIRECT_URL: str | None = None
+
+    # Пул на воркер: при 2 воркерах uvicorn до 2 * (DB_POOL_SIZE + DB_MAX_OVERFLOW) соединений.
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 5
+    DB_POOL_TIMEOUT: float = 10.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Пулинг транзакций (pgbouncer pool_mode=transaction): без кэша подготовленных выражений.
+    DB_PGBOUNCER: bool = False
+    DB_STATEMENT_TIMEOUT_MS: int = 5000
+    ADMIN_STATEMENT_TIMEOUT_MS: int = 30000
+
+    # Реплики для читающих ручек через запятую; пусто — всё читается с основной БД.
+    DATABASE_REPLICA_URLS: str = ""
+    # Сколько секунд после записи клиент читает с основной БД (видит свои изменения).
+    READ_AFTER_WRITE_SECONDS: float = 5.0
+    # Недоступная реплика выводится из ротации на это время.
+    REPLICA_RETRY_SECONDS: float = 30.0
+    REPLICA_CONNECT_TIMEOUT: float = 2.0
 
     PGADMIN_EMAIL: str
     PGADMIN_PASSWORD: str
@@ -15,13 +40,104 @@ class Settings(BaseSettings):
     MINIO_ROOT_USER: str
     MINIO_ROOT_PASSWORD: str
     MINIO_BUCKET: str
+    MINIO_ENDPOINT: str = "minio:9000"
+    MINIO_SECURE: bool = False
+
+    # minio — бакет MINIO_BUCKET, file — каталог MEDIA_ROOT, раздаваемый по /media.
+    STORAGE_BACKEND: Literal["minio", "file"] = "minio"
+    MEDIA_ROOT: str = "media"
+    # Публичный адрес файлов: для minio — адрес MinIO (без бакета), для file — /media.
+    MEDIA_BASE_URL: str | None = None
+    # Закрытое хранилище служебных файлов (тела фоновых импортов): бакет без
+    # анонимного доступа или каталог, который не раздаётся по /media.
+    MINIO_PRIVATE_BUCKET: str = "store-private"
+    PRIVATE_ROOT: str = "private"
+
+    IMAGE_MAX_BYTES: int = 20 * 1024 * 1024
+    IMAGE_MAX_PIXELS: int = 50_000_000
+    IMAGE_VARIANT_WIDTHS: str = "320,640,1280"
+    IMAGE_VARIANT_FORMATS: str = "webp,avif"
+    IMAGE_WORKERS: int = 2
 
     CORS_ORIGINS: str = ""
 
+    EVENT_BUS: str = "postgres"
+
+    METRICS_ENABLED: bool = True
+    SERVER_TIMING: bool = True
+    # Сколько раз один и тот же SQL может выполниться за запрос, прежде чем это сочтётся N+1.
+    N_PLUS_ONE_THRESHOLD: int = 10
+
+    PUBLIC_CACHE_CONTROL: str = "public, no-cache"
+    ADMIN_CACHE_CONTROL: str = "private, no-store"
+
+    PRODUCT_CACHE_TTL: float = 30.0
+    PRODUCT_CACHE_SIZE: int = 2048
+
+    RESERVATION_SWEEP_INTERVAL: float = 30.0
+
+    # Журнал изменений товаров (GET /api/admin/products/changes) хранится столько
+    # дней; токен старше этого срока получает 410 и требует полной выгрузки.
+    CHANGES_RETENTION_DAYS: int = 7
+    CHANGES_PRUNE_INTERVAL: float = 3600.0
+
+    # Фоновые задачи: отдельный процесс python -m src.worker с JOBS_CONCURRENCY
+    # задачами одновременно. JOBS_EMBEDDED_CONCURRENCY > 0 запускает обработчик
+    # и в каждом воркере API (для разработки без отдельного процесса).
+    JOBS_CONCURRENCY: int = 2
+    JOBS_EMBEDDED_CONCURRENCY: int = 0
+    # Опрос очереди на случай, если уведомление о новой задаче не дошло.
+    JOBS_POLL_SECONDS: float = 5.0
+    JOBS_MAX_ATTEMPTS: int = 5
+    # Повтор после ошибки через base * 2^(попытка - 1), но не дольше max.
+    JOBS_RETRY_BASE_SECONDS: float = 10.0
+    JOBS_RETRY_MAX_SECONDS: float = 600.0
+    # Выполняемая задача без отметки дольше JOBS_STALE_SECONDS считается
+    # брошенной (процесс упал) и возвращается в очередь.
+    JOBS_HEARTBEAT_SECONDS: float = 10.0
+    JOBS_STALE_SECONDS: float = 60.0
+    # Сколько ждать выполняемые задачи при остановке, прежде чем вернуть их в очередь.
+    JOBS_SHUTDOWN_SECONDS: float = 30.0
+    JOBS_STATEMENT_TIMEOUT_MS: int = 0
+    # Тела импортов, на которые не ссылается ни одна ожидающая или выполняемая
+    # задача, удаляются раз в JOBS_IMPORTS_PRUNE_INTERVAL, если старше JOBS_IMPORTS_ORPHAN_SECONDS.
+    JOBS_IMPORTS_PRUNE_INTERVAL: float = 3600.0
+    JOBS_IMPORTS_ORPHAN_SECONDS: float = 3600.0
+
+    SUGGEST_MAX_ENTRIES: int = 500_000
+    SUGGEST_KEY_LENGTH: int = 32
+
+    # cards — готовые карточки из product_cards, lean — сборка одним Core-запросом
+    # с json_agg, orm — через ORM и ProductOut, memory — снимок каталога в памяти
+    # воркера (до его загрузки — как cards).
+    PUBLIC_READ_ENGINE: Literal["cards", "lean", "orm", "memory"] = "cards"
+    # Как часто снимок каталога пересобирается целиком на случай потерянных изменений.
+    SNAPSHOT_RECONCILE_SECONDS: float = 300.0
+    # Предельный возраст снимка дерева категорий на случай потерянных событий.
+    TAXONOMY_MAX_AGE_SECONDS: float = 300.0
+
+    PRICE_FACET_BOUNDS: str = "1000,5000,10000,50000"
+
     @property
     def cors_origins_list(self) -> list[str]:
         if not self.CORS_ORIGINS:
             return []
         return [s.strip() for s in self.CORS_ORIGINS.split(",") if s.strip()]
 
+    @property
+    def replica_urls(self) -> list[str]:
+        return [s.strip() for s in self.DATABASE_REPLICA_URLS.split(",") if s.strip()]
+
+    @property
+    def image_variant_widths(self) -> list[int]:
+        return sorted(int(s) for s in self.IMAGE_VARIANT_WIDTHS.split(",") if s.strip())
+
+    @property
+    def image_variant_formats(self) -> list[str]:
+        return [s.strip().lower() for s in self.IMAGE_VARIANT_FORMATS.split(",") if s.strip()]
+
+    @property
+    def price_facet_bounds(self) -> list[Decimal]:
+        return sorted(Decimal(s.strip()) for s in self.PRICE_FACET_BOUNDS.split(",") if s.strip())
+
     model_config = {"env_file": ".env"}
\ No newline at end of file
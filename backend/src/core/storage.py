@@ -0,0 +1,176 @@
+"""
+Объектное хранилище для загружаемых файлов.
+
+В работе — бакет MinIO из docker-compose (STORAGE_BACKEND=minio), локально и в
+тестах — каталог на диске (STORAGE_BACKEND=file), который приложение раздаёт
+по /media. Клиент MinIO синхронный, поэтому вызовы уходят в поток; большие
+файлы загружаются с диска частями, целиком в память не читаются.
+
+Служебные файлы (тела фоновых импортов) лежат отдельно, в private_storage:
+закрытом бакете или каталоге, который наружу не раздаётся.
+"""
+
+import asyncio
+import io
+import shutil
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from pathlib import Path
+
+from minio import Minio
+
+from src.core.settings import Settings
+
+# Ключи хранилища адресуются содержимым и не меняются, поэтому кэшируются навсегда.
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+class Storage(ABC):
+    """
+    Базовый интерфейс хранилища.
+    """
+
+    @abstractmethod
+    async def put_file(self, key: str, path: str, content_type: str) -> None: ...
+
+    @abstractmethod
+    async def put_bytes(self, key: str, data: bytes, content_type: str) -> None: ...
+
+    @abstractmethod
+    async def get_file(self, key: str, path: str) -> None: ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None: ...
+
+    @abstractmethod
+    async def list_keys(self, prefix: str) -> list[tuple[str, datetime]]:
+        """
+        Ключи с префиксом `prefix` и время их последнего изменения (UTC).
+        """
+
+    @abstractmethod
+    def url(self, key: str) -> str: ...
+
+
+class MinioStorage(Storage):
+    """
+    Бакет MinIO (S3), из которого файлы отдаются напрямую по MEDIA_BASE_URL.
+    """
+
+    def __init__(self, endpoint: str, access_key: str, secret_key: str, bucket: str, secure: bool, base_url: str):
+        self.client = Minio(endpoint, access_key=access_key, secret_key=secret_key, secure=secure)
+        self.bucket = bucket
+        self.base_url = base_url.rstrip("/")
+
+    async def put_file(self, key: str, path: str, content_type: str) -> None:
+        await asyncio.to_thread(
+            self.client.fput_object, self.bucket, key, path,
+            content_type=content_type, metadata={"Cache-Control": IMMUTABLE},
+        )
+
+    async def put_bytes(self, key: str, data: bytes, content_type: str) -> None:
+        await asyncio.to_thread(
+            self.client.put_object, self.bucket, key, io.BytesIO(data), len(data),
+            content_type=content_type, metadata={"Cache-Control": IMMUTABLE},
+        )
+
+    async def get_file(self, key: str, path: str) -> None:
+        await asyncio.to_thread(self.client.fget_object, self.bucket, key, path)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self.client.remove_object, self.bucket, key)
+
+    async def list_keys(self, prefix: str) -> list[tuple[str, datetime]]:
+        def list_objects() -> list[tuple[str, datetime]]:
+            objects = self.client.list_objects(self.bucket, prefix=prefix, recursive=True)
+            return [(obj.object_name, obj.last_modified) for obj in objects]
+
+        return await asyncio.to_thread(list_objects)
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{self.bucket}/{key}"
+
+
+class FileStorage(Storage):
+    """
+    Каталог на диске для локального запуска и тестов.
+    """
+
+    def __init__(self, root: str, base_url: str):
+        self.root = Path(root)
+        self.base_url = base_url.rstrip("/")
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if not path.is_relative_to(self.root.resolve()):
+            raise ValueError(f"Ключ вне хранилища: {key}")
+        return path
+
+    async def put_file(self, key: str, path: str, content_type: str) -> None:
+        target = self._path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        await asyncio.to_thread(shutil.copyfile, path, target)
+
+    async def put_bytes(self, key: str, data: bytes, content_type: str) -> None:
+        target = self._path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        await asyncio.to_thread(target.write_bytes, data)
+
+    async def get_file(self, key: str, path: str) -> None:
+        await asyncio.to_thread(shutil.copyfile, self._path(key), path)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._path(key).unlink, missing_ok=True)
+
+    async def list_keys(self, prefix: str) -> list[tuple[str, datetime]]:
+        def walk() -> list[tuple[str, datetime]]:
+            if not self.root.is_dir():
+                return []
+            found = []
+            for path in self.root.rglob("*"):
+                key = path.relative_to(self.root).as_posix()
+                if key.startswith(prefix) and path.is_file():
+                    found.append((key, datetime.fromtimestamp(path.stat().st_mtime, timezone.utc)))
+            return found
+
+        return await asyncio.to_thread(walk)
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+
+def create_storage(settings: Settings) -> Storage:
+    """
+    Хранилище по настройке STORAGE_BACKEND: `minio` или `file`.
+    """
+    if settings.STORAGE_BACKEND == "file":
+        return FileStorage(settings.MEDIA_ROOT, settings.MEDIA_BASE_URL or "/media")
+    return MinioStorage(
+        settings.MINIO_ENDPOINT,
+        settings.MINIO_ROOT_USER,
+        settings.MINIO_ROOT_PASSWORD,
+        settings.MINIO_BUCKET,
+        settings.MINIO_SECURE,
+        settings.MEDIA_BASE_URL or "http://localhost:9000",
+    )
+
+
+def create_private_storage(settings: Settings) -> Storage:
+    """
+    Закрытое хранилище для служебных файлов, которые нельзя отдавать наружу:
+    бакет MINIO_PRIVATE_BUCKET или каталог PRIVATE_ROOT.
+    """
+    if settings.STORAGE_BACKEND == "file":
+        return FileStorage(settings.PRIVATE_ROOT, "")
+    return MinioStorage(
+        settings.MINIO_ENDPOINT,
+        settings.MINIO_ROOT_USER,
+        settings.MINIO_ROOT_PASSWORD,
+        settings.MINIO_PRIVATE_BUCKET,
+        settings.MINIO_SECURE,
+        "",
+    )
+
+
+storage = create_storage(Settings())
+private_storage = create_private_storage(Settings())
@@ -0,0 +1,66 @@
+import codecs
+import csv
+from collections.abc import AsyncIterable, AsyncIterator
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+async def iter_lines(chunks: AsyncIterable[bytes], encoding: str = "utf-8") -> AsyncIterator[str]:
+    """
+    Построчное чтение потока байт без накопления всего тела в памяти.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    tail = ""
+    async for chunk in chunks:
+        text = tail + decoder.decode(chunk)
+        *lines, tail = text.split("\n")
+        for line in lines:
+            yield line.removesuffix("\r")
+    tail += decoder.decode(b"", final=True)
+    if tail:
+        yield tail.removesuffix("\r")
+
+
+async def iter_csv(lines: AsyncIterable[str]) -> AsyncIterator[tuple[int, dict[str, str]]]:
+    """
+    Записи CSV с заголовком в виде (номер первой строки записи, {колонка: значение}).
+
+    Значения в кавычках могут содержать переводы строк: физические строки
+    склеиваются, пока число кавычек в записи нечётное.
+    """
+    header: list[str] | None = None
+    record, start, line_no = "", 0, 0
+    async for line in lines:
+        line_no += 1
+        if not record:
+            start = line_no
+            record = line
+        else:
+            record += "\n" + line
+        if record.count('"') % 2:
+            continue
+
+        values = next(csv.reader([record]), [])
+        record = ""
+        if not values:
+            continue
+        if header is None:
+            header = [h.strip() for h in values]
+            continue
+        yield start, dict(zip(header, values))
+
+    if record and header is not None:
+        # Незакрытая кавычка в конце файла: отдаём как есть, строку отвергнет валидация.
+        yield start, dict(zip(header, next(csv.reader([record]), [])))
+
+
+async def batched(items: AsyncIterable[T], size: int) -> AsyncIterator[list[T]]:
+    batch: list[T] = []
+    async for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
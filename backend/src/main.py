@@ -1,18 +1,49 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from collections.abc import AsyncGenerator
 from fastapi import FastAPI
+from fastapi.staticfiles import StaticFiles
 
+from .core import imaging
+from .core.bus import bus
+from .core.jobs import JobWorker
 from .core.settings import Settings
 from .core.middleware import use_middleware
 from .core.exceptions import use_exceptions_handlers
 from .router import apply_routes
+from .apps.products.changes import run_changes_pruner
+from .apps.products.jobs import run_imports_pruner
+from .apps.products.reservations import run_expiry_sweeper
+from .apps.products.snapshot import catalog_snapshot
+from .apps.products.suggest import suggest_index
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     settings = Settings()
     print(f"{settings.POSTGRES_DB=} | {settings.MINIO_BUCKET=}")
+    await bus.start()
+    await suggest_index.build()
+    if settings.PUBLIC_READ_ENGINE == "memory":
+        await catalog_snapshot.start()
+    sweeper = asyncio.create_task(run_expiry_sweeper(settings.RESERVATION_SWEEP_INTERVAL))
+    pruner = asyncio.create_task(run_changes_pruner(settings.CHANGES_PRUNE_INTERVAL))
+    imports_pruner = asyncio.create_task(run_imports_pruner(settings.JOBS_IMPORTS_PRUNE_INTERVAL))
+    job_worker = None
+    if settings.JOBS_EMBEDDED_CONCURRENCY:
+        job_worker = JobWorker(bus, settings.JOBS_EMBEDDED_CONCURRENCY)
+        await job_worker.start()
     yield
+    if job_worker is not None:
+        # Выполняемые задачи дорабатывают или возвращаются в очередь до остановки шины.
+        await job_worker.stop()
+    for task in (sweeper, pruner, imports_pruner):
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await catalog_snapshot.stop()
+    imaging.shutdown()
+    await bus.stop()
     print("App shutdown")
 
 
@@ -26,10 +57,13 @@ def create_app() -> FastAPI:
         title="store-api",
     )
 
-    use_middleware(app, settings.cors_origins_list)
+    use_middleware(app, settings)
     use_exceptions_handlers(app, settings)
     apply_routes(app)
 
+    if settings.STORAGE_BACKEND == "file":
+        app.mount("/media", StaticFiles(directory=settings.MEDIA_ROOT, check_dir=False), name="media")
+
     return app
 
 
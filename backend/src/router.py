@@ -1,8 +1,12 @@
 from fastapi import FastAPI
 
 from src.apps.health.router import router as health_router
+from src.apps.jobs.router import router as jobs_router
+from src.apps.metrics.router import router as metrics_router
 from src.apps.products.admin_router import router as admin_products_router
+from src.apps.products.categories_router import router as categories_router
 from src.apps.products.public_router import router as products_router
+from src.apps.products.reservations_router import router as reservations_router
 
 
 def apply_routes(app: FastAPI) -> None:
@@ -11,5 +15,9 @@ def apply_routes(app: FastAPI) -> None:
     """
     
     app.include_router(health_router, prefix="/health", tags=["Health"])
+    app.include_router(metrics_router, prefix="/metrics", tags=["Metrics"])
     app.include_router(admin_products_router, prefix="/api/admin/products", tags=["Admin:products"])
-    app.include_router(products_router, prefix="/api/products", tags=["Products"])
\ No newline at end of file
+    app.include_router(jobs_router, prefix="/api/admin/jobs", tags=["Admin:jobs"])
+    app.include_router(products_router, prefix="/api/products", tags=["Products"])
+    app.include_router(reservations_router, prefix="/api/products", tags=["Products"])
+    app.include_router(categories_router, prefix="/api/categories", tags=["Categories"])
\ No newline at end of file
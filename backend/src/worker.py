@@ -0,0 +1,54 @@
+"""
+Отдельный процесс обработки фоновых задач.
+
+    python -m src.worker --concurrency 4
+
+Обработчики регистрируются при импорте модулей приложений ниже. SIGTERM и
+SIGINT останавливают процесс мягко: новые задачи не берутся, выполняемые
+получают JOBS_SHUTDOWN_SECONDS на завершение, остальные возвращаются в очередь,
+а неповторяемые (max_attempts=1) завершаются ошибкой отмены.
+"""
+
+import argparse
+import asyncio
+import logging
+import signal
+
+from src.core.bus import bus
+from src.core.db import engine
+from src.core.jobs import JobWorker, registered
+from src.core.settings import Settings
+from src.apps.products import jobs  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+
+async def run(concurrency: int) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    await bus.start()
+    worker = JobWorker(bus, concurrency)
+    await worker.start()
+    logger.info("Виды задач: %s", ", ".join(sorted(registered())))
+    await stop.wait()
+
+    logger.info("Остановка обработчика задач")
+    await worker.stop()
+    await bus.stop()
+    await engine.dispose()
+
+
+def main() -> None:
+    settings = Settings()
+    parser = argparse.ArgumentParser(description="Обработчик фоновых задач")
+    parser.add_argument("--concurrency", type=int, default=settings.JOBS_CONCURRENCY)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(run(args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Размер событий шины при пакетных операциях: NOTIFY в Postgres короче 8000 байт.
+
+    python -m unittest discover -s tests -t .
+"""
+
+import json
+import unittest
+from unittest import mock
+
+from src.core.bus import RECONNECTED, PostgresEventBus
+from src.apps.products import suggest
+from src.apps.products.cache import invalidate_products, product_cache, product_key
+
+NOTIFY_LIMIT = 8000
+
+
+class RecordingConnection:
+    """
+    Соединение asyncpg, которое запоминает уведомления и, как Postgres,
+    отказывается отправлять слишком длинные.
+    """
+
+    def __init__(self):
+        self.payloads: list[str] = []
+
+    async def execute(self, query: str, channel: str, payload: str) -> None:
+        if len(payload.encode()) >= NOTIFY_LIMIT:
+            raise ValueError("payload string too long")
+        self.payloads.append(payload)
+
+    def messages(self) -> list[dict]:
+        return [json.loads(payload) for payload in self.payloads]
+
+
+class BusLimitsTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.conn = RecordingConnection()
+        self.bus = PostgresEventBus("postgresql://localhost/test")
+        self.bus._conn = self.conn
+
+    async def test_invalidate_many_products_is_split(self):
+        ids = list(range(2**31 - 1000, 2**31))
+        with mock.patch.object(product_cache, "bus", self.bus):
+            await invalidate_products(*ids)
+
+        messages = self.conn.messages()
+        self.assertGreater(len(messages), 1)
+        keys = [key for message in messages for key in message["data"]["keys"]]
+        self.assertEqual(keys, [product_key(pid) for pid in ids])
+
+    async def test_invalidate_huge_set_resets_everything(self):
+        with mock.patch.object(product_cache, "bus", self.bus):
+            await invalidate_products(*range(1, 6001))
+
+        [message] = self.conn.messages()
+        self.assertTrue(message["data"]["everything"])
+
+    async def test_suggest_batch_becomes_rebuild(self):
+        products = [(pid, "Очень длинное название товара " * 4, True) for pid in range(1, 1001)]
+        with mock.patch.object(suggest, "bus", self.bus):
+            await suggest.publish_products(*products)
+
+        [message] = self.conn.messages()
+        self.assertEqual(message["data"], {"rebuild": True})
+
+    async def test_oversized_event_is_sent_as_resync(self):
+        await self.bus._send("test", {"keys": ["x" * 100] * 100})
+
+        [message] = self.conn.messages()
+        self.assertEqual(message["topic"], RECONNECTED)
+
+    async def test_send_error_is_not_raised(self):
+        self.conn.execute = mock.AsyncMock(side_effect=ConnectionError)
+
+        with self.assertLogs("src.core.bus", "ERROR"):
+            await self.bus._send("test", {})
+
+
+if __name__ == "__main__":
+    unittest.main()